@@ -0,0 +1,88 @@
+"""Compare canvas item creation per call with batched Tcl scripts.
+
+Run from the repository root (requires a display):
+
+    python -m benchmarks.canvas_batch [items]
+
+Two workloads are timed, each once with one Tkinter call per canvas
+command and once inside ``CanvasBatch.collect()``, which submits every
+command in a single Tcl ``eval``:
+
+    raw    text, line and rectangle items created and stacked by layer
+           through the item pool, as the views do
+    views  devices and their connections materialized on a fresh canvas
+
+Throughput is canvas items per second, including the time Tk takes to
+create the items, which batching does not change.
+"""
+import random
+import sys
+import time
+import tkinter as tk
+from contextlib import nullcontext
+from models import Connection, ConnectionType, Device, DeviceConfig, TopologyModel
+from models.redraw import CanvasBatch, ItemPool
+
+ITEM_COUNTS = (1000, 10000, 50000)
+
+def raw_items(canvas: tk.Canvas, count: int) -> None:
+    """Create items of the kinds the views draw, placed in their layers."""
+    pool = ItemPool.for_canvas(canvas)
+    for i in range(count // 3):
+        x, y = (i % 200) * 10, (i // 200) * 10
+        pool.acquire('device.name', 'text', 'device', (x, y + 30),
+                     text=f'device{i}', tags=('device', 'draggable'))
+        pool.acquire('connection.line', 'line', 'connection', (x, y, x + 40, y + 40),
+                     fill='#2196F3', width=2, tags='connection')
+        pool.acquire('device.square', 'rectangle', 'device', (x - 5, y - 5, x + 5, y + 5),
+                     fill='gray', outline='', tags=('device', 'draggable'))
+
+def view_items(canvas: tk.Canvas, count: int) -> None:
+    """Materialize devices with one connection each, two or three items per device."""
+    model = TopologyModel()
+    random.seed(1)
+    devices = []
+    for i in range(count // 3):
+        devices.append(Device(
+            canvas, random.uniform(0, 5000), random.uniform(0, 5000),
+            DeviceConfig(f'device{i}', 'router'), model=model, materialize=False
+        ))
+    connections = [
+        Connection(canvas, devices[i], devices[random.randrange(i)], ConnectionType.ETHERNET,
+                   materialize=False)
+        for i in range(1, len(devices))
+    ]
+    for view in devices + connections:
+        view.materialize()
+
+def measure(root: tk.Tk, workload, count: int, batched: bool) -> float:
+    """Run a workload on a fresh canvas.
+
+    Returns:
+        float: Canvas items created per second
+    """
+    canvas = tk.Canvas(root, width=800, height=600)
+    batch = CanvasBatch.for_canvas(canvas)
+    start = time.perf_counter()
+    with batch.collect() if batched else nullcontext():
+        workload(canvas, count)
+    canvas.update_idletasks()
+    elapsed = time.perf_counter() - start
+    items = len(canvas.find_all())
+    canvas.destroy()
+    return items / elapsed
+
+def main() -> None:
+    counts = (int(sys.argv[1]),) if len(sys.argv) > 1 else ITEM_COUNTS
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'workload':>8} {'items':>7} {'per call/s':>11} {'batched/s':>10} {'speedup':>8}")
+    for name, workload in (('raw', raw_items), ('views', view_items)):
+        for count in counts:
+            direct = measure(root, workload, count, batched=False)
+            batched = measure(root, workload, count, batched=True)
+            print(f"{name:>8} {count:>7} {direct:>11.0f} {batched:>10.0f} {batched / direct:>7.1f}x")
+    root.destroy()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Measure the ratio/throughput trade-off of compressed topology files.
+
+Run from the repository root:
+
+    python -m benchmarks.compression [devices]
+
+Saves and streams back one topology per codec and level. Throughput is
+megabytes of uncompressed JSON per second, for writing (model to file)
+and reading (file to parsed records, without building a model).
+
+Reference results for 100k devices (17.6 MiB of JSON):
+
+    codec  level  ratio  write MB/s  read MB/s
+    none       -    1.0        22.3       34.2
+    gzip       1    4.7        20.3       39.9
+    gzip       6    5.3        16.7       39.9
+    gzip       9    5.5         6.2       38.3
+    bz2        1    6.8         8.6       21.8
+    bz2        9    6.8         6.5       20.2
+    lzma       0    5.6        13.0       29.3
+    lzma       6    7.1         1.3       27.0
+    lzma       9    7.1         1.1       26.4
+
+Reading is bound by JSON parsing for gzip, so gzip costs nothing to load;
+lzma at its default level buys the best ratio at a steep write cost.
+"""
+import os
+import sys
+import tempfile
+import time
+from utils.file_handler import FileHandler
+from .file_formats import build_model
+
+CASES = (
+    (None, None),
+    ('gzip', 1), ('gzip', 6), ('gzip', 9),
+    ('bz2', 1), ('bz2', 9),
+    ('lzma', 0), ('lzma', 6), ('lzma', 9),
+)
+
+def main(devices: int) -> None:
+    model = build_model(devices)
+    print(f"{'codec':>5} {'level':>6} {'ratio':>6} {'write MB/s':>11} {'read MB/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, 'plain.json')
+        FileHandler.save_model(model, plain)
+        raw_size = os.path.getsize(plain)
+        for codec, level in CASES:
+            filename = os.path.join(directory, f'{codec}-{level}.json')
+            start = time.perf_counter()
+            FileHandler.save_model(model, filename, compression=codec, level=level)
+            write_time = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in FileHandler.iter_topology(filename):
+                pass
+            read_time = time.perf_counter() - start
+            ratio = raw_size / os.path.getsize(filename)
+            megabytes = raw_size / 1e6
+            print(f"{codec or 'none':>5} {level if level is not None else '-':>6} {ratio:>6.1f} "
+                  f"{megabytes / write_time:>11.1f} {megabytes / read_time:>10.1f}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
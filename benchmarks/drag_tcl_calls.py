@@ -0,0 +1,85 @@
+"""Count Tcl round trips per drag event when moving a hub device.
+
+Run from the repository root (requires a display):
+
+    python -m benchmarks.drag_tcl_calls
+
+Each frame delivers one or more motion events followed by the idle-time
+connection flush. Reference counts per drag event, hub with 1 / 50 / 400
+links:
+
+    canvas.bbox geometry:              7 / 252 / 2002
+    model geometry:                    5 / 152 / 1202
+    batched redraw, 1 event/frame:     4 /  53 /  403
+    batched redraw, 4 events/frame:  2.5 /  15 /  102
+"""
+import time
+import tkinter as tk
+from models import Connection, ConnectionType, Device, DeviceConfig, TopologyModel
+from models.redraw import RedrawQueue
+
+LINK_COUNTS = (1, 50, 400)
+EVENTS_PER_FRAME = (1, 4)
+FRAMES = 100
+
+class TclCallCounter:
+    """Proxy for a Tcl interpreter that counts command round trips."""
+
+    def __init__(self, interp):
+        self.interp = interp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self.interp.call(*args)
+
+    def eval(self, script):
+        self.calls += 1
+        return self.interp.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self.interp, name)
+
+def measure(root: tk.Tk, links: int, events_per_frame: int) -> tuple:
+    """Drag a hub device with the given number of links.
+
+    Returns:
+        tuple: (Tcl calls per drag event, milliseconds per frame)
+    """
+    canvas = tk.Canvas(root, width=800, height=600)
+    model = TopologyModel()
+    hub = Device(canvas, 400, 300, DeviceConfig('hub', 'switch'), model=model)
+    for i in range(links):
+        peer = Device(
+            canvas, 20 + (i % 40) * 20, 500 + (i // 40) * 20,
+            DeviceConfig(f'client{i}', 'client'), model=model
+        )
+        Connection(canvas, hub, peer, ConnectionType.ETHERNET)
+    queue = RedrawQueue.for_canvas(canvas)
+    queue.flush()
+
+    counter = TclCallCounter(canvas.tk)
+    canvas.tk = counter
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for _ in range(events_per_frame):
+            hub.move(1, 0)
+        queue.flush()
+    elapsed = time.perf_counter() - start
+    canvas.tk = counter.interp
+    canvas.destroy()
+    events = FRAMES * events_per_frame
+    return (counter.calls / events, elapsed / FRAMES * 1000)
+
+def main() -> None:
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'links':>6} {'events/frame':>13} {'tcl calls/event':>16} {'ms/frame':>9}")
+    for links in LINK_COUNTS:
+        for events_per_frame in EVENTS_PER_FRAME:
+            calls, ms = measure(root, links, events_per_frame)
+            print(f"{links:>6} {events_per_frame:>13} {calls:>16.1f} {ms:>9.3f}")
+    root.destroy()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Compare load time and peak resident memory of the JSON and .ntdb formats.
+
+Run from the repository root:
+
+    python -m benchmarks.file_formats [device counts...]
+
+Each load runs in a fresh interpreter so its peak RSS is not polluted by
+the generator or by earlier runs. Modes:
+
+    json        FileHandler.load_model on the streamed JSON file
+    ntdb-model  FileHandler.load_model on the .ntdb file (full model)
+    ntdb-mmap   map the .ntdb file, sum a coordinate column and decode
+                one name; what a viewer or exporter touching columns pays
+
+Reference results (seconds / peak MiB, topology with one link per device;
+file sizes 1.7 / 17.6 / 179 MiB for JSON and 0.8 / 7.9 / 80.5 MiB for .ntdb):
+
+    devices   json             ntdb-model       ntdb-mmap
+      10000   0.11 /   37      0.05 /   36      0.00 /  27
+     100000   1.34 /  130      0.73 /  139      0.00 /  28
+    1000000  17.5  / 1036     12.2  / 1142      0.01 /  38
+
+Building the full model is dominated by TopologyModel itself, so the gain
+there is parse time; touching columns through the mapping is what stays
+flat as the file grows.
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from models import ConnectionType, TopologyModel
+from utils.file_handler import FileHandler
+from utils.ntdb import NtdbFile
+
+DEVICE_COUNTS = (10_000, 100_000, 1_000_000)
+MODES = ('json', 'ntdb-model', 'ntdb-mmap')
+DEVICE_TYPES = ('router', 'switch', 'firewall', 'server', 'client', 'access_point')
+
+def build_model(devices: int) -> TopologyModel:
+    """Build a campus-like topology with one link per device."""
+    rng = random.Random(devices)
+    model = TopologyModel()
+    side = int(devices ** 0.5) * 100
+    handles = []
+    for i in range(devices):
+        handles.append(model.add_device(
+            f'dev{i}', rng.choice(DEVICE_TYPES),
+            rng.uniform(0, side), rng.uniform(0, side),
+            ip_address=f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'
+        ))
+    types = TopologyModel.CONNECTION_TYPES
+    for i in range(1, devices):
+        model.add_link(handles[i], handles[rng.randrange(max(0, i - 100), i)], rng.choice(types))
+    for i in range(devices // 1000):
+        model.add_boundary(f'zone{i}', rng.uniform(0, side), rng.uniform(0, side), 800, 800,
+                           subnet=f'10.{i & 255}.0.0/16')
+    return model
+
+def load(mode: str, filename: str) -> None:
+    """Load a file in this process and report time and peak RSS."""
+    start = time.perf_counter()
+    if mode == 'ntdb-mmap':
+        with NtdbFile(filename) as ntdb:
+            sum(ntdb.devices['x'])
+            ntdb.string(ntdb.devices['name'][ntdb.device_count - 1])
+    else:
+        FileHandler.load_model(filename)
+    elapsed = time.perf_counter() - start
+    print(f'{elapsed} {peak_rss()}')
+
+def peak_rss() -> int:
+    """Get this process's peak resident set size in bytes."""
+    try:
+        # Unlike ru_maxrss, VmHWM is not carried over from the forking parent
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run(mode: str, filename: str) -> tuple:
+    """Run one load in a fresh interpreter.
+
+    Returns:
+        tuple: (seconds, peak MiB)
+    """
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.file_formats', '--load', mode, filename],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return (float(output[0]), int(output[1]) / (1 << 20))
+
+def main(counts) -> None:
+    print(f"{'devices':>8} {'mode':>11} {'file MiB':>9} {'seconds':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for devices in counts:
+            model = build_model(devices)
+            json_file = os.path.join(directory, f'{devices}.json')
+            ntdb_file = os.path.join(directory, f'{devices}.ntdb')
+            FileHandler.save_model(model, json_file)
+            FileHandler.save_model(model, ntdb_file)
+            del model
+            for mode in MODES:
+                filename = json_file if mode == 'json' else ntdb_file
+                size = os.path.getsize(filename) / (1 << 20)
+                seconds, peak = run(mode, filename)
+                print(f'{devices:>8} {mode:>11} {size:>9.1f} {seconds:>8.2f} {peak:>9.0f}')
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--load':
+        load(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEVICE_COUNTS)
@@ -0,0 +1,57 @@
+"""Time the force-directed layout on random topologies.
+
+Run from the repository root:
+
+    python -m benchmarks.force_layout [device counts...]
+
+Each topology has three links per device, mostly between devices close
+in creation order as in real inventories, and starts with every device
+piled at one point as after a bulk add. Quality is the median link length
+over the target spacing.
+
+Reference results (120 iterations):
+
+    devices    links  seconds  link/spacing
+       1000     2967     0.62           3.2
+      10000    29744     7.16           4.1
+"""
+import random
+import sys
+import time
+import numpy as np
+from models import ConnectionType, TopologyModel
+from models.layout import ForceLayout, live_links
+
+DEVICE_COUNTS = (1000, 10000)
+
+def build_model(devices: int) -> TopologyModel:
+    """Build a topology of piled devices with about three links each."""
+    model = TopologyModel()
+    random.seed(1)
+    handles = [model.add_device(f'd{i}', 'router', 100, 100) for i in range(devices)]
+    for i in range(1, devices):
+        model.add_link(handles[i], handles[random.randrange(max(0, i - 30), i)], ConnectionType.ETHERNET)
+    for _ in range(2 * devices + 1):
+        i = random.randrange(devices)
+        j = min(devices - 1, max(0, i + random.randint(-40, 40)))
+        if i != j:
+            model.add_link(handles[i], handles[j], ConnectionType.ETHERNET)
+    return model
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or DEVICE_COUNTS
+    print(f"{'devices':>8} {'links':>8} {'seconds':>8} {'link/spacing':>13}")
+    for devices in counts:
+        model = build_model(devices)
+        layout = ForceLayout(model)
+        start = time.perf_counter()
+        result = layout.compute()
+        elapsed = time.perf_counter() - start
+        row = np.empty(len(model.device_alive), dtype=np.int64)
+        row[result.handles] = np.arange(len(result.handles))
+        a, b = live_links(model)
+        length = np.hypot(result.x[row[a]] - result.x[row[b]], result.y[row[a]] - result.y[row[b]])
+        print(f"{devices:>8} {model.link_count:>8} {elapsed:>8.2f} {np.median(length) / layout.spacing:>13.1f}")
+
+if __name__ == '__main__':
+    main()
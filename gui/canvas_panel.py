@@ -1,33 +1,77 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, Optional, Tuple, Callable, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Callable, Any, Union
 from models.device import Device
 from models.boundary import Boundary
 from models.connection import Connection, ConnectionType
+from models.topology import TopologyModel
+from models.redraw import CanvasBatch, CanvasLayers, ItemPool, RedrawQueue
+from models.routing import ConnectionRouter
+from models.viewport import Viewport
+from .history import ConnectionCommand, MoveCommand, ResizeCommand, UndoHistory
+from .render_scheduler import RenderScheduler, sum_deltas, compose_zoom
+from models import DeviceConfig, BoundaryConfig
+
+CanvasItemOwner = Union[Device, Boundary, Connection]
 
 class CanvasPanel:
     """Handles the main drawing area of the application."""
 
-    def __init__(self, parent: ttk.Frame, callbacks: Dict[str, Callable[[], Any]]):
+    SCROLL_SIZE = 2000
+    SCROLL_PADDING = 200
+    VIEWPORT_MARGIN = 200
+    ZOOM_STEP = 1.25
+    MIN_ZOOM = 0.05
+    MAX_ZOOM = 4.0
+
+    def __init__(self, parent: ttk.Frame, callbacks: Dict[str, Callable[[], Any]],
+                 frame_rate: int = 60,
+                 simple_below: float = Viewport.DEFAULT_SIMPLE_BELOW,
+                 aggregate_below: float = Viewport.DEFAULT_AGGREGATE_BELOW,
+                 virtualized: bool = False):
         """Initialize the canvas panel.
         
         Args:
             parent: Parent frame to contain the canvas
             callbacks: Dictionary of callback functions
+            frame_rate: Maximum rate at which drag, resize and zoom events are applied
+            simple_below: Zoom level under which devices are drawn as plain
+                squares without labels and connections lose their dashes
+            aggregate_below: Zoom level under which the devices inside a
+                boundary collapse into a single glyph
+            virtualized: Only draw the elements within the visible area plus
+                a margin, recycling canvas items as the view scrolls and zooms
         """
         self.parent = parent
         self.callbacks = callbacks
+        self.model = TopologyModel()
         self.devices: Dict[str, Device] = {}
         self.boundaries: Dict[str, Boundary] = {}
+        self.device_views: Dict[int, Device] = {}
+        self.boundary_views: Dict[int, Boundary] = {}
+        self.item_owners: Dict[int, CanvasItemOwner] = {}
+        self.materialized: Set[CanvasItemOwner] = set()
+        self.virtualized = virtualized
         
         # State variables
         self.connecting = False
         self.connection_start: Optional[Device] = None
+        self.picking_path = False
+        self.path_start: Optional[Device] = None
+        self.path_links: Set[int] = set()
+        self.dragging: Optional[Union[Device, Boundary]] = None
         self.resizing_boundary: Optional[Boundary] = None
         self.resize_start: Optional[Tuple[int, int]] = None
         self.drag_data = {"x": 0, "y": 0, "item": None}
         
         self._create_widgets()
+        self.viewport = Viewport.for_canvas(self.canvas)
+        self.viewport.simple_below = simple_below
+        self.viewport.aggregate_below = aggregate_below
+        self.scroll_region: Tuple[float, float, float, float] = (0, 0, self.SCROLL_SIZE, self.SCROLL_SIZE)
+        self.scheduler = RenderScheduler(self.canvas, frame_rate)
+        self.scheduler.after_frame.append(RedrawQueue.for_canvas(self.canvas).flush)
+        self.history = UndoHistory(self)
         self._bind_events()
 
     def _create_widgets(self) -> None:
@@ -42,19 +86,19 @@ class CanvasPanel:
             width=800,
             height=600,
             bg='white',
-            scrollregion=(0, 0, 2000, 2000)
+            scrollregion=(0, 0, self.SCROLL_SIZE, self.SCROLL_SIZE)
         )
         
         # Add scrollbars
         h_scrollbar = ttk.Scrollbar(
             self.frame,
             orient=tk.HORIZONTAL,
-            command=self.canvas.xview
+            command=self._xview
         )
         v_scrollbar = ttk.Scrollbar(
             self.frame,
             orient=tk.VERTICAL,
-            command=self.canvas.yview
+            command=self._yview
         )
         
         # Configure canvas scroll
@@ -82,15 +126,18 @@ class CanvasPanel:
         
         # Boundary resize handle bindings
         self.canvas.tag_bind('boundary_resize_handle', '<Button-1>', self._resize_start)
-        self.canvas.tag_bind('boundary_resize_handle', '<B1-Motion>', self.resizing_boundary)
+        self.canvas.tag_bind('boundary_resize_handle', '<B1-Motion>', self._resize_motion)
         self.canvas.tag_bind('boundary_resize_handle', '<ButtonRelease-1>', self._resize_stop)
         
         # Mouse wheel zoom
         self.canvas.bind('<Control-MouseWheel>', self._mouse_wheel_zoom)
 
+        # Visible area changes
+        self.canvas.bind('<Configure>', self._on_configure)
+
     def _drag_start(self, event: tk.Event) -> None:
         """Handle the start of a drag operation."""
-        if self.connecting:
+        if self.connecting or self.picking_path:
             return
         self.drag_data["item"] = self.canvas.find_closest(event.x, event.y)[0]
         self.drag_data["x"] = event.x
@@ -98,55 +145,160 @@ class CanvasPanel:
 
     def _drag_stop(self, event: tk.Event) -> None:
         """Handle the end of a drag operation."""
-        if self.drag_data["item"]:
-            self._update_boundary_devices()
+        self.scheduler.flush()
+        self.history.seal()
+        self.dragging = None
+        if self.item_owners.get(self.drag_data["item"]) is not None:
+            self._refresh_aggregates()
+            self._update_scroll_region()
+            self._sync_viewport()
         self.drag_data["item"] = None
         self.drag_data["x"] = 0
         self.drag_data["y"] = 0
 
     def _drag(self, event: tk.Event) -> None:
         """Handle drag movement."""
-        if self.connecting:
+        if self.connecting or self.picking_path:
             return
             
-        dx = event.x - self.drag_data["x"]
-        dy = event.y - self.drag_data["y"]
-        
-        # Handle device dragging
-        for device in self.devices.values():
-            if self.drag_data["item"] in (device.icon, device.name_text):
-                device.move(dx, dy)
-                break
+        # Convert the pointer delta to model units
+        scale = self.viewport.scale
+        dx = (event.x - self.drag_data["x"]) / scale
+        dy = (event.y - self.drag_data["y"]) / scale
         
-        # Handle boundary dragging
-        for boundary in self.boundaries.values():
-            if self.drag_data["item"] in (boundary.boundary, boundary.name_text):
-                boundary.move(dx, dy)
-                break
+        # Accumulate the delta; the scheduler applies it once per frame
+        item = self.drag_data["item"]
+        owner = self.item_owners.get(item)
+        if isinstance(owner, Device) or (isinstance(owner, Boundary) and item != owner.resize_handle):
+            self.dragging = owner
+            self.scheduler.post('drag', self._apply_drag, (dx, dy), merge=sum_deltas)
         
         self.drag_data["x"] = event.x
         self.drag_data["y"] = event.y
 
+    def _apply_drag(self, dx: float, dy: float) -> None:
+        """Move the dragged view by the accumulated delta."""
+        owner = self.dragging
+        if not owner:
+            return
+        owner.move(dx, dy)
+        self.history.record(MoveCommand.for_view(owner, dx, dy))
+
     def _canvas_click(self, event: tk.Event) -> None:
         """Handle canvas clicks."""
         if self.connecting:
             self._handle_connection_click(event)
             return
+        if self.picking_path:
+            self._handle_path_click(event)
+            return
 
         self._handle_selection_click(event)
 
+    def _register_items(self, owner: CanvasItemOwner) -> None:
+        """Record the owner of every canvas item drawn for a view."""
+        for item in owner.canvas_items():
+            self.item_owners[item] = owner
+
+    def _unregister_items(self, owner: CanvasItemOwner) -> None:
+        """Forget the canvas items drawn for a view."""
+        for item in owner.canvas_items():
+            self.item_owners.pop(item, None)
+
+    def _show(self, owner: CanvasItemOwner) -> None:
+        """Draw a view and track its canvas items."""
+        owner.materialize()
+        self._register_items(owner)
+        self.materialized.add(owner)
+
+    def _hide(self, owner: CanvasItemOwner) -> None:
+        """Return a view's canvas items to the pool."""
+        self._unregister_items(owner)
+        owner.dematerialize()
+        self.materialized.discard(owner)
+
+    def _visible_rect(self) -> Tuple[float, float, float, float]:
+        """Get the visible area plus the margin in model coordinates."""
+        margin = self.VIEWPORT_MARGIN
+        x1, y1 = self.viewport.to_model(
+            self.canvas.canvasx(0) - margin, self.canvas.canvasy(0) - margin
+        )
+        x2, y2 = self.viewport.to_model(
+            self.canvas.canvasx(self.canvas.winfo_width()) + margin,
+            self.canvas.canvasy(self.canvas.winfo_height()) + margin
+        )
+        return (x1, y1, x2, y2)
+
+    def _sync_viewport(self) -> None:
+        """Draw the views entering the visible area and recycle those leaving it.
+
+        Connections are drawn while either of their devices is in view.
+        """
+        if not self.virtualized:
+            return
+        rect = self._visible_rect()
+        wanted: Set[CanvasItemOwner] = set()
+        for handle in self.model.boundary_index.query_rect(rect):
+            wanted.add(self.boundary_views[handle])
+        for handle in self.model.devices_in_rect(*rect):
+            device = self.device_views[handle]
+            wanted.add(device)
+            wanted.update(device.connections)
+        with CanvasBatch.for_canvas(self.canvas).collect():
+            for owner in self.materialized - wanted:
+                self._hide(owner)
+            for owner in wanted - self.materialized:
+                self._show(owner)
+
+    def _schedule_sync(self) -> None:
+        """Sync the drawn views with the visible area on the next frame."""
+        if self.virtualized:
+            self.scheduler.post('sync', self._sync_viewport, ())
+
+    def _xview(self, *args) -> None:
+        """Scroll horizontally from the scrollbar."""
+        self.canvas.xview(*args)
+        self._schedule_sync()
+
+    def _yview(self, *args) -> None:
+        """Scroll vertically from the scrollbar."""
+        self.canvas.yview(*args)
+        self._schedule_sync()
+
+    def _on_configure(self, event: tk.Event) -> None:
+        """Handle the canvas being resized."""
+        self._schedule_sync()
+
+    def _set_device_highlight(self, device: Device, state: bool) -> None:
+        """Highlight a device, keeping its highlight ring in the item registry."""
+        if device.highlight_circle:
+            self.item_owners.pop(device.highlight_circle, None)
+        device.highlight(state)
+        if device.highlight_circle:
+            self.item_owners[device.highlight_circle] = device
+
+    def find_device_at(self, x: float, y: float) -> Optional[Device]:
+        """Find the device under a model point using the model's spatial index."""
+        handle = self.model.device_at(x, y)
+        return self.device_views.get(handle) if handle is not None else None
+
+    def find_boundary_at(self, x: float, y: float) -> Optional[Boundary]:
+        """Find the boundary under a model point using the model's spatial index."""
+        handle = self.model.boundary_at(x, y)
+        return self.boundary_views.get(handle) if handle is not None else None
+
+    def _event_position(self, event: tk.Event) -> Tuple[float, float]:
+        """Convert an event's window position to model coordinates."""
+        return self.viewport.to_model(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+
     def _handle_connection_click(self, event: tk.Event) -> None:
         """Handle clicks during connection creation."""
-        clicked_device = None
-        for device in self.devices.values():
-            if device.contains(event.x, event.y):
-                clicked_device = device
-                break
+        clicked_device = self.find_device_at(*self._event_position(event))
         
         if clicked_device:
             if self.connection_start is None:
                 self.connection_start = clicked_device
-                clicked_device.highlight(True)
+                self._set_device_highlight(clicked_device, True)
             else:
                 if clicked_device != self.connection_start:
                     self.callbacks['create_connection'](
@@ -154,116 +306,415 @@ class CanvasPanel:
                         clicked_device
                     )
                 
-                self.connection_start.highlight(False)
+                self._set_device_highlight(self.connection_start, False)
                 self.connection_start = None
                 self.connecting = False
                 self.canvas.config(cursor="")
 
+    def _handle_path_click(self, event: tk.Event) -> None:
+        """Handle clicks while picking the two ends of a path."""
+        clicked_device = self.find_device_at(*self._event_position(event))
+        
+        if clicked_device:
+            if self.path_start is None:
+                self.path_start = clicked_device
+                self._set_device_highlight(clicked_device, True)
+            else:
+                self._set_device_highlight(self.path_start, False)
+                if clicked_device != self.path_start:
+                    self.callbacks['show_paths'](self.path_start, clicked_device)
+                
+                self.path_start = None
+                self.picking_path = False
+                self.canvas.config(cursor="")
+
     def _handle_selection_click(self, event: tk.Event) -> None:
         """Handle selection clicks."""
         # Deselect all
         for device in self.devices.values():
-            device.highlight(False)
+            if device.selected:
+                self._set_device_highlight(device, False)
         for boundary in self.boundaries.values():
             boundary.highlight(False)
 
+        # An item binding has already resolved the clicked item for drags
+        owner = self.item_owners.get(self.drag_data["item"])
+        x, y = self._event_position(event)
+
         # Check for clicks on devices first
-        for device in self.devices.values():
-            if device.contains(event.x, event.y):
-                device.highlight(True)
-                if self.callbacks.get('show_device_properties'):
-                    self.callbacks['show_device_properties'](device)
-                return
+        device = owner if isinstance(owner, Device) else self.find_device_at(x, y)
+        if device:
+            self._set_device_highlight(device, True)
+            if self.callbacks.get('show_device_properties'):
+                self.callbacks['show_device_properties'](device)
+            return
 
         # Then check boundaries
-        for boundary in self.boundaries.values():
-            if boundary.contains_point(event.x, event.y):
-                boundary.highlight(True)
-                if self.callbacks.get('show_boundary_properties'):
-                    self.callbacks['show_boundary_properties'](boundary)
-                return
+        boundary = owner if isinstance(owner, Boundary) else self.find_boundary_at(x, y)
+        if boundary:
+            boundary.highlight(True)
+            if self.callbacks.get('show_boundary_properties'):
+                self.callbacks['show_boundary_properties'](boundary)
 
     def start_connection_mode(self) -> None:
         """Enter connection creation mode."""
         self.connecting = True
         self.canvas.config(cursor="crosshair")
 
+    def start_path_mode(self) -> None:
+        """Enter path mode, where the next two devices clicked are the path's ends."""
+        self.picking_path = True
+        self.canvas.config(cursor="crosshair")
+
+    def highlight_path(self, links: Iterable[int]) -> None:
+        """Restyle the connections of a path, restoring those of the previous one, in one batch."""
+        with CanvasBatch.for_canvas(self.canvas).collect():
+            for connection in self._connections_of(self.path_links):
+                connection.set_highlight(False)
+            self.path_links = set(links)
+            for connection in self._connections_of(self.path_links):
+                connection.set_highlight(True)
+
     def add_device(self, device: Device) -> None:
         """Add a device to the canvas."""
         self.devices[device.config.name] = device
-        self._update_boundary_devices()
+        self.device_views[device.handle] = device
+        self._show(device)
+        for conn in device.connections:
+            self._show(conn)
+        self._refresh_aggregates()
+        self._update_scroll_region()
+        self._schedule_sync()
+
+    def add_connection(self, connection: Connection) -> None:
+        """Add a connection to the canvas."""
+        self._show(connection)
+
+    def connect(self, device1: Device, device2: Device,
+                connection_type: ConnectionType) -> Connection:
+        """Create a connection between two devices as an undoable edit."""
+        connection = Connection(self.canvas, device1, device2, connection_type,
+                                materialize=False)
+        self._show(connection)
+        self.history.record(ConnectionCommand(connection, created=True))
+        return connection
+
+    def remove_connection(self, connection: Connection) -> None:
+        """Delete a connection from the canvas and the model as an undoable edit."""
+        self.history.record(ConnectionCommand(connection, created=False))
+        self._unregister_items(connection)
+        self.materialized.discard(connection)
+        connection.delete()
+
+    def remove_device(self, device: Device) -> None:
+        """Delete a device and its connections from the canvas and the model."""
+        self._unregister_items(device)
+        self.materialized.discard(device)
+        for conn in device.connections:
+            self._unregister_items(conn)
+            self.materialized.discard(conn)
+            self.path_links.discard(conn.handle)
+        device.delete()
+        self.devices.pop(device.config.name, None)
+        self.device_views.pop(device.handle, None)
+        if self.connection_start is device:
+            self.connection_start = None
+        if self.path_start is device:
+            self.path_start = None
+        self._refresh_aggregates()
+
+    def remove_boundary(self, boundary: Boundary) -> None:
+        """Delete a boundary from the canvas and the model."""
+        self._unregister_items(boundary)
+        self.materialized.discard(boundary)
+        boundary.delete()
+        self.boundaries.pop(boundary.config.name, None)
+        self.boundary_views.pop(boundary.handle, None)
+        if self.resizing_boundary is boundary:
+            self.resizing_boundary = None
+        self._refresh_aggregates()
+
+    def load_model(self, model: TopologyModel) -> None:
+        """Replace the canvas contents with views over the given model.
+
+        In virtualized mode the views are created undrawn and only those in
+        the visible area are then materialized.
+        """
+        self.clear()
+        self.model = model
+        if self.viewport.router:
+            self.set_routing(True)
+        with CanvasBatch.for_canvas(self.canvas).collect():
+            for handle in model.boundaries():
+                self.create_boundary_view(handle)
+            for handle in model.devices():
+                self.create_device_view(handle)
+            for handle in model.links():
+                self.create_connection_view(handle)
+            self.refresh_view()
+
+    def set_routing(self, enabled: bool) -> None:
+        """Draw connections as orthogonal routes around devices and boundaries, or straight."""
+        if self.viewport.router:
+            self.viewport.router.detach()
+        self.viewport.router = ConnectionRouter(self.model, on_invalidate=self._reroute) if enabled else None
+        with CanvasBatch.for_canvas(self.canvas).collect():
+            for owner in self.materialized:
+                if isinstance(owner, Connection):
+                    owner.update_position()
+
+    def _reroute(self, links: Set[int]) -> None:
+        """Queue the connections whose route was dropped for redraw."""
+        queue = RedrawQueue.for_canvas(self.canvas)
+        for connection in self._connections_of(links):
+            queue.mark(connection)
+
+    def _connections_of(self, links: Iterable[int]) -> Iterator[Connection]:
+        """Get the views of the live links among the given handles."""
+        model = self.model
+        for link in links:
+            device = self.device_views.get(model.link_a[link]) if model.link_alive[link] else None
+            for connection in device.connections if device else ():
+                if connection.handle == link:
+                    yield connection
+
+    def add_model_elements(self, devices: List[int], links: List[int]) -> None:
+        """Create the views of devices and links just added to the model.
+
+        The scroll region, visible views and collapsed boundaries are
+        updated once for the whole batch.
+        """
+        with CanvasBatch.for_canvas(self.canvas).collect():
+            for handle in devices:
+                self.create_device_view(handle)
+            for handle in links:
+                self.create_connection_view(handle)
+            self.refresh_view()
+
+    def create_boundary_view(self, handle: int) -> Boundary:
+        """Create the view of a model boundary, drawn unless virtualized."""
+        model = self.model
+        boundary = Boundary(
+            self.canvas,
+            model.boundary_x[handle], model.boundary_y[handle],
+            model.boundary_width[handle], model.boundary_height[handle],
+            BoundaryConfig(**model.boundary_fields(handle)),
+            model=model, handle=handle, materialize=not self.virtualized
+        )
+        self.boundaries[boundary.config.name] = boundary
+        self.boundary_views[handle] = boundary
+        if not self.virtualized:
+            self._show(boundary)
+        return boundary
+
+    def create_device_view(self, handle: int) -> Device:
+        """Create the view of a model device, drawn unless virtualized."""
+        model = self.model
+        device = Device(
+            self.canvas, *model.device_position(handle),
+            DeviceConfig(**model.device_fields(handle)),
+            model=model, handle=handle, materialize=not self.virtualized
+        )
+        self.device_views[handle] = device
+        self.devices[device.config.name] = device
+        if not self.virtualized:
+            self._show(device)
+        return device
+
+    def create_connection_view(self, handle: int) -> Connection:
+        """Create the view of a model link, drawn unless virtualized.
+
+        The views of both of its devices must exist.
+        """
+        device1, device2 = self.model.link_endpoints(handle)
+        connection = Connection(
+            self.canvas, self.device_views[device1], self.device_views[device2],
+            self.model.link_type(handle), handle=handle, materialize=not self.virtualized
+        )
+        if not self.virtualized:
+            self._show(connection)
+        return connection
+
+    def refresh_view(self, aggregates: bool = True) -> None:
+        """Catch up the scroll region and drawn views after views were created in bulk.
+
+        Args:
+            aggregates: Also redraw collapsed boundaries, which costs a full
+                redraw when zoomed out far enough to collapse them
+        """
+        if aggregates:
+            self._refresh_aggregates()
+        self._update_scroll_region()
+        self._sync_viewport()
 
     def add_boundary(self, boundary: Boundary) -> None:
         """Add a boundary to the canvas."""
         self.boundaries[boundary.config.name] = boundary
-        self._update_boundary_devices()
+        self.boundary_views[boundary.handle] = boundary
+        self._show(boundary)
+        self._refresh_aggregates()
+        self._update_scroll_region()
+        self._schedule_sync()
 
-    def _update_boundary_devices(self) -> None:
-        """Update device containment for all boundaries."""
-        for boundary in self.boundaries.values():
-            boundary.update_contained_devices(self.devices)
+    def _redraw_views(self) -> None:
+        """Recreate the drawn views' canvas items for the current level of detail."""
+        self.item_owners.clear()
+        with CanvasBatch.for_canvas(self.canvas).collect():
+            for owner in self.materialized:
+                owner.redraw()
+                self._register_items(owner)
+            # Items of the previous tier's roles would otherwise linger hidden
+            ItemPool.for_canvas(self.canvas).drain()
+
+    def _refresh_aggregates(self) -> None:
+        """Redraw the views if devices may have entered or left a collapsed boundary."""
+        if self.viewport.tier == Viewport.AGGREGATE:
+            self._redraw_views()
 
     def clear(self) -> None:
         """Clear all items from the canvas."""
+        self.scheduler.clear()
         self.canvas.delete('all')
+        CanvasLayers.for_canvas(self.canvas).reset()
+        ItemPool.for_canvas(self.canvas).reset()
+        RedrawQueue.for_canvas(self.canvas).dirty.clear()
+        self.model.clear()
         self.devices.clear()
         self.boundaries.clear()
+        self.device_views.clear()
+        self.boundary_views.clear()
+        self.item_owners.clear()
+        self.materialized.clear()
         self.connecting = False
         self.connection_start = None
+        self.picking_path = False
+        self.path_start = None
+        self.path_links = set()
+        self.dragging = None
         self.resizing_boundary = None
         self.resize_start = None
-        self.canvas.configure(scrollregion=(0, 0, 2000, 2000))
+        self.history.clear()
+        self.viewport.scale = 1.0
+        self.scroll_region = (0, 0, self.SCROLL_SIZE, self.SCROLL_SIZE)
+        self.canvas.configure(scrollregion=self.scroll_region)
         self.canvas.config(cursor="")
 
     def _resize_start(self, event: tk.Event) -> None:
         """Start boundary resizing operation."""
         item = self.canvas.find_closest(event.x, event.y)[0]
-        for boundary in self.boundaries.values():
-            if item == boundary.resize_handle:
-                self.resizing_boundary = boundary
-                self.resize_start = (event.x, event.y)
-                break
+        owner = self.item_owners.get(item)
+        if isinstance(owner, Boundary) and item == owner.resize_handle:
+            self.resizing_boundary = owner
+            self.resize_start = (event.x, event.y)
 
-    def resizing_boundary(self, event: tk.Event) -> None:
+    def _resize_motion(self, event: tk.Event) -> None:
         """Handle boundary resizing during mouse motion."""
         if not self.resizing_boundary or not self.resize_start:
             return
 
-        # Calculate change in position
-        dx = event.x - self.resize_start[0]
-        dy = event.y - self.resize_start[1]
+        # Calculate change in position in model units
+        scale = self.viewport.scale
+        dx = (event.x - self.resize_start[0]) / scale
+        dy = (event.y - self.resize_start[1]) / scale
 
-        # Update boundary size
-        self.resizing_boundary.resize(dx, dy)
+        # Accumulate the change; the scheduler applies it once per frame
+        self.scheduler.post('resize', self._apply_resize, (dx, dy), merge=sum_deltas)
         
         # Update start position for next movement
         self.resize_start = (event.x, event.y)
-        
-        # Update which devices are contained in the boundary
-        self._update_boundary_devices()
+
+    def _apply_resize(self, dx: float, dy: float) -> None:
+        """Grow the boundary being resized by the accumulated delta."""
+        boundary = self.resizing_boundary
+        if not boundary:
+            return
+        width, height = boundary.width, boundary.height
+        boundary.resize(width + dx, height + dy)
+        self.history.record(ResizeCommand(boundary.handle, boundary.width - width,
+                                          boundary.height - height))
 
     def _resize_stop(self, event: tk.Event) -> None:
         """End boundary resizing operation."""
+        self.scheduler.flush()
+        self.history.seal()
         if self.resizing_boundary:
             self.resizing_boundary = None
             self.resize_start = None
+            self._refresh_aggregates()
+            self._update_scroll_region()
+            self._sync_viewport()
 
     def _mouse_wheel_zoom(self, event: tk.Event) -> None:
         """Handle mouse wheel zoom events."""
-        # Get the current scale
-        current_scale = self.canvas.scale("all", 0, 0, 1, 1)
-        
         # Define zoom factor (adjust these values to change zoom sensitivity)
         zoom_factor = 1.1 if event.delta > 0 else 0.9
         
-        # Get the point to zoom around (mouse position)
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
-        
-        # Apply zoom
-        self.canvas.scale("all", x, y, zoom_factor, zoom_factor)
+        # Accumulate wheel ticks around the mouse position; the scheduler
+        # applies them once per frame
+        self.scheduler.post('zoom', self._apply_zoom, (zoom_factor, event.x, event.y),
+                            merge=compose_zoom)
+
+    def _apply_zoom(self, zoom_factor: float, x: float, y: float) -> None:
+        """Zoom by a factor, keeping the model point under a window position fixed.
+
+        The model stays authoritative: the drawn views are re-projected from
+        it under the new scale, or redrawn if a level-of-detail threshold was
+        crossed. The canvas scroll position carries the view offset.
+        """
+        viewport = self.viewport
+        old_tier = viewport.tier
+        model_x, model_y = viewport.to_model(self.canvas.canvasx(x), self.canvas.canvasy(y))
+        viewport.scale = min(max(viewport.scale * zoom_factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        if viewport.tier != old_tier:
+            self._redraw_views()
+        else:
+            for owner in self.materialized:
+                owner.reproject()
         
         # Update scroll region
-        bbox = self.canvas.bbox("all")
-        if bbox:
-            self.canvas.configure(scrollregion=bbox)
\ No newline at end of file
+        self._update_scroll_region()
+        self._scroll_to(model_x, model_y, x, y)
+        self._sync_viewport()
+
+    def _update_scroll_region(self) -> None:
+        """Fit the scroll region to the model's extent at the current zoom level."""
+        x1, y1, x2, y2 = 0, 0, self.SCROLL_SIZE, self.SCROLL_SIZE
+        extent = self.model.extent()
+        if extent:
+            # Leave room past the far edges to drag elements further out
+            padding = self.SCROLL_PADDING
+            x1, y1 = min(x1, extent[0]), min(y1, extent[1])
+            x2, y2 = max(x2, extent[2] + padding), max(y2, extent[3] + padding)
+        x1, y1 = self.viewport.to_canvas(x1, y1)
+        x2, y2 = self.viewport.to_canvas(x2, y2)
+        self.scroll_region = (x1, y1, x2, y2)
+        self.canvas.configure(scrollregion=self.scroll_region)
+
+    def _scroll_to(self, model_x: float, model_y: float, x: float, y: float) -> None:
+        """Scroll so that a model point appears at a window position."""
+        canvas_x, canvas_y = self.viewport.to_canvas(model_x, model_y)
+        x1, y1, x2, y2 = self.scroll_region
+        self.canvas.xview_moveto((canvas_x - x - x1) / (x2 - x1))
+        self.canvas.yview_moveto((canvas_y - y - y1) / (y2 - y1))
+
+    def _zoom_about_center(self, zoom_factor: float) -> None:
+        """Zoom around the middle of the visible area right away."""
+        # Apply pending wheel zoom first so the step starts from the shown scale
+        self.scheduler.flush()
+        self._apply_zoom(zoom_factor, self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2)
+
+    def zoom_in(self) -> None:
+        """Zoom in one step."""
+        self._zoom_about_center(self.ZOOM_STEP)
+
+    def zoom_out(self) -> None:
+        """Zoom out one step."""
+        self._zoom_about_center(1 / self.ZOOM_STEP)
+
+    def reset_zoom(self) -> None:
+        """Return to 100% zoom."""
+        self._zoom_about_center(1 / self.viewport.scale)
+
+    def get_zoom_level(self) -> float:
+        """Get the current zoom level, where 1.0 is 100%."""
+        return self.viewport.scale
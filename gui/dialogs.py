@@ -1,7 +1,8 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from typing import Callable, List
+from tkinter import ttk, messagebox, filedialog
+from typing import Callable, Dict, List
 from models import DeviceConfig, BoundaryConfig, ConnectionType
+from utils.bulk_import import IMPORT_FIELDS, Mapping, guess_mapping, read_table
 
 class DeviceDialog(tk.Toplevel):
     """Dialog for adding a new device."""
@@ -165,4 +166,163 @@ class BoundaryDialog(tk.Toplevel):
         height = self.winfo_height()
         x = (self.winfo_screenwidth() // 2) - (width // 2)
         y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f'{width}x{height}+{x}+{y}')
\ No newline at end of file
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+
+class ProgressDialog(tk.Toplevel):
+    """Dialog showing the progress of a long-running operation."""
+
+    def __init__(self, parent: tk.Tk, title: str, on_cancel: Callable[[], None]):
+        super().__init__(parent)
+        self.on_cancel = on_cancel
+        
+        self.title(title)
+        self.transient(parent)
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+        
+        self._create_widgets()
+        self._center_window()
+
+    def _create_widgets(self) -> None:
+        """Create dialog widgets."""
+        self.status_var = tk.StringVar(value="Starting...")
+        ttk.Label(self, textvariable=self.status_var, width=40).pack(padx=20, pady=(20, 5))
+        
+        self.progress_bar = ttk.Progressbar(self, length=300, maximum=1.0)
+        self.progress_bar.pack(padx=20, pady=5)
+        
+        ttk.Button(
+            self,
+            text="Cancel",
+            command=self._cancel
+        ).pack(pady=(10, 20))
+
+    def update_progress(self, fraction: float, status: str) -> None:
+        """Show the fraction done and a status message."""
+        self.progress_bar['value'] = fraction
+        self.status_var.set(status)
+
+    def _cancel(self) -> None:
+        """Cancel the operation and close the dialog."""
+        self.on_cancel()
+        self.destroy()
+
+    def _center_window(self) -> None:
+        """Center the dialog window on the screen."""
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+class BulkImportDialog(tk.Toplevel):
+    """Dialog for choosing a CSV/TSV file and mapping its columns to device fields."""
+
+    NONE = '(none)'
+    FIELD_LABELS = {
+        'name': "Name:", 'type': "Device Type:", 'ip': "IP Address:",
+        'mask': "Subnet Mask:", 'location': "Location:", 'x': "X:", 'y': "Y:",
+        'peer': "Connected To:", 'link_type': "Connection Type:",
+    }
+
+    def __init__(self, parent: tk.Tk, callback: Callable[[str, Mapping], None]):
+        super().__init__(parent)
+        self.callback = callback
+        self.header: List[str] = []
+        
+        self.title("Bulk Add Devices")
+        self.transient(parent)
+        self.grab_set()
+        
+        self._create_widgets()
+        self._center_window()
+
+    def _create_widgets(self) -> None:
+        """Create dialog widgets."""
+        # File field
+        file_frame = ttk.Frame(self)
+        file_frame.pack(padx=10, pady=10, fill=tk.X)
+        ttk.Label(file_frame, text="File:").pack(side=tk.LEFT)
+        self.file_var = tk.StringVar()
+        ttk.Entry(file_frame, textvariable=self.file_var, width=40, state='readonly').pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="Browse...", command=self._browse).pack(side=tk.LEFT)
+        
+        # Column mapping
+        mapping_frame = ttk.LabelFrame(self, text="Columns")
+        mapping_frame.pack(padx=10, pady=5, fill=tk.X)
+        self.field_vars: Dict[str, tk.StringVar] = {}
+        self.field_combos: Dict[str, ttk.Combobox] = {}
+        for row, field in enumerate(IMPORT_FIELDS):
+            ttk.Label(mapping_frame, text=self.FIELD_LABELS[field]).grid(row=row, column=0, sticky='w', padx=5, pady=2)
+            var = tk.StringVar(value=self.NONE)
+            combo = ttk.Combobox(mapping_frame, textvariable=var, values=[self.NONE], state='readonly')
+            combo.grid(row=row, column=1, sticky='ew', padx=5, pady=2)
+            self.field_vars[field] = var
+            self.field_combos[field] = combo
+        
+        # Buttons
+        button_frame = ttk.Frame(self)
+        button_frame.pack(pady=20)
+        
+        ttk.Button(
+            button_frame,
+            text="Import",
+            command=self._submit
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            button_frame,
+            text="Cancel",
+            command=self.destroy
+        ).pack(side=tk.LEFT, padx=5)
+
+    def _browse(self) -> None:
+        """Choose a file and prefill the mapping from its header row."""
+        filename = filedialog.askopenfilename(
+            parent=self,
+            filetypes=[("CSV files", "*.csv *.csv.gz"), ("TSV files", "*.tsv *.tsv.gz"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            header, rows = read_table(filename)
+            rows.close()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to read file: {e}", parent=self)
+            return
+        self.file_var.set(filename)
+        self.header = header
+        columns = [self.NONE] + [f"{index + 1}: {name}" for index, name in enumerate(header)]
+        guessed = guess_mapping(header)
+        for field, combo in self.field_combos.items():
+            combo['values'] = columns
+            self.field_vars[field].set(columns[guessed[field] + 1] if field in guessed else self.NONE)
+
+    def _submit(self) -> None:
+        """Handle form submission."""
+        filename = self.file_var.get()
+        if not filename:
+            messagebox.showerror("Error", "Choose a file to import!", parent=self)
+            return
+        mapping = {}
+        for field, var in self.field_vars.items():
+            value = var.get()
+            if value != self.NONE:
+                mapping[field] = int(value.split(':', 1)[0]) - 1
+        if 'name' not in mapping:
+            messagebox.showerror("Error", "A column must be chosen for the device name!", parent=self)
+            return
+        
+        self.destroy()
+        self.callback(filename, mapping)
+
+    def _center_window(self) -> None:
+        """Center the dialog window on the screen."""
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
@@ -0,0 +1,370 @@
+import sys
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from models.connection import Connection
+from models.device import Device
+from models.redraw import CanvasBatch, RedrawQueue
+
+if TYPE_CHECKING:
+    from .canvas_panel import CanvasPanel
+
+class Command:
+    """An undoable edit, stored as the change it made rather than a copy of the state.
+
+    Elements are referred to by model handle, so a command does not keep a
+    deleted view alive; commands whose element is gone do nothing.
+    """
+
+    def undo(self, history: 'UndoHistory') -> None:
+        raise NotImplementedError
+
+    def redo(self, history: 'UndoHistory') -> None:
+        raise NotImplementedError
+
+    def merge(self, other: 'Command') -> bool:
+        """Absorb a command that directly follows this one, if possible."""
+        return False
+
+    def size(self) -> int:
+        """Estimate the memory held by the command in bytes."""
+        fields = vars(self)
+        return sys.getsizeof(self) + sys.getsizeof(fields) + sum(
+            sys.getsizeof(value) for value in fields.values()
+        )
+
+class MoveCommand(Command):
+    """Devices or boundaries moved by a common delta."""
+
+    def __init__(self, kind: str, handles: List[int], dx: float, dy: float):
+        """Initialize the command.
+
+        Args:
+            kind: 'device' or 'boundary'
+            handles: Model handles of the moved elements
+            dx: Horizontal delta in model units
+            dy: Vertical delta in model units
+        """
+        self.kind = kind
+        self.handles = array('i', handles)
+        self.dx = dx
+        self.dy = dy
+
+    @classmethod
+    def for_view(cls, view: Any, dx: float, dy: float) -> 'MoveCommand':
+        return cls('device' if isinstance(view, Device) else 'boundary', [view.handle], dx, dy)
+
+    def _move(self, history: 'UndoHistory', dx: float, dy: float) -> None:
+        views = history.panel.device_views if self.kind == 'device' else history.panel.boundary_views
+        for handle in self.handles:
+            view = views.get(handle)
+            if view:
+                view.move(dx, dy)
+
+    def undo(self, history: 'UndoHistory') -> None:
+        self._move(history, -self.dx, -self.dy)
+
+    def redo(self, history: 'UndoHistory') -> None:
+        self._move(history, self.dx, self.dy)
+
+    def merge(self, other: Command) -> bool:
+        if (isinstance(other, MoveCommand) and other.kind == self.kind
+                and other.handles == self.handles):
+            self.dx += other.dx
+            self.dy += other.dy
+            return True
+        return False
+
+class ShiftCommand(Command):
+    """Devices each moved by their own delta, e.g. by an automatic layout."""
+
+    def __init__(self, handles: Iterable[int], dx: Iterable[float], dy: Iterable[float]):
+        self.handles = array('i', handles)
+        self.dx = array('d', dx)
+        self.dy = array('d', dy)
+
+    def _shift(self, history: 'UndoHistory', sign: float) -> None:
+        views = history.panel.device_views
+        for handle, dx, dy in zip(self.handles, self.dx, self.dy):
+            view = views.get(handle)
+            if view:
+                view.move(sign * dx, sign * dy)
+
+    def undo(self, history: 'UndoHistory') -> None:
+        self._shift(history, -1.0)
+
+    def redo(self, history: 'UndoHistory') -> None:
+        self._shift(history, 1.0)
+
+class ResizeCommand(Command):
+    """A boundary resized by a delta."""
+
+    def __init__(self, handle: int, dw: float, dh: float):
+        self.handle = handle
+        self.dw = dw
+        self.dh = dh
+
+    def _resize(self, history: 'UndoHistory', dw: float, dh: float) -> None:
+        boundary = history.panel.boundary_views.get(self.handle)
+        if boundary:
+            boundary.resize(boundary.width + dw, boundary.height + dh)
+
+    def undo(self, history: 'UndoHistory') -> None:
+        self._resize(history, -self.dw, -self.dh)
+
+    def redo(self, history: 'UndoHistory') -> None:
+        self._resize(history, self.dw, self.dh)
+
+    def merge(self, other: Command) -> bool:
+        if isinstance(other, ResizeCommand) and other.handle == self.handle:
+            self.dw += other.dw
+            self.dh += other.dh
+            return True
+        return False
+
+class ConnectionCommand(Command):
+    """A connection created or deleted.
+
+    Recreating a connection gives it a new link handle, since handles are
+    never reused; the history maps the old handle to the new one so that
+    earlier commands still find it.
+    """
+
+    def __init__(self, connection: Connection, created: bool):
+        self.handle = connection.handle
+        self.device1 = connection.device1.handle
+        self.device2 = connection.device2.handle
+        self.connection_type = connection.connection_type
+        self.created = created
+
+    def _create(self, history: 'UndoHistory') -> None:
+        views = history.panel.device_views
+        device1 = views.get(self.device1)
+        device2 = views.get(self.device2)
+        if device1 and device2:
+            connection = history.panel.connect(device1, device2, self.connection_type)
+            history.link_aliases[history.resolve_link(self.handle)] = connection.handle
+
+    def _delete(self, history: 'UndoHistory') -> None:
+        connection = history.find_connection(self.device1, history.resolve_link(self.handle))
+        if connection:
+            history.panel.remove_connection(connection)
+
+    def undo(self, history: 'UndoHistory') -> None:
+        if self.created:
+            self._delete(history)
+        else:
+            self._create(history)
+
+    def redo(self, history: 'UndoHistory') -> None:
+        if self.created:
+            self._create(history)
+        else:
+            self._delete(history)
+
+class PropertiesCommand(Command):
+    """Descriptive fields of a device or boundary changed.
+
+    Only the fields that changed are kept, as (old, new) pairs.
+    """
+
+    def __init__(self, view: Any, changes: Dict[str, Tuple[Any, Any]]):
+        self.kind = 'device' if isinstance(view, Device) else 'boundary'
+        self.handle = view.handle
+        self.changes = changes
+
+    @classmethod
+    def capture(cls, view: Any, new_fields: Dict[str, Any]) -> Optional['PropertiesCommand']:
+        """Build the command for setting a view's config fields, or None if nothing changes."""
+        changes = {
+            field: (getattr(view.config, field), value)
+            for field, value in new_fields.items()
+            if getattr(view.config, field) != value
+        }
+        return cls(view, changes) if changes else None
+
+    def apply(self, history: 'UndoHistory', index: int) -> None:
+        views = history.panel.device_views if self.kind == 'device' else history.panel.boundary_views
+        view = views.get(self.handle)
+        if view:
+            for field, values in self.changes.items():
+                setattr(view.config, field, values[index])
+            view.update_appearance()
+
+    def undo(self, history: 'UndoHistory') -> None:
+        self.apply(history, 0)
+
+    def redo(self, history: 'UndoHistory') -> None:
+        self.apply(history, 1)
+
+    def size(self) -> int:
+        return super().size() + sum(
+            sys.getsizeof(old) + sys.getsizeof(new) for old, new in self.changes.values()
+        )
+
+class CompoundCommand(Command):
+    """Several commands undone and redone as one entry."""
+
+    def __init__(self, commands: List[Command]):
+        self.commands = commands
+
+    def undo(self, history: 'UndoHistory') -> None:
+        for command in reversed(self.commands):
+            command.undo(history)
+
+    def redo(self, history: 'UndoHistory') -> None:
+        for command in self.commands:
+            command.redo(history)
+
+    def size(self) -> int:
+        return super().size() + sum(command.size() for command in self.commands)
+
+class UndoHistory:
+    """Undo and redo stacks of commands for a canvas panel, capped by memory.
+
+    Commands recorded while an entry is open merge into it when they can, so
+    the per-frame deltas of one drag become a single entry; ``seal()`` closes
+    the entry when the gesture ends. Once the recorded commands use more
+    than ``max_bytes``, the oldest entries are dropped. Applying an entry
+    updates the canvas once, however many elements it touches.
+    """
+
+    DEFAULT_MAX_BYTES = 4 << 20
+
+    def __init__(self, panel: 'CanvasPanel', max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize the history.
+
+        Args:
+            panel: Panel whose views the commands edit
+            max_bytes: Memory budget for both stacks
+        """
+        self.panel = panel
+        self.max_bytes = max_bytes
+        self.undo_stack: Deque[Tuple[Command, int]] = deque()
+        self.redo_stack: List[Tuple[Command, int]] = []
+        self.bytes = 0
+        self.link_aliases: Dict[int, int] = {}
+        self.applying = False
+        self._open = False
+        self._group: Optional[List[Command]] = None
+
+    def record(self, command: Command) -> None:
+        """Add a command for an edit that has just been made."""
+        if self.applying:
+            return
+        if self._group is not None:
+            self._group.append(command)
+            return
+        if self._open and self.undo_stack:
+            top, size = self.undo_stack[-1]
+            if top.merge(command):
+                new_size = top.size()
+                self.undo_stack[-1] = (top, new_size)
+                self.bytes += new_size - size
+                return
+        self._drop_redo()
+        size = command.size()
+        self.undo_stack.append((command, size))
+        self.bytes += size
+        self._open = True
+        self._trim()
+
+    def seal(self) -> None:
+        """Stop merging new commands into the latest entry."""
+        self._open = False
+
+    @contextmanager
+    def group(self) -> Iterator[None]:
+        """Record the commands of a bulk edit as a single entry."""
+        if self._group is not None:
+            # Nested groups join the outer one
+            yield
+            return
+        self._group = []
+        try:
+            yield
+        finally:
+            commands, self._group = self._group, None
+            if commands:
+                self.seal()
+                self.record(commands[0] if len(commands) == 1 else CompoundCommand(commands))
+                self.seal()
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def undo(self) -> bool:
+        """Undo the latest entry.
+
+        Returns:
+            bool: False if there was nothing to undo
+        """
+        if not self.undo_stack:
+            return False
+        entry = self.undo_stack.pop()
+        self._apply(entry[0].undo)
+        self.redo_stack.append(entry)
+        return True
+
+    def redo(self) -> bool:
+        """Redo the latest undone entry.
+
+        Returns:
+            bool: False if there was nothing to redo
+        """
+        if not self.redo_stack:
+            return False
+        entry = self.redo_stack.pop()
+        self._apply(entry[0].redo)
+        self.undo_stack.append(entry)
+        return True
+
+    def clear(self) -> None:
+        """Forget all entries, e.g. when the topology is replaced."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes = 0
+        self.link_aliases.clear()
+        self._open = False
+
+    def resolve_link(self, handle: int) -> int:
+        """Get the current handle of a link that may have been recreated."""
+        while handle in self.link_aliases:
+            handle = self.link_aliases[handle]
+        return handle
+
+    def find_connection(self, device: int, link: int) -> Optional[Connection]:
+        """Find the view of a link through one of its devices."""
+        view = self.panel.device_views.get(device)
+        if view:
+            for connection in view.connections:
+                if connection.handle == link:
+                    return connection
+        return None
+
+    def _apply(self, action) -> None:
+        """Run an undo or redo, then update the canvas in one pass."""
+        self.seal()
+        self.applying = True
+        try:
+            with CanvasBatch.for_canvas(self.panel.canvas).collect():
+                action(self)
+        finally:
+            self.applying = False
+        RedrawQueue.for_canvas(self.panel.canvas).flush()
+        self.panel.refresh_view()
+
+    def _drop_redo(self) -> None:
+        for _, size in self.redo_stack:
+            self.bytes -= size
+        self.redo_stack.clear()
+
+    def _trim(self) -> None:
+        """Drop the oldest entries while over budget, keeping the newest."""
+        while self.bytes > self.max_bytes and len(self.undo_stack) > 1:
+            _, size = self.undo_stack.popleft()
+            self.bytes -= size
@@ -0,0 +1,151 @@
+import time
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from models.boundary import Boundary
+from models.device import Device
+from models.layout import BoundaryRect, LayoutResult
+from models.redraw import CanvasBatch, RedrawQueue
+from .canvas_panel import CanvasPanel
+from .history import MoveCommand, ResizeCommand, ShiftCommand
+
+class LayoutAnimator:
+    """Moves devices and boundaries to the positions computed by a layout.
+
+    The drawn views glide into place over a few frames scheduled with
+    ``after()``. Each frame moves every animated view in a single canvas
+    batch, so a frame costs one Tcl round trip however many devices move.
+    Undrawn views, and every view once more than ``MAX_ANIMATED`` are drawn,
+    jump straight to their place. Boundary containment is deferred until
+    the end, and the whole layout is recorded as one undo entry.
+    """
+
+    DURATION = 0.5
+    FRAME_INTERVAL = 16
+    MAX_ANIMATED = 3000
+
+    def __init__(self, panel: CanvasPanel, result: LayoutResult,
+                 on_finish: Optional[Callable[[], None]] = None):
+        """Initialize the animator.
+
+        Args:
+            panel: Panel whose views are moved
+            result: Layout to apply
+            on_finish: Called once every view is in place
+        """
+        self.panel = panel
+        self.result = result
+        self.on_finish = on_finish
+        self.running = False
+        self._after_id: Optional[str] = None
+        self._start = 0.0
+        self._done = 0.0
+        self._devices: List[Device] = []
+        self._dx = np.zeros(0)
+        self._dy = np.zeros(0)
+        self._boundaries: List[Tuple[Boundary, BoundaryRect, BoundaryRect]] = []
+        self._containment = panel.model.containment
+
+    def start(self) -> None:
+        """Start moving the views."""
+        panel = self.panel
+        views = panel.device_views
+        dx, dy = self.result.deltas(panel.model)
+        moved = np.flatnonzero((dx != 0) | (dy != 0))
+        present = [i for i in moved if int(self.result.handles[i]) in views]
+        animated = [i for i in present if views[int(self.result.handles[i])].materialized]
+        if len(animated) > self.MAX_ANIMATED:
+            animated = []
+        jumping = sorted(set(present) - set(animated))
+
+        self.running = True
+        self._containment = panel.model.containment
+        self._containment.defer()
+        self._record(present, dx, dy)
+        self._devices = [views[int(self.result.handles[i])] for i in animated]
+        self._dx, self._dy = dx[animated], dy[animated]
+        self._boundaries = []
+        for handle, rect in self.result.boundaries.items():
+            boundary = panel.boundary_views.get(handle)
+            if boundary:
+                x1, y1, x2, y2 = boundary.model.boundary_rect(handle)
+                self._boundaries.append((boundary, (x1, y1, x2 - x1, y2 - y1), rect))
+
+        with CanvasBatch.for_canvas(panel.canvas).collect():
+            for i in jumping:
+                views[int(self.result.handles[i])].move(float(dx[i]), float(dy[i]))
+        self._start = time.perf_counter()
+        self._done = 0.0
+        self._frame()
+
+    def finish(self) -> None:
+        """Move every view to its final place now."""
+        if not self.running or self._cleared():
+            return
+        self._step(1.0)
+        self._stop()
+
+    def _cleared(self) -> bool:
+        """Stop if the panel was cleared since starting, taking the views with it."""
+        if self.panel.model.containment is self._containment:
+            return False
+        if self._after_id is not None:
+            self.panel.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self.running = False
+        return True
+
+    #region Frames
+    def _frame(self) -> None:
+        self._after_id = None
+        if self._cleared():
+            return
+        fraction = min(1.0, (time.perf_counter() - self._start) / self.DURATION)
+        self._step(fraction)
+        if fraction < 1.0:
+            self._after_id = self.panel.canvas.after(self.FRAME_INTERVAL, self._frame)
+        else:
+            self._stop()
+
+    def _step(self, fraction: float) -> None:
+        """Advance the views to an eased fraction of the way."""
+        eased = 1 - (1 - fraction) ** 3
+        share = eased - self._done
+        self._done = eased
+        with CanvasBatch.for_canvas(self.panel.canvas).collect():
+            alive = self.panel.model.device_alive
+            for device, dx, dy in zip(self._devices, (self._dx * share).tolist(), (self._dy * share).tolist()):
+                if alive[device.handle]:
+                    device.move(dx, dy)
+            boundary_alive = self.panel.model.boundary_alive
+            for boundary, (x, y, width, height), (nx, ny, nwidth, nheight) in self._boundaries:
+                if not boundary_alive[boundary.handle]:
+                    continue
+                bx, by = boundary.x, boundary.y
+                boundary.move(x + (nx - x) * eased - bx, y + (ny - y) * eased - by)
+                boundary.resize(width + (nwidth - width) * eased, height + (nheight - height) * eased)
+            RedrawQueue.for_canvas(self.panel.canvas).flush()
+
+    def _stop(self) -> None:
+        if self._after_id is not None:
+            self.panel.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self.running = False
+        self._containment.resume()
+        self.panel.refresh_view()
+        if self.on_finish:
+            self.on_finish()
+    #endregion
+
+    def _record(self, rows: List[int], dx: np.ndarray, dy: np.ndarray) -> None:
+        """Record the whole layout as one undo entry."""
+        history = self.panel.history
+        with history.group():
+            if rows:
+                history.record(ShiftCommand(self.result.handles[rows].tolist(),
+                                            dx[rows].tolist(), dy[rows].tolist()))
+            for handle, (nx, ny, nwidth, nheight) in self.result.boundaries.items():
+                boundary = self.panel.boundary_views.get(handle)
+                if boundary:
+                    x1, y1, x2, y2 = boundary.model.boundary_rect(handle)
+                    history.record(MoveCommand('boundary', [handle], nx - x1, ny - y1))
+                    history.record(ResizeCommand(handle, nwidth - (x2 - x1), nheight - (y2 - y1)))
@@ -1,4 +1,5 @@
 from typing import Dict, Any
+import os
 import tkinter as tk
 from tkinter import Tk, Frame, Menu, ttk, messagebox, filedialog, BOTH, LEFT, TOP, X, Y
 from typing import Optional, Callable
@@ -6,6 +7,7 @@ from typing import Optional, Callable
 from .menu_bar import MenuBar
 from .toolbar import Toolbar
 from .canvas_panel import CanvasPanel
+from .layout_animator import LayoutAnimator
 from .properties_panel import PropertiesPanel
 
 from models.device import Device
@@ -13,7 +15,12 @@ from models.boundary import Boundary
 from models.connection import Connection
 from models.enums import ConnectionType
 from models.config import DeviceConfig, BoundaryConfig
-import json
+from models.layered_layout import LayeredLayout
+from models.layout import ForceLayout, LayoutResult
+from models.paths import PathFinder
+from utils.bulk_import import import_file
+from utils.file_handler import FileHandler
+from utils.journal import TopologyJournal, has_journal, recover_topology
 
 class DeviceConfig:
     def __init__(self, name: str, device_type: str):
@@ -28,10 +35,18 @@ class BoundaryConfig:
 class NetworkTopologyGUI:
     """Main application window class."""
 
+    PATH_ALTERNATIVES = 3
+    JOURNAL_CHECK_INTERVAL = 2000
+
     def __init__(self, root: Tk):
         self.root = root
+        self.loader = None
+        self.journal = None
+        self.layout_animator = None
         self._create_widgets()
         self._create_menu()
+        self.root.protocol("WM_DELETE_WINDOW", self._exit)
+        self.root.after(self.JOURNAL_CHECK_INTERVAL, self._check_journal)
 
     def _create_callbacks(self) -> Dict[str, Any]:
         """Create callback registry for GUI components."""
@@ -41,8 +56,12 @@ class NetworkTopologyGUI:
             'load_topology': self._load_topology,
             'save_topology': self._save_topology,
             'export_topology': self._export_topology,
+            'exit': self._exit,
             
             # Edit operations
+            'undo': self._undo,
+            'redo': self._redo,
+            'record_command': self._record_command,
             'delete_selected': self._delete_selected,
             'select_all': self._select_all,
             
@@ -50,6 +69,18 @@ class NetworkTopologyGUI:
             'zoom_in': self._zoom_in,
             'zoom_out': self._zoom_out,
             'reset_zoom': self._reset_zoom,
+            'toggle_routing': self._toggle_routing,
+            
+            # Arrange operations
+            'auto_layout': self._auto_layout,
+            'layered_layout': self._layered_layout,
+            'layered_subtree': self._layered_subtree,
+            
+            # Analyze operations
+            'network_summary': self._network_summary,
+            'find_paths': self._start_path_mode,
+            'show_paths': self._show_paths,
+            'clear_path': self._clear_path,
             
             # Device operations
             'add_device': self._show_add_device_dialog,
@@ -103,13 +134,16 @@ class NetworkTopologyGUI:
         # Create properties panel
         properties_frame = ttk.Frame(self.paned_window)
         self.paned_window.add(properties_frame, weight=1)
-        self.properties_panel = PropertiesPanel(properties_frame)
+        self.properties_panel = PropertiesPanel(properties_frame, self.callbacks)
 
     def _bind_shortcuts(self) -> None:
         """Bind keyboard shortcuts to actions."""
         self.root.bind('<Control-n>', self.callbacks['new_topology'])
         self.root.bind('<Control-o>', self.callbacks['load_topology'])
         self.root.bind('<Control-s>', self.callbacks['save_topology'])
+        self.root.bind('<Control-z>', self.callbacks['undo'])
+        self.root.bind('<Control-y>', self.callbacks['redo'])
+        self.root.bind('<Control-Z>', self.callbacks['redo'])
         self.root.bind('<Delete>', self.callbacks['delete_selected'])
         self.root.bind('<Control-a>', self.callbacks['select_all'])
         self.root.bind('<Control-plus>', self.callbacks['zoom_in'])
@@ -124,40 +158,136 @@ class NetworkTopologyGUI:
                 "Are you sure you want to create a new topology? All unsaved changes will be lost."):
                 return
         
+        self._close_journal()
         self.canvas_panel.clear()
         self.properties_panel._show_default_message()
 
     def _load_topology(self, event=None) -> None:
-        """Load a topology from a file."""
-        # Implementation will be added with file handling utilities
-        pass
-
-    def _save_topology(self, event=None) -> None:
-        """Save the current topology to a file."""
-        # Implementation will be added with file handling utilities
-        def _save_topology_as(event=None) -> None:
-            """Save the current topology to a new file."""
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".ntd",
-                filetypes=[("Network Topology Designer files", "*.ntd"), ("All files", "*.*")]
-            )
-            
-            if not filename:
+        """Load a topology from a file in the background."""
+        from .dialogs import ProgressDialog
+        from .topology_loader import TopologyLoader
+        if self.loader and self.loader.running:
+            return
+        if self.canvas_panel.devices or self.canvas_panel.boundaries:
+            if not messagebox.askyesno("Load Topology",
+                "Are you sure you want to load a topology? All unsaved changes will be lost."):
                 return
+        
+        filename = filedialog.askopenfilename(
+            filetypes=[
+                ("Topology files", "*.json *.ntdb *.gz *.bz2 *.xz *.lzma"),
+                ("All files", "*.*")
+            ]
+        )
+        if not filename:
+            return
+        self._close_journal()
+        if has_journal(filename) and messagebox.askyesno("Recover Topology",
+                "This topology has changes from a session that did not end cleanly. Recover them?"):
+            try:
+                model = recover_topology(filename)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Failed to recover topology: {e}")
+                return
+            self.canvas_panel.load_model(model)
+            self.properties_panel._show_default_message()
+            self._update_zoom_display()
+            self._open_journal(filename)
+            return
+        name = os.path.basename(filename)
+
+        def on_progress(fraction):
+            dialog.update_progress(fraction, f"Loading {name}... {fraction:.0%}")
+
+        def on_finish(error):
+            dialog.destroy()
+            self.properties_panel._show_default_message()
+            self._update_zoom_display()
+            if error:
+                messagebox.showerror("Error", f"Failed to load topology: {error}")
+            else:
+                self._open_journal(filename)
+
+        def on_cancel():
+            self.loader.cancel()
+            self.properties_panel._show_default_message()
+
+        self.loader = TopologyLoader(self.canvas_panel, filename, on_progress, on_finish)
+        dialog = ProgressDialog(self.root, "Loading Topology", on_cancel)
+        self.loader.start()
 
-            topology_data = {
-                'devices': [device.to_dict() for device in self.canvas_panel.devices],
-                'boundaries': [boundary.to_dict() for boundary in self.canvas_panel.boundaries],
-                'connections': [connection.to_dict() for connection in self.canvas_panel.connections]
-            }
+    def _save_topology(self, event=None) -> None:
+        """Save the current topology to a file.
+
+        Once saved, edits are appended to the file's journal as they are
+        made, so saving again only needs to fold the journal into the file.
+        """
+        self._stop_failed_journal()
+        if self.journal:
+            self.journal.compact()
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[
+                ("Topology files", "*.json *.ntdb *.gz *.bz2 *.xz *.lzma"),
+                ("All files", "*.*")
+            ]
+        )
+        if not filename:
+            return
+        try:
+            FileHandler.save_model(self.canvas_panel.model, filename)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to save topology: {str(e)}")
+            return
+        self._open_journal(filename)
+
+    def _open_journal(self, filename: str) -> None:
+        """Start journaling edits for a file that holds the current topology."""
+        try:
+            self.journal = TopologyJournal(self.canvas_panel.model, filename)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to start autosave: {str(e)}")
+
+    def _close_journal(self) -> bool:
+        """Fold the journal into its file and stop journaling.
+
+        Returns:
+            bool: False if journaled edits could not be saved
+        """
+        if not self.journal:
+            return True
+        self.journal.close()
+        error = self.journal.error
+        self.journal = None
+        if error:
+            messagebox.showerror("Error", f"Failed to save journaled changes: {error}")
+        return error is None
+
+    def _check_journal(self) -> None:
+        """Periodically make sure autosave is still working."""
+        self._stop_failed_journal()
+        self.root.after(self.JOURNAL_CHECK_INTERVAL, self._check_journal)
+
+    def _stop_failed_journal(self) -> None:
+        """Stop journaling and warn the user if the journal could not be written."""
+        if not self.journal or self.journal.error is None:
+            return
+        error = self.journal.error
+        self.journal.close(compact=False)
+        self.journal = None
+        messagebox.showwarning(
+            "Autosave Stopped",
+            f"Changes can no longer be autosaved: {error}\n"
+            "Save the topology to keep your changes."
+        )
 
-            try:
-                with open(filename, 'w') as f:
-                    json.dump(topology_data, f, indent=4)
-                messagebox.showinfo("Success", "Topology saved successfully.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save topology: {str(e)}")
-        _save_topology_as()
+    def _exit(self, event=None) -> None:
+        """Save journaled edits and close the application."""
+        if not self._close_journal() and not messagebox.askyesno(
+                "Exit", "Your latest changes were not saved. Exit anyway?"):
+            return
+        self.root.destroy()
 
     def _export_topology(self, event=None) -> None:
         """Export the topology as an image."""
@@ -165,6 +295,23 @@ class NetworkTopologyGUI:
         pass
 
     # Edit operations
+    def _undo(self, event=None) -> None:
+        """Undo the latest edit."""
+        self._finish_layout()
+        if self.canvas_panel.history.undo():
+            self.properties_panel._show_default_message()
+
+    def _redo(self, event=None) -> None:
+        """Redo the latest undone edit."""
+        self._finish_layout()
+        if self.canvas_panel.history.redo():
+            self.properties_panel._show_default_message()
+
+    def _record_command(self, command) -> None:
+        """Add an edit made outside the canvas to the undo history."""
+        self.canvas_panel.history.record(command)
+        self.canvas_panel.history.seal()
+
     def _delete_selected(self, event=None) -> None:
         """Delete the currently selected items."""
         self.canvas_panel.delete_selected()
@@ -175,6 +322,10 @@ class NetworkTopologyGUI:
         self.canvas_panel.select_all()
 
     # View operations
+    def _toggle_routing(self, event=None) -> None:
+        """Switch connections between straight lines and orthogonal routes."""
+        self.canvas_panel.set_routing(self.canvas_panel.viewport.router is None)
+
     def _zoom_in(self, event=None) -> None:
         """Increase the zoom level."""
         self.canvas_panel.zoom_in()
@@ -193,7 +344,76 @@ class NetworkTopologyGUI:
     def _update_zoom_display(self) -> None:
         """Update the zoom level display in the toolbar."""
         zoom_level = self.canvas_panel.get_zoom_level()
-        self.toolbar.update_zoom_label(zoom_level)
+        self.toolbar.update_zoom_label(round(zoom_level * 100))
+
+    # Arrange operations
+    def _auto_layout(self, event=None) -> None:
+        """Arrange all devices with the force-directed layout."""
+        self._apply_layout(ForceLayout(self.canvas_panel.model).compute)
+
+    def _layered_layout(self, event=None) -> None:
+        """Arrange all devices in layers by role."""
+        self._apply_layout(LayeredLayout(self.canvas_panel.model).compute)
+
+    def _layered_subtree(self, event=None) -> None:
+        """Rearrange in layers only the devices below the selected device."""
+        device = next((view for view in self.canvas_panel.device_views.values() if view.selected), None)
+        if device is None:
+            messagebox.showinfo("Layered Layout", "Select the device whose subtree to arrange.")
+            return
+        layout = LayeredLayout(self.canvas_panel.model)
+        self._apply_layout(lambda: layout.compute_subtree(device.handle))
+
+    def _apply_layout(self, compute: Callable[[], LayoutResult]) -> None:
+        """Compute a layout and animate the devices into place."""
+        self._finish_layout()
+        if not self.canvas_panel.model.device_count:
+            return
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        try:
+            result = compute()
+        finally:
+            self.root.config(cursor="")
+        self.layout_animator = LayoutAnimator(self.canvas_panel, result)
+        self.layout_animator.start()
+
+    def _finish_layout(self) -> None:
+        """Complete a running layout animation at once."""
+        if self.layout_animator:
+            self.layout_animator.finish()
+            self.layout_animator = None
+
+    # Analyze operations
+    def _network_summary(self, event=None) -> None:
+        """Show connectivity figures of the topology in the properties panel."""
+        self.properties_panel.show_network_summary(self.canvas_panel.model)
+
+    def _start_path_mode(self, event=None) -> None:
+        """Enter path mode; the paths are shown once both ends are clicked."""
+        self.canvas_panel.start_path_mode()
+
+    def _show_paths(self, device1: Device, device2: Device) -> None:
+        """Highlight the cheapest path between two devices and list the alternatives."""
+        model = self.canvas_panel.model
+        paths = PathFinder.for_model(model).k_shortest_paths(
+            device1.handle, device2.handle, self.PATH_ALTERNATIVES
+        )
+        if not paths:
+            self.canvas_panel.highlight_path(())
+            messagebox.showinfo(
+                "Find Paths",
+                f"{device1.config.name} and {device2.config.name} are not connected."
+            )
+            return
+        self.canvas_panel.highlight_path(paths[0].links)
+        self.properties_panel.show_paths(
+            model, paths, lambda path: self.canvas_panel.highlight_path(path.links)
+        )
+
+    def _clear_path(self, event=None) -> None:
+        """Restore the style of the highlighted path's connections."""
+        self.canvas_panel.highlight_path(())
 
     # Device operations
     def _show_add_device_dialog(self) -> None:
@@ -202,7 +422,8 @@ class NetworkTopologyGUI:
         def on_device_added(config):
             from models.device import Device
             # Pass the canvas object from canvas_panel instead of 100.
-            device = Device(self.canvas_panel.canvas, 100, 100, config)
+            device = Device(self.canvas_panel.canvas, 100, 100, config,
+                            model=self.canvas_panel.model)
             self.canvas_panel.add_device(device)
 
         dialog = DeviceDialog(self.root, on_device_added)
@@ -210,10 +431,34 @@ class NetworkTopologyGUI:
 
 
     def _show_bulk_add_dialog(self) -> None:
-        """Show dialog for bulk adding devices."""
-        from tkinter import messagebox
-        # For now, simply show a message that bulk add is not implemented.
-        messagebox.showinfo("Bulk Add", "Bulk add functionality is not implemented yet.")
+        """Show dialog for bulk adding devices from a CSV/TSV file."""
+        from .dialogs import BulkImportDialog
+        dialog = BulkImportDialog(self.root, self._bulk_import)
+        self.root.wait_window(dialog)
+
+    def _bulk_import(self, filename: str, mapping: Dict[str, int]) -> None:
+        """Import devices and links, placing unpositioned devices right of the topology."""
+        panel = self.canvas_panel
+        extent = panel.model.extent()
+        origin = (extent[2] + 100, extent[1]) if extent else (100, 100)
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        try:
+            result = import_file(panel.model, filename, mapping, origin)
+            panel.add_model_elements(result.devices, result.links)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Failed to import devices: {e}")
+            return
+        finally:
+            self.root.config(cursor="")
+        summary = f"Added {len(result.devices)} devices and {len(result.links)} connections."
+        if result.skipped:
+            details = "\n".join(f"Line {line}: {reason}" for line, reason in result.skipped[:10])
+            more = len(result.skipped) - 10
+            if more > 0:
+                details += f"\n... and {more} more"
+            summary += f"\n\nSkipped {len(result.skipped)}:\n{details}"
+        messagebox.showinfo("Bulk Add", summary)
 
     def _show_device_properties(self, device: Device) -> None:
         """Show properties for the selected device."""
@@ -241,7 +486,8 @@ class NetworkTopologyGUI:
             y=y,
             width=width,
             height=height,
-            config=config
+            config=config,
+            model=self.canvas_panel.model
         )
         self.canvas_panel.add_boundary(boundary)
 
@@ -256,8 +502,13 @@ class NetworkTopologyGUI:
 
     def _create_connection(self, device1: Device, device2: Device) -> None:
         """Create a connection between two devices."""
-        # Implementation will be added with connection dialog
-        pass
+        from .connection_dialog import ConnectionDialog
+        def on_connection_selected(device1, device2, connection_type):
+            self.canvas_panel.connect(device1, device2, connection_type)
+            self.canvas_panel.history.seal()
+
+        dialog = ConnectionDialog(self.root, device1, device2, on_connection_selected)
+        self.root.wait_window(dialog)
 
     # Help operations
     def _show_about_dialog(self) -> None:
@@ -21,6 +21,8 @@ class MenuBar:
         self._create_file_menu()
         self._create_edit_menu()
         self._create_view_menu()
+        self._create_arrange_menu()
+        self._create_analyze_menu()
         self._create_help_menu()
 
     def _create_file_menu(self) -> None:
@@ -51,7 +53,7 @@ class MenuBar:
         file_menu.add_separator()
         file_menu.add_command(
             label="Exit",
-            command=self.root.quit
+            command=self.callbacks.get('exit', self.root.quit)
         )
 
     def _create_edit_menu(self) -> None:
@@ -59,6 +61,17 @@ class MenuBar:
         edit_menu = tk.Menu(self.menubar, tearoff=0)
         self.menubar.add_cascade(label="Edit", menu=edit_menu)
         
+        edit_menu.add_command(
+            label="Undo",
+            command=self.callbacks.get('undo'),
+            accelerator="Ctrl+Z"
+        )
+        edit_menu.add_command(
+            label="Redo",
+            command=self.callbacks.get('redo'),
+            accelerator="Ctrl+Y"
+        )
+        edit_menu.add_separator()
         edit_menu.add_command(
             label="Delete Selected",
             command=self.callbacks.get('delete_selected'),
@@ -90,6 +103,48 @@ class MenuBar:
             command=self.callbacks.get('reset_zoom'),
             accelerator="Ctrl+0"
         )
+        view_menu.add_separator()
+        view_menu.add_checkbutton(
+            label="Orthogonal Connections",
+            command=self.callbacks.get('toggle_routing')
+        )
+
+    def _create_arrange_menu(self) -> None:
+        """Create the Arrange menu."""
+        arrange_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Arrange", menu=arrange_menu)
+        
+        arrange_menu.add_command(
+            label="Auto Layout",
+            command=self.callbacks.get('auto_layout')
+        )
+        arrange_menu.add_command(
+            label="Layered Layout",
+            command=self.callbacks.get('layered_layout')
+        )
+        arrange_menu.add_command(
+            label="Layered Layout Below Selection",
+            command=self.callbacks.get('layered_subtree')
+        )
+
+    def _create_analyze_menu(self) -> None:
+        """Create the Analyze menu."""
+        analyze_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="Analyze", menu=analyze_menu)
+        
+        analyze_menu.add_command(
+            label="Network Summary",
+            command=self.callbacks.get('network_summary')
+        )
+        analyze_menu.add_separator()
+        analyze_menu.add_command(
+            label="Find Paths...",
+            command=self.callbacks.get('find_paths')
+        )
+        analyze_menu.add_command(
+            label="Clear Path Highlight",
+            command=self.callbacks.get('clear_path')
+        )
 
     def _create_help_menu(self) -> None:
         """Create the Help menu."""
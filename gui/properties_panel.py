@@ -1,8 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from models.device import Device
 from models.boundary import Boundary
+from models.graph import TopologyGraph
+from models.paths import NetworkPath
+from models.topology import TopologyModel
+from .history import PropertiesCommand
 
 class PropertiesPanel:
     """Handles the properties panel for displaying and editing device/boundary properties."""
@@ -10,8 +14,15 @@ class PropertiesPanel:
     DEVICE_TYPES = ['router', 'switch', 'firewall', 'server', 'client', 'access_point']
     BOUNDARY_COLORS = ['#E0E0E0', '#FFE0B2', '#C8E6C9', '#B3E0F2', '#F8BBD0']
 
-    def __init__(self, parent: ttk.Frame):
-        """Initialize the properties panel."""
+    def __init__(self, parent: ttk.Frame, callbacks: Optional[Dict[str, Callable[..., Any]]] = None):
+        """Initialize the properties panel.
+        
+        Args:
+            parent: Parent frame to contain the panel
+            callbacks: Dictionary of callback functions; 'record_command'
+                receives the undoable command for each applied change
+        """
+        self.callbacks = callbacks or {}
         # Create main frame
         self.frame = ttk.LabelFrame(parent, text="Properties")
         self.frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -77,6 +88,9 @@ class PropertiesPanel:
         self._create_property_fields(properties)
         self._create_apply_button(self._apply_device_changes)
 
+        # Show where the device stands in the network
+        self._show_connectivity(device)
+
     def show_boundary_properties(self, boundary: Boundary) -> None:
         """Display properties for a boundary."""
         self._clear_content()
@@ -98,6 +112,85 @@ class PropertiesPanel:
         # Show contained devices
         self._show_contained_devices(boundary)
 
+    def show_network_summary(self, model: TopologyModel) -> None:
+        """Display connectivity figures for the whole topology."""
+        self._clear_content()
+        self.current_item = None
+        self._create_header("Network Summary")
+        summary = TopologyGraph.for_model(model).summary()
+        degrees = summary.degrees
+        self._create_info_rows("Topology", [
+            ("Devices:", str(summary.devices)),
+            ("Connections:", str(summary.links)),
+            ("Components:", str(summary.components)),
+            ("Largest component:", str(summary.largest_component)),
+        ])
+        self._create_info_rows("Connections per Device", [
+            ("Minimum:", str(degrees.minimum)),
+            ("Maximum:", str(degrees.maximum)),
+            ("Mean:", f"{degrees.mean:.2f}"),
+            ("Median:", f"{degrees.median:g}"),
+            ("Unconnected devices:", str(degrees.isolated)),
+        ])
+        self._create_info_rows("Single Points of Failure", [
+            ("Critical devices:", str(summary.articulation_points)),
+            ("Critical connections:", str(summary.bridges)),
+        ])
+
+    def show_paths(self, model: TopologyModel, paths: List[NetworkPath],
+                   on_select: Callable[[NetworkPath], None]) -> None:
+        """Display the cheapest paths between two devices, each with a button to highlight it."""
+        self._clear_content()
+        self.current_item = None
+        names = model.device_names
+        self._create_header("Paths")
+        ttk.Label(
+            self.content_frame,
+            text=f"{names[paths[0].devices[0]]} to {names[paths[0].devices[-1]]}",
+            wraplength=200
+        ).pack()
+        for index, path in enumerate(paths):
+            self._create_info_rows("Best Path" if index == 0 else f"Alternative {index}", [
+                ("Cost:", f"{path.cost:g}"),
+                ("Hops:", str(len(path.links))),
+            ])
+            ttk.Label(
+                self.content_frame,
+                text=" → ".join(names[handle] for handle in path.devices),
+                wraplength=200
+            ).pack(fill=tk.X, padx=5, pady=2)
+            ttk.Button(
+                self.content_frame,
+                text="Highlight",
+                command=lambda path=path: on_select(path)
+            ).pack(pady=2)
+
+    def _show_connectivity(self, device: Device) -> None:
+        """Display the connectivity of a device within its component."""
+        graph = TopologyGraph.for_model(device.model)
+        handle = device.handle
+        critical_links = sum(1 for link in device.model.device_links(handle) if graph.is_bridge(link))
+        is_cut = graph.is_articulation_point(handle)
+        self._create_info_rows("Connectivity", [
+            ("Connections:", str(graph.degree(handle))),
+            ("Component size:", str(graph.component_sizes().get(int(graph.components()[handle]), 1))),
+            ("Critical device:", "Yes" if is_cut else "No"),
+            ("Critical connections:", str(critical_links)),
+        ])
+
+    def _create_info_rows(self, title: str, rows: List[Tuple[str, str]]) -> None:
+        """Create a titled block of read-only label/value rows."""
+        ttk.Label(
+            self.content_frame,
+            text=title,
+            font=('Arial', 10, 'bold')
+        ).pack(pady=(15, 5))
+        for label, value in rows:
+            frame = ttk.Frame(self.content_frame)
+            frame.pack(fill=tk.X, padx=5, pady=1)
+            ttk.Label(frame, text=label).pack(side=tk.LEFT)
+            ttk.Label(frame, text=value).pack(side=tk.RIGHT)
+
     def _clear_content(self) -> None:
         """Clear all widgets from the content frame."""
         for widget in self.content_frame.winfo_children():
@@ -147,18 +240,29 @@ class PropertiesPanel:
     def _apply_device_changes(self) -> None:
         """Apply changes to the current device."""
         if isinstance(self.current_item, Device):
-            self.current_item.config.name = self.property_vars['name'].get()
-            self.current_item.config.device_type = self.property_vars['device_type'].get()
-            self.current_item.config.ip_address = self.property_vars['ip_address'].get()
-            self.current_item.update_appearance()
+            self._apply_changes(self.current_item, {
+                'name': self.property_vars['name'].get(),
+                'device_type': self.property_vars['device_type'].get(),
+                'ip_address': self.property_vars['ip_address'].get()
+            })
 
     def _apply_boundary_changes(self) -> None:
         """Apply changes to the current boundary."""
         if isinstance(self.current_item, Boundary):
-            self.current_item.config.name = self.property_vars['name'].get()
-            self.current_item.config.subnet = self.property_vars['subnet'].get()
-            self.current_item.config.color = self.property_vars['color'].get()
-            self.current_item.update_appearance()
+            self._apply_changes(self.current_item, {
+                'name': self.property_vars['name'].get(),
+                'subnet': self.property_vars['subnet'].get(),
+                'color': self.property_vars['color'].get()
+            })
+
+    def _apply_changes(self, item: Any, fields: Dict[str, str]) -> None:
+        """Set config fields of a device or boundary as an undoable edit."""
+        command = PropertiesCommand.capture(item, fields)
+        for field, value in fields.items():
+            setattr(item.config, field, value)
+        item.update_appearance()
+        if command and self.callbacks.get('record_command'):
+            self.callbacks['record_command'](command)
 
     def _show_contained_devices(self, boundary: Boundary) -> None:
         """Display the list of devices contained within a boundary."""
@@ -185,7 +289,8 @@ class PropertiesPanel:
         text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Add devices to text widget
-        for device in boundary.contained_devices:
-            text_widget.insert(tk.END, f"{device.config.name}\n")
+        names = boundary.model.device_names
+        for handle in sorted(boundary.contained_devices):
+            text_widget.insert(tk.END, f"{names[handle]}\n")
         
         text_widget.configure(state='disabled')
\ No newline at end of file
@@ -0,0 +1,110 @@
+import time
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Merge = Callable[[Tuple, Tuple], Tuple]
+
+def sum_deltas(pending: Tuple, new: Tuple) -> Tuple:
+    """Merge two (dx, dy) deltas."""
+    return (pending[0] + new[0], pending[1] + new[1])
+
+def compose_zoom(pending: Tuple, new: Tuple) -> Tuple:
+    """Merge two (factor, x, y) zoom steps, keeping the latest anchor."""
+    return (pending[0] * new[0], new[1], new[2])
+
+class RenderScheduler:
+    """Applies work posted by high-frequency events at a capped frame rate.
+
+    Event handlers post a value under a key instead of doing their work
+    directly. Values posted under the same key before the next frame are
+    merged (e.g. drag deltas are summed) or replaced by the latest one, so
+    intermediate states are dropped when the scheduler falls behind the
+    event stream.
+    """
+
+    def __init__(self, widget: tk.Misc, frame_rate: int = 60):
+        """Initialize the scheduler.
+
+        Args:
+            widget: Widget whose event loop runs the frames
+            frame_rate: Maximum number of frames per second
+        """
+        self.widget = widget
+        self.frame_rate = frame_rate
+        self.frame_budget = 1.0 / frame_rate
+        self.pending: Dict[str, List[Any]] = {}
+        self.after_frame: List[Callable[[], None]] = []
+        self._after_id: Optional[str] = None
+        self._last_frame_end = 0.0
+
+        # Frame statistics
+        self.frames = 0
+        self.late_frames = 0
+        self.merged_posts = 0
+        self.last_frame_time = 0.0
+
+    def post(self, key: str, callback: Callable[..., None], value: Tuple,
+             merge: Optional[Merge] = None) -> None:
+        """Queue work for the next frame.
+
+        Args:
+            key: Identifies the work; posts under the same key are coalesced
+            callback: Called as callback(*value) when the frame runs
+            value: Arguments for the callback
+            merge: Combines a pending value with a new one; if omitted the
+                new value replaces the pending one
+        """
+        entry = self.pending.get(key)
+        if entry is not None and entry[0] == callback:
+            entry[1] = merge(entry[1], value) if merge else value
+            self.merged_posts += 1
+        else:
+            if entry is not None:
+                # A different callback under the same key; apply the old work first
+                entry[0](*entry[1])
+            self.pending[key] = [callback, value]
+        self._schedule()
+
+    def cancel(self, key: str) -> None:
+        """Drop pending work for a key."""
+        self.pending.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all pending work without applying it."""
+        self.pending.clear()
+
+    def _schedule(self) -> None:
+        """Schedule the next frame no sooner than one frame interval after the last."""
+        if self._after_id is not None:
+            return
+        wait = self._last_frame_end + self.frame_budget - time.perf_counter()
+        self._after_id = self.widget.after(max(0, int(wait * 1000)), self._run_frame)
+
+    def _run_frame(self) -> None:
+        """Apply all pending work."""
+        self._after_id = None
+        start = time.perf_counter()
+        self.flush()
+        end = time.perf_counter()
+        self.last_frame_time = end - start
+        self.frames += 1
+        if self.last_frame_time > self.frame_budget:
+            self.late_frames += 1
+        self._last_frame_end = end
+
+    def flush(self) -> None:
+        """Apply all pending work immediately, e.g. when a drag ends."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        pending = self.pending
+        self.pending = {}
+        for callback, value in pending.values():
+            callback(*value)
+        if pending:
+            for hook in self.after_frame:
+                hook()
+
+    def over_budget(self) -> bool:
+        """Check whether the last frame took longer than the frame budget."""
+        return self.last_frame_time > self.frame_budget
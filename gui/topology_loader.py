@@ -0,0 +1,212 @@
+import gc
+import queue
+import threading
+import time
+from contextlib import closing
+from typing import Callable, List, Optional, Tuple
+from models.redraw import CanvasBatch
+from utils.file_handler import FileHandler
+from utils.json_stream import Record
+from .canvas_panel import CanvasPanel
+
+class TopologyLoader:
+    """Loads a topology file into a canvas panel without blocking the event loop.
+
+    A worker thread parses the file and posts batches of records to a
+    bounded queue. The main thread drains the queue in time-boxed ticks
+    scheduled with ``after()``, adding each record to the panel's model and
+    creating its view, so Tk keeps repainting and handling input between
+    ticks. Only the main thread touches the model and the canvas, and the
+    canvas items for each slice of records are created in one Tcl script.
+
+    Automatic garbage collection is paused while loading: full collections
+    traverse every object created so far and would stall ticks for hundreds
+    of milliseconds on large files, so one collection runs at the end instead.
+    """
+
+    BATCH_SIZE = 1000
+    QUEUE_SIZE = 8
+    TIME_BUDGET = 0.03
+    TICK_INTERVAL = 5
+    CHECK_EVERY = 64
+
+    def __init__(self, panel: CanvasPanel, filename: str,
+                 on_progress: Optional[Callable[[float], None]] = None,
+                 on_finish: Optional[Callable[[Optional[Exception]], None]] = None):
+        """Initialize the loader.
+
+        Args:
+            panel: Panel to load into; cleared when loading starts
+            filename: Topology file, JSON (possibly compressed) or .ntdb
+            on_progress: Called on the main thread with the fraction loaded
+            on_finish: Called on the main thread once loading ends, with the
+                error that stopped it or None; not called when cancelled
+        """
+        self.panel = panel
+        self.filename = filename
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.running = False
+        self.cancelled = False
+        self.progress = 0.0
+        self._queue: "queue.Queue[Tuple]" = queue.Queue(self.QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._after_id: Optional[str] = None
+        self._read_progress = 0.0
+        self._gc_was_enabled = False
+
+        # Batch being added on the main thread
+        self._section = ''
+        self._records: List[Record] = []
+        self._index = 0
+        self._batch_progress = 0.0
+        self._deferred: List[Record] = []
+
+    def start(self) -> None:
+        """Clear the panel and start loading."""
+        self.panel.clear()
+        self.running = True
+        self._gc_was_enabled = gc.isenabled()
+        gc.disable()
+        self._thread = threading.Thread(target=self._read, name='topology-loader', daemon=True)
+        self._thread.start()
+        self._schedule()
+
+    def cancel(self) -> None:
+        """Stop loading and clear what was loaded so far."""
+        if not self.running:
+            return
+        self.cancelled = True
+        self._stop_loading()
+        self.panel.clear()
+
+    #region Worker thread
+
+    def _read(self) -> None:
+        """Parse the file and post its records in batches."""
+        try:
+            batches = FileHandler.iter_topology(self.filename, self.BATCH_SIZE, self._set_read_progress)
+            with closing(batches):
+                for section, records in batches:
+                    if not self._post(('batch', section, records, self._read_progress)):
+                        return
+            self._post(('done',))
+        except Exception as e:
+            self._post(('error', e))
+
+    def _set_read_progress(self, fraction: float) -> None:
+        self._read_progress = fraction
+
+    def _post(self, message: Tuple) -> bool:
+        """Queue a message for the main thread, waiting while the queue is full.
+
+        Returns:
+            bool: False if loading was stopped before the message was queued
+        """
+        while not self._stop.is_set():
+            try:
+                self._queue.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    #endregion
+
+    #region Main thread
+
+    def _schedule(self) -> None:
+        self._after_id = self.panel.canvas.after(self.TICK_INTERVAL, self._tick)
+
+    def _tick(self) -> None:
+        """Add records until the time budget is spent or the queue is empty."""
+        self._after_id = None
+        deadline = time.perf_counter() + self.TIME_BUDGET
+        added = False
+        try:
+            while time.perf_counter() < deadline:
+                if self._index >= len(self._records):
+                    if self._records:
+                        self._records = []
+                        self._report(self._batch_progress)
+                    try:
+                        message = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if message[0] == 'error':
+                        self._finish(message[1])
+                        return
+                    if message[0] == 'done':
+                        self._add_deferred()
+                        self._finish(None)
+                        return
+                    _, self._section, self._records, self._batch_progress = message
+                    self._index = 0
+                with CanvasBatch.for_canvas(self.panel.canvas).collect():
+                    self._add_records(self._index + self.CHECK_EVERY)
+                added = True
+        except (KeyError, TypeError, ValueError) as e:
+            self._finish(ValueError(f"Invalid topology file format: {e}"))
+            return
+        if added:
+            self.panel.refresh_view(aggregates=False)
+        self._schedule()
+
+    def _add_records(self, end: int) -> None:
+        """Add the records of the current batch up to an index."""
+        panel = self.panel
+        model = panel.model
+        records = self._records[self._index:end]
+        self._index += len(records)
+        if self._section == 'devices':
+            for record in records:
+                panel.create_device_view(model.add_device_record(record))
+        elif self._section == 'connections':
+            for record in records:
+                handle = model.add_link_record(record)
+                if handle is None:
+                    # Its devices come later in the file
+                    self._deferred.append(record)
+                else:
+                    panel.create_connection_view(handle)
+        else:
+            for record in records:
+                panel.create_boundary_view(model.add_boundary_record(record))
+
+    def _add_deferred(self) -> None:
+        """Add the connections that appeared before their devices."""
+        for record in self._deferred:
+            handle = self.panel.model.add_link_record(record)
+            if handle is not None:
+                self.panel.create_connection_view(handle)
+        self._deferred = []
+
+    def _report(self, fraction: float) -> None:
+        self.progress = fraction
+        if self.on_progress:
+            self.on_progress(fraction)
+
+    def _stop_loading(self) -> None:
+        """Stop the worker and the ticks."""
+        self.running = False
+        self._stop.set()
+        if self._gc_was_enabled:
+            gc.enable()
+        if self._after_id is not None:
+            self.panel.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self._records = []
+        self._deferred = []
+
+    def _finish(self, error: Optional[Exception]) -> None:
+        self._stop_loading()
+        if error is None:
+            self.panel.refresh_view()
+            self._report(1.0)
+        else:
+            self.panel.clear()
+        if self.on_finish:
+            self.on_finish(error)
+
+    #endregion
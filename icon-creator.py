@@ -1,5 +1,8 @@
 from PIL import Image, ImageDraw
+import glob
 import os
+from models.icon_cache import DiskIconCache
+from models.topology import TopologyModel
 
 def create_icons():
     """Create icons for different network devices."""
@@ -59,5 +62,12 @@ def create_icons():
         draw.arc([30-r, 30-r, 30+r, 30+r], -60, 60, fill='black', width=2)
     img.save(os.path.join(icons_dir, 'access_point.png'))
 
+def prebuild_icon_cache():
+    """Pre-scale the generated icons for every zoom step in the disk cache."""
+    sources = glob.glob(os.path.join('icons', '*.png'))
+    built = DiskIconCache().prebuild(sources, TopologyModel.DEVICE_SIZE)
+    print(f"Cached {built} scaled icon variants")
+
 if __name__ == '__main__':
-    create_icons()
\ No newline at end of file
+    create_icons()
+    prebuild_icon_cache()
\ No newline at end of file
@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Optional, List
 from .config import DeviceConfig, BoundaryConfig
 from .enums import ConnectionType
+from .topology import TopologyModel
 from .device import Device
 from .boundary import Boundary
 from .connection import Connection
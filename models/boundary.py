@@ -1,72 +1,212 @@
 import tkinter as tk
-from typing import Set, Dict, Any, Optional
+from typing import Set, Dict, Any, List, Optional, Tuple
 from models import BoundaryConfig
 from models.device import Device
+from models.topology import TopologyModel
+from models.redraw import CanvasBatch, ItemPool
+from models.viewport import Viewport
 
 class Boundary:
-    """Represents a network boundary/zone that can contain devices."""
+    """Canvas view of a network boundary/zone stored in a TopologyModel."""
     
     MIN_WIDTH = 100
     MIN_HEIGHT = 100
     HANDLE_SIZE = 10
+    GLYPH_RADIUS = 12
 
-    def __init__(self, canvas: tk.Canvas, x: int, y: int, width: int, height: int, config: BoundaryConfig):
+    def __init__(self, canvas: tk.Canvas, x: int, y: int, width: int, height: int, config: BoundaryConfig,
+                 model: Optional[TopologyModel] = None, handle: Optional[int] = None,
+                 materialize: bool = True):
+        """Initialize the boundary view.
+
+        Args:
+            canvas: Canvas to draw the boundary on
+            x: Left edge
+            y: Top edge
+            width: Initial width
+            height: Initial height
+            config: Boundary configuration
+            model: Model holding the boundary; a private one is created if omitted
+            handle: Existing boundary handle in the model to attach to instead
+                of adding a new boundary
+            materialize: Create the canvas items right away; pass False for
+                boundaries outside the visible area
+        """
         self.canvas = canvas
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
+        self.viewport = Viewport.for_canvas(canvas)
+        self.model = model if model is not None else TopologyModel()
         self.config = config
-        self.contained_devices = []
-        self._create_visual_elements()
+        if handle is None:
+            handle = self.model.add_boundary(
+                config.name, x, y, width, height,
+                subnet=getattr(config, 'subnet', ""),
+                description=getattr(config, 'description', ""),
+                color=getattr(config, 'color', "#E0E0E0")
+            )
+        self.handle = handle
         
         # Canvas elements
         self.boundary: Optional[int] = None
         self.name_text: Optional[int] = None
         self.resize_handle: Optional[int] = None
+        self.glyph: Optional[int] = None
+        self.glyph_text: Optional[int] = None
+        self.selected = False
+        self.materialized = False
         
-        self._create_visual_elements()
+        if materialize:
+            self.materialize()
+
+    @property
+    def x(self) -> float:
+        """Left edge, read from the model."""
+        return self.model.boundary_x[self.handle]
+
+    @property
+    def y(self) -> float:
+        """Top edge, read from the model."""
+        return self.model.boundary_y[self.handle]
+
+    @property
+    def width(self) -> float:
+        """Width, read from the model."""
+        return self.model.boundary_width[self.handle]
+
+    @property
+    def height(self) -> float:
+        """Height, read from the model."""
+        return self.model.boundary_height[self.handle]
+
+    def _canvas_rect(self) -> Tuple[float, float, float, float]:
+        """Get the boundary rectangle in canvas coordinates."""
+        x1, y1 = self.viewport.to_canvas(self.x, self.y)
+        x2, y2 = self.viewport.to_canvas(self.x + self.width, self.y + self.height)
+        return (x1, y1, x2, y2)
 
     def _create_visual_elements(self) -> None:
-        """Create the visual elements of the boundary."""
-        # Create main boundary rectangle
-        self.boundary = self.canvas.create_rectangle(
-            self.x, self.y,
-            self.x + self.width, self.y + self.height,
-            fill=self.config.color,
-            stipple='gray50',  # Creates a semi-transparent effect
-            outline='#666666',
-            dash=(5, 5),
-            width=2,
+        """Create the visual elements of the boundary for the current level of detail."""
+        # Recycled items are restacked since a boundary's items overlap
+        pool = ItemPool.for_canvas(self.canvas)
+        tier = self.viewport.tier
+        x1, y1, x2, y2 = self._canvas_rect()
+        if tier == Viewport.FULL:
+            # Create main boundary rectangle
+            self.boundary = pool.acquire(
+                'boundary.rect', 'rectangle', 'boundary', (x1, y1, x2, y2), restack=True,
+                fill=self.config.color,
+                stipple='gray50',  # Creates a semi-transparent effect
+                outline='#666666',
+                dash=(5, 5),
+                width=2,
+                tags=('boundary', 'draggable')
+            )
+
+            # Create boundary label
+            self.name_text = pool.acquire(
+                'boundary.label', 'text', 'boundary', (x1 + 10, y1 + 5), restack=True,
+                text=self._get_display_text(),
+                anchor=tk.NW,
+                font=('Arial', 10, 'bold'),
+                fill='#333333',
+                tags=('boundary', 'draggable')
+            )
+        else:
+            # Stipple and dashes are costly to render and unreadable when small
+            self.boundary = pool.acquire(
+                'boundary.rect.simple', 'rectangle', 'boundary', (x1, y1, x2, y2), restack=True,
+                fill=self.config.color,
+                outline='#666666',
+                width=1,
+                tags=('boundary', 'draggable')
+            )
+
+        if tier == Viewport.AGGREGATE:
+            self._create_glyph()
+
+        # Create resize handle
+        self._create_resize_handle()
+
+    def _create_glyph(self) -> None:
+        """Create the aggregate glyph standing in for the devices collapsed into the boundary."""
+        count = self.collapsed_count()
+        if not count:
+            return
+        pool = ItemPool.for_canvas(self.canvas)
+        cx, cy, r = self._glyph_geometry()
+        self.glyph = pool.acquire(
+            'boundary.glyph', 'oval', 'boundary', (cx - r, cy - r, cx + r, cy + r), restack=True,
+            fill='#607D8B',
+            outline='white',
             tags=('boundary', 'draggable')
         )
-
-        # Create boundary label
-        self.name_text = self.canvas.create_text(
-            self.x + 10,
-            self.y + 5,
-            text=self._get_display_text(),
-            anchor=tk.NW,
-            font=('Arial', 10, 'bold'),
-            fill='#333333',
+        self.glyph_text = pool.acquire(
+            'boundary.glyph_text', 'text', 'boundary', (cx, cy), restack=True,
+            text=str(count),
+            font=('Arial', 8, 'bold'),
+            fill='white',
             tags=('boundary', 'draggable')
         )
 
-        # Create resize handle
-        self._create_resize_handle()
+    def _glyph_geometry(self) -> Tuple[float, float, float]:
+        """Get the glyph center and radius in canvas coordinates."""
+        x1, y1, x2, y2 = self._canvas_rect()
+        radius = min(self.GLYPH_RADIUS, (x2 - x1) / 2, (y2 - y1) / 2)
+        return ((x1 + x2) / 2, (y1 + y2) / 2, radius)
 
     def _create_resize_handle(self) -> None:
         """Create the resize handle in the bottom-right corner."""
-        self.resize_handle = self.canvas.create_rectangle(
-            self.x + self.width - self.HANDLE_SIZE,
-            self.y + self.height - self.HANDLE_SIZE,
-            self.x + self.width,
-            self.y + self.height,
+        _, _, x2, y2 = self._canvas_rect()
+        self.resize_handle = ItemPool.for_canvas(self.canvas).acquire(
+            'boundary.handle', 'rectangle', 'boundary',
+            (x2 - self.HANDLE_SIZE, y2 - self.HANDLE_SIZE, x2, y2), restack=True,
             fill='white',
             outline='#666666',
             tags=('boundary_resize_handle', 'draggable')
         )
 
+    def _item_roles(self) -> List[Tuple[Optional[int], str]]:
+        """Pair each canvas item with its item pool role."""
+        rect_role = 'boundary.rect' if self.name_text else 'boundary.rect.simple'
+        return [
+            (self.boundary, rect_role),
+            (self.name_text, 'boundary.label'),
+            (self.glyph, 'boundary.glyph'),
+            (self.glyph_text, 'boundary.glyph_text'),
+            (self.resize_handle, 'boundary.handle'),
+        ]
+
+    def collapsed_count(self) -> int:
+        """Count the devices drawn as part of this boundary's aggregate glyph."""
+        containment = self.model.containment
+        return sum(1 for device in containment.members_of(self.handle)
+                   if containment.innermost(device) == self.handle)
+
+    def materialize(self) -> None:
+        """Create the canvas items if the boundary is not drawn."""
+        if self.materialized:
+            return
+        self.materialized = True
+        self._create_visual_elements()
+        if self.selected:
+            self.highlight(True)
+
+    def dematerialize(self) -> None:
+        """Return the canvas items to the pool, keeping the boundary in the model."""
+        if not self.materialized:
+            return
+        self.materialized = False
+        pool = ItemPool.for_canvas(self.canvas)
+        for item, role in self._item_roles():
+            if item:
+                pool.release(role, item)
+        self.boundary = self.name_text = self.resize_handle = None
+        self.glyph = self.glyph_text = None
+
+    def redraw(self) -> None:
+        """Recreate the canvas items, e.g. after the level of detail changed."""
+        self.dematerialize()
+        self.materialize()
+
     def _get_display_text(self) -> str:
         """Get the text to display in the boundary label."""
         text = self.config.name
@@ -76,33 +216,58 @@ class Boundary:
 
     def move(self, dx: int, dy: int) -> None:
         """Move the boundary by the specified delta."""
-        self.x += dx
-        self.y += dy
-        self.canvas.move(self.boundary, dx, dy)
-        self.canvas.move(self.name_text, dx, dy)
-        self.canvas.move(self.resize_handle, dx, dy)
+        self.model.move_boundary(self.handle, dx, dy)
+        scale = self.viewport.scale
+        batch = CanvasBatch.for_canvas(self.canvas)
+        for item in self.canvas_items():
+            batch.move(item, dx * scale, dy * scale)
 
     def resize(self, new_width: int, new_height: int) -> None:
         """Resize the boundary to the specified dimensions."""
-        self.width = max(new_width, self.MIN_WIDTH)
-        self.height = max(new_height, self.MIN_HEIGHT)
-        
-        # Update boundary rectangle
-        self.canvas.coords(
-            self.boundary,
-            self.x, self.y,
-            self.x + self.width, self.y + self.height
+        self.model.resize_boundary(
+            self.handle,
+            max(new_width, self.MIN_WIDTH),
+            max(new_height, self.MIN_HEIGHT)
         )
+        self.reproject()
+
+    def reproject(self) -> None:
+        """Move the canvas items to the boundary's model rectangle under the current zoom."""
+        if not self.boundary:
+            return
+
+        # Update boundary rectangle and label
+        x1, y1, x2, y2 = self._canvas_rect()
+        batch = CanvasBatch.for_canvas(self.canvas)
+        batch.coords(self.boundary, x1, y1, x2, y2)
+        if self.name_text:
+            batch.coords(self.name_text, x1 + 10, y1 + 5)
         
         # Update resize handle
-        self.canvas.coords(
+        batch.coords(
             self.resize_handle,
-            self.x + self.width - self.HANDLE_SIZE,
-            self.y + self.height - self.HANDLE_SIZE,
-            self.x + self.width,
-            self.y + self.height
+            x2 - self.HANDLE_SIZE,
+            y2 - self.HANDLE_SIZE,
+            x2,
+            y2
         )
 
+        # Keep the aggregate glyph centered
+        if self.glyph:
+            cx, cy, r = self._glyph_geometry()
+            batch.coords(self.glyph, cx - r, cy - r, cx + r, cy + r)
+            batch.coords(self.glyph_text, cx, cy)
+
+    def delete(self) -> None:
+        """Delete the boundary and its visual elements."""
+        self.dematerialize()
+        self.model.remove_boundary(self.handle)
+
+    def canvas_items(self) -> List[int]:
+        """Get the ids of all canvas items currently drawn for the boundary."""
+        items = (self.boundary, self.name_text, self.glyph, self.glyph_text, self.resize_handle)
+        return [item for item in items if item]
+
     def contains_point(self, x: int, y: int) -> bool:
         """Check if a point is within the boundary."""
         return (self.x <= x <= self.x + self.width and
@@ -116,15 +281,18 @@ class Boundary:
     def highlight(self, state: bool = True) -> None:
         """Highlight or unhighlight the boundary."""
         color = '#FFE0B2' if state else self.config.color
-        self.canvas.itemconfig(self.boundary, fill=color)
+        if self.boundary:
+            CanvasBatch.for_canvas(self.canvas).itemconfigure(self.boundary, fill=color)
         self.selected = state
 
-    def update_contained_devices(self, devices: Dict[str, Device]) -> None:
-        """Update the set of devices contained within this boundary."""
-        self.contained_devices.clear()
-        for device in devices.values():
-            if self.contains_device(device):
-                self.contained_devices.add(device)
+    @property
+    def contained_devices(self) -> Set[int]:
+        """Handles of the devices inside the boundary, kept current by the model."""
+        return self.model.containment.members_of(self.handle)
+
+    def update_contained_devices(self) -> None:
+        """Recompute the set of devices contained within this boundary."""
+        self.model.containment.refresh_boundary(self.handle)
 
     def get_info(self) -> Dict[str, Any]:
         """Get a dictionary of boundary information for saving."""
@@ -141,6 +309,13 @@ class Boundary:
 
     def update_appearance(self) -> None:
         """Update the visual appearance of the boundary."""
+        self.model.update_boundary(
+            self.handle,
+            name=self.config.name,
+            subnet=getattr(self.config, 'subnet', None),
+            description=getattr(self.config, 'description', None),
+            color=getattr(self.config, 'color', None)
+        )
         if self.boundary:
             self.canvas.itemconfig(self.boundary, fill=self.config.color)
         if self.name_text:
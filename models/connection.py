@@ -1,12 +1,14 @@
-from typing import Dict, Tuple, Optional, TYPE_CHECKING
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
 from models.enums import ConnectionType
+from models.redraw import CanvasBatch, ItemPool, RedrawQueue
+from models.viewport import Viewport
 
 if TYPE_CHECKING:
     from .device import Device
     import tkinter as tk
 
 class Connection:
-    """Represents a connection between two network devices."""
+    """Canvas view of a link between two devices stored in a TopologyModel."""
 
     LINE_STYLES: Dict[ConnectionType, Dict[str, any]] = {
         ConnectionType.ETHERNET: {'dash': None, 'width': 2, 'color': '#2196F3'},
@@ -16,67 +18,124 @@ class Connection:
         ConnectionType.SERIAL: {'dash': (2, 2), 'width': 1, 'color': '#607D8B'},
         ConnectionType.USB: {'dash': (4, 2), 'width': 1, 'color': '#795548'}
     }
+    HIGHLIGHT_STYLE: Dict[str, any] = {'dash': None, 'width': 4, 'color': '#F44336'}
 
     def __init__(self, canvas: 'tk.Canvas', device1: 'Device', 
-                 device2: 'Device', connection_type: ConnectionType):
-        """Initialize a new connection between two devices."""
+                 device2: 'Device', connection_type: ConnectionType,
+                 handle: Optional[int] = None, materialize: bool = True):
+        """Initialize a new connection between two devices.
+
+        The link is stored in the model of ``device1``; pass ``handle`` to
+        attach to a link that already exists there, and ``materialize=False``
+        to leave the line undrawn until it scrolls into view.
+        """
         self.canvas = canvas
+        self.viewport = Viewport.for_canvas(canvas)
         self.device1 = device1
         self.device2 = device2
         self.connection_type = connection_type
+        self.model = device1.model
+        if handle is None:
+            handle = self.model.add_link(device1.handle, device2.handle, connection_type)
+        self.handle = handle
         self.line: Optional[int] = None
+        self.materialized = False
+        self.highlighted = False
         
-        self._create_line()
+        if materialize:
+            self.materialize()
         
         # Add this connection to both devices
         device1.connections.append(self)
         device2.connections.append(self)
 
+    def _end_point(self, device: 'Device') -> Optional[int]:
+        """Get the boundary a line end collapses into at the current level of detail."""
+        if self.viewport.tier != Viewport.AGGREGATE:
+            return None
+        return device.collapsed_into()
+
+    def _endpoints(self) -> Optional[Tuple[float, ...]]:
+        """Get the line's canvas coordinates, or None if it is not drawn.
+
+        Ends inside a collapsed boundary snap to the boundary's center, and a
+        line with both ends collapsed into the same boundary is hidden.
+        Lines between two shown devices follow the viewport's router, if any.
+        """
+        ends = []
+        boundaries = []
+        for device in (self.device1, self.device2):
+            boundary = self._end_point(device)
+            boundaries.append(boundary)
+            if boundary is None:
+                x, y = device.get_position()
+            else:
+                bx1, by1, bx2, by2 = self.model.boundary_rect(boundary)
+                x, y = (bx1 + bx2) / 2, (by1 + by2) / 2
+            ends.extend(self.viewport.to_canvas(x, y))
+        if boundaries[0] is not None and boundaries[0] == boundaries[1]:
+            return None
+        router = self.viewport.router
+        if router is not None and boundaries == [None, None]:
+            return tuple(value for x, y in router.route(self.handle)
+                         for value in self.viewport.to_canvas(x, y))
+        return tuple(ends)
+
     def _create_line(self) -> None:
         """Create the visual line representing the connection."""
-        x1, y1 = self.device1.get_position()
-        x2, y2 = self.device2.get_position()
-        style = self.LINE_STYLES[self.connection_type]
+        coords = self._endpoints()
+        if coords is None:
+            return
+        style = self._style()
         
-        # Create line with specified style
-        self.line = self.canvas.create_line(
-            x1, y1, x2, y2,
+        # Create line with specified style; dashes only pay off at full detail.
+        # The pool stacks it below devices but above boundaries.
+        self.line = ItemPool.for_canvas(self.canvas).acquire(
+            'connection.line', 'line', 'connection', coords,
             fill=style['color'],
             width=style['width'],
-            dash=style['dash'],
+            dash=style['dash'] if self.viewport.tier == Viewport.FULL and style['dash'] else '',
             tags='connection'  # Add tag for easier management
         )
-        
-        # Ensure line is below devices but above background
-        self.canvas.tag_lower(self.line)
-        
-        # Update line position to match device centers
-        self.update_position()
+
+    def _style(self) -> Dict[str, any]:
+        """Get the line style, which a highlight overrides."""
+        return self.HIGHLIGHT_STYLE if self.highlighted else self.LINE_STYLES[self.connection_type]
+
+    def set_highlight(self, state: bool) -> None:
+        """Restyle the line to stand out, e.g. as part of a path, or back to its type's style."""
+        self.highlighted = state
+        if self.line:
+            style = self._style()
+            CanvasBatch.for_canvas(self.canvas).itemconfigure(
+                self.line,
+                fill=style['color'],
+                width=style['width'],
+                dash=style['dash'] if self.viewport.tier == Viewport.FULL and style['dash'] else ''
+            )
 
     def update_position(self) -> None:
-        """Update the position of the connection line."""
+        """Update the position of the connection line immediately."""
         if self.line:
-            # Get center positions of both devices
-            x1, y1 = self.device1.get_position()
-            x2, y2 = self.device2.get_position()
-            
-            # Adjust positions to device centers
-            x1 += self.device1.ICON_SIZE // 2
-            y1 += self.device1.ICON_SIZE // 2
-            x2 += self.device2.ICON_SIZE // 2
-            y2 += self.device2.ICON_SIZE // 2
+            # Get projected end positions from the model
+            coords = self._endpoints()
             
             # Update line coordinates
-            self.canvas.coords(self.line, x1, y1, x2, y2)
-            
-            # Ensure line remains visible
-            self.canvas.tag_raise(self.line)  # Raise above background
-            self.canvas.tag_lower(self.line, 'device')  # Lower below devices
+            if coords is not None:
+                CanvasBatch.for_canvas(self.canvas).coords(self.line, *coords)
+
+    def reproject(self) -> None:
+        """Move the line to its devices' model positions under the current zoom."""
+        self.update_position()
+
+    def schedule_update(self) -> None:
+        """Queue the line for redraw on the canvas's next idle flush."""
+        RedrawQueue.for_canvas(self.canvas).mark(self)
 
     def delete(self) -> None:
         """Delete the connection and remove it from connected devices."""
-        if self.line:
-            self.canvas.delete(self.line)
+        self.dematerialize()
+        self.model.remove_link(self.handle)
         
         # Remove this connection from both devices
         if self in self.device1.connections:
@@ -84,6 +143,29 @@ class Connection:
         if self in self.device2.connections:
             self.device2.connections.remove(self)
 
+    def materialize(self) -> None:
+        """Create the line if it is not drawn."""
+        if not self.materialized:
+            self.materialized = True
+            self._create_line()
+
+    def dematerialize(self) -> None:
+        """Return the line to the pool, keeping the link in the model."""
+        if self.line:
+            ItemPool.for_canvas(self.canvas).release('connection.line', self.line)
+            self.line = None
+        RedrawQueue.for_canvas(self.canvas).discard(self)
+        self.materialized = False
+
+    def redraw(self) -> None:
+        """Recreate the line, e.g. after the level of detail changed."""
+        self.dematerialize()
+        self.materialize()
+
+    def canvas_items(self) -> List[int]:
+        """Get the ids of all canvas items currently drawn for the connection."""
+        return [self.line] if self.line else []
+
     def get_other_device(self, device: 'Device') -> 'Device':
         """Get the device on the other end of the connection."""
         return self.device2 if device == self.device1 else self.device1
\ No newline at end of file
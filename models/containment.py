@@ -0,0 +1,156 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+from models.spatial import Rect
+
+if TYPE_CHECKING:
+    from models.topology import TopologyModel
+
+def rect_difference(a: Rect, b: Rect) -> List[Rect]:
+    """Cover the part of rectangle a outside rectangle b with up to four strips."""
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    if bx1 > ax2 or bx2 < ax1 or by1 > ay2 or by2 < ay1:
+        return [a]
+    strips = []
+    if ay1 < by1:
+        strips.append((ax1, ay1, ax2, by1))
+    if by2 < ay2:
+        strips.append((ax1, by2, ax2, ay2))
+    top = max(ay1, by1)
+    bottom = min(ay2, by2)
+    if ax1 < bx1:
+        strips.append((ax1, top, bx1, bottom))
+    if bx2 < ax2:
+        strips.append((bx2, top, ax2, bottom))
+    return strips
+
+class ContainmentIndex:
+    """Incrementally maintained membership of devices in boundaries.
+
+    A device belongs to every boundary whose rectangle contains its center.
+    Moving a device only re-tests the boundaries under its new position, and
+    moving or resizing a boundary only re-tests the devices in the area its
+    rectangle gained or lost, both found through the model's spatial indexes.
+
+    While deferred, changes are not tracked at all and the memberships are
+    recomputed once when tracking resumes, which is cheaper for bulk edits.
+    """
+
+    def __init__(self, model: 'TopologyModel'):
+        self.model = model
+        self.members: Dict[int, Set[int]] = {}
+        self.parents: Dict[int, Set[int]] = {}
+        self.deferred = 0
+
+    def clear(self) -> None:
+        """Forget all memberships."""
+        self.members.clear()
+        self.parents.clear()
+
+    def defer(self) -> None:
+        """Stop tracking changes until the matching resume()."""
+        self.deferred += 1
+
+    def resume(self) -> None:
+        """Resume tracking, rebuilding the memberships after the outermost defer()."""
+        self.deferred -= 1
+        if not self.deferred:
+            self.rebuild()
+
+    def members_of(self, boundary: int) -> Set[int]:
+        """Get the live set of device handles contained in a boundary."""
+        return self.members.setdefault(boundary, set())
+
+    def boundaries_of(self, device: int) -> Set[int]:
+        """Get the handles of the boundaries containing a device."""
+        return self.parents.get(device, set())
+
+    def innermost(self, device: int) -> Optional[int]:
+        """Get the smallest boundary containing a device, or None."""
+        parents = self.parents.get(device)
+        if not parents:
+            return None
+        width = self.model.boundary_width
+        height = self.model.boundary_height
+        return min(parents, key=lambda b: (width[b] * height[b], b))
+
+    def _contains(self, rect: Rect, device: int) -> bool:
+        """Check if a device's center lies inside a rectangle."""
+        x = self.model.device_x[device]
+        y = self.model.device_y[device]
+        return rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]
+
+    def _add(self, boundary: int, device: int) -> None:
+        self.members.setdefault(boundary, set()).add(device)
+        self.parents.setdefault(device, set()).add(boundary)
+
+    def _remove(self, boundary: int, device: int) -> None:
+        self.members.get(boundary, set()).discard(device)
+        parents = self.parents.get(device)
+        if parents is not None:
+            parents.discard(boundary)
+            if not parents:
+                del self.parents[device]
+
+    def device_moved(self, device: int) -> None:
+        """Re-evaluate a device that was added or moved."""
+        if self.deferred:
+            return
+        x, y = self.model.device_position(device)
+        current = set(self.model.boundary_index.query_point(x, y))
+        previous = self.parents.get(device, set())
+        if current == previous:
+            return
+        for boundary in previous - current:
+            self._remove(boundary, device)
+        for boundary in current - previous:
+            self._add(boundary, device)
+
+    def device_removed(self, device: int) -> None:
+        """Drop a removed device from every boundary."""
+        if self.deferred:
+            return
+        for boundary in self.parents.pop(device, ()):
+            self.members.get(boundary, set()).discard(device)
+
+    def boundary_changed(self, boundary: int, old_rect: Optional[Rect] = None) -> None:
+        """Re-evaluate the devices in the area a boundary gained or lost.
+
+        Args:
+            boundary: Handle of the boundary that was added, moved or resized
+            old_rect: The boundary's previous rectangle, or None if it is new
+        """
+        if self.deferred:
+            return
+        model = self.model
+        new_rect = model.boundary_rect(boundary)
+        if old_rect is None:
+            for device in model.devices_in_rect(*new_rect):
+                self._add(boundary, device)
+            return
+        for strip in rect_difference(new_rect, old_rect):
+            for device in model.devices_in_rect(*strip):
+                if self._contains(new_rect, device):
+                    self._add(boundary, device)
+        for strip in rect_difference(old_rect, new_rect):
+            for device in model.devices_in_rect(*strip):
+                if not self._contains(new_rect, device):
+                    self._remove(boundary, device)
+
+    def boundary_removed(self, boundary: int) -> None:
+        """Drop a removed boundary and its memberships."""
+        if self.deferred:
+            return
+        for device in list(self.members.pop(boundary, ())):
+            self._remove(boundary, device)
+
+    def refresh_boundary(self, boundary: int) -> None:
+        """Recompute a boundary's members from scratch."""
+        for device in list(self.members.get(boundary, ())):
+            self._remove(boundary, device)
+        self.boundary_changed(boundary)
+
+    def rebuild(self) -> None:
+        """Recompute every membership from scratch."""
+        self.clear()
+        for boundary in self.model.boundaries():
+            self.boundary_changed(boundary)
@@ -1,11 +1,14 @@
 #region Imports
 from typing import List, Optional, Tuple
 import tkinter as tk
-from PIL import Image, ImageTk
-import os
+from PIL import ImageTk
 import math
 from typing import TYPE_CHECKING
 from models import DeviceConfig
+from models.topology import TopologyModel
+from models.redraw import CanvasBatch, ItemPool
+from models.icon_cache import DiskIconCache, IconCache
+from models.viewport import Viewport
 
 if TYPE_CHECKING:
     from models.connection import Connection
@@ -13,117 +16,240 @@ if TYPE_CHECKING:
 
 #region Device Class
 class Device:
-    """Represents a network device."""
+    """Canvas view of a network device stored in a TopologyModel."""
     
     #region Constants
-    ICON_SIZE = 60
+    ICON_SIZE = TopologyModel.DEVICE_SIZE
+    NAME_OFFSET = ICON_SIZE // 2 + 10
+    MIN_LOD_SIZE = 4
+    TYPE_COLORS = {
+        'router': '#FF9800',
+        'switch': '#2196F3',
+        'firewall': '#f44336',
+        'server': '#4CAF50',
+        'client': '#9C27B0',
+        'access_point': '#00BCD4'
+    }
     #endregion
     
     #region Initialization
-    def __init__(self, canvas: tk.Canvas, x: int, y: int, config: DeviceConfig):
+    def __init__(self, canvas: tk.Canvas, x: int, y: int, config: DeviceConfig,
+                 model: Optional[TopologyModel] = None, handle: Optional[int] = None,
+                 materialize: bool = True):
+        """Initialize the device view.
+
+        Args:
+            canvas: Canvas to draw the device on
+            x: Initial center x coordinate
+            y: Initial center y coordinate
+            config: Device configuration
+            model: Model holding the device; a private one is created if omitted
+            handle: Existing device handle in the model to attach to instead of
+                adding a new device
+            materialize: Create the canvas items right away; pass False for
+                devices outside the visible area
+        """
         self.canvas = canvas
-        self.x = x
-        self.y = y
+        self.viewport = Viewport.for_canvas(canvas)
+        self.model = model if model is not None else TopologyModel()
         self.config = config
+        if handle is None:
+            handle = self.model.add_device(
+                config.name, config.device_type, x, y,
+                ip_address=getattr(config, 'ip_address', ""),
+                subnet_mask=getattr(config, 'subnet_mask', ""),
+                location=getattr(config, 'location', "")
+            )
+        self.handle = handle
         self.connections: List['Connection'] = []
         self.selected = False
         self.image_ref: Optional[ImageTk.PhotoImage] = None
         self.icon: Optional[int] = None
         self.name_text: Optional[int] = None
         self.highlight_circle: Optional[int] = None
-        self._create_visual_elements()
+        self._icon_role: Optional[str] = None
+        self._icon_size = self.ICON_SIZE
+        self.materialized = False
+        if materialize:
+            self.materialize()
     #endregion
     
+    #region Model Properties
+    @property
+    def x(self) -> float:
+        """Center x coordinate, read from the model."""
+        return self.model.device_x[self.handle]
+
+    @property
+    def y(self) -> float:
+        """Center y coordinate, read from the model."""
+        return self.model.device_y[self.handle]
+    #endregion
+
     #region Private Methods
     def _initialize(self):
         """Initialize device attributes."""
         pass
 
     def _create_visual_elements(self) -> None:
-        """Create the visual elements of the device on the canvas."""
-        if self._load_icon():
-            self.icon = self.canvas.create_image(
-                self.x, self.y, image=self.image_ref, anchor='center',
+        """Create the visual elements of the device for the current level of detail."""
+        tier = self.viewport.tier
+        if tier == Viewport.AGGREGATE and self.collapsed_into() is not None:
+            # Drawn as part of its boundary's aggregate glyph
+            return
+        x, y = self.viewport.to_canvas(self.x, self.y)
+        if tier != Viewport.FULL:
+            self._create_lod_shape(x, y)
+            return
+        pool = ItemPool.for_canvas(self.canvas)
+        if self._load_icon(DiskIconCache.nearest_size(self.ICON_SIZE, self.viewport.scale)):
+            self._icon_role = 'device.image'
+            self.icon = pool.acquire(
+                self._icon_role, 'image', 'device', (x, y),
+                image=self.image_ref, anchor='center',
                 tags=('device', 'draggable')
             )
         else:
-            self._create_fallback_shape()
-        self.name_text = self.canvas.create_text(
-            self.x, self.y + self.ICON_SIZE // 2 + 10, 
+            self._create_fallback_shape(x, y)
+        self.name_text = pool.acquire(
+            'device.name', 'text', 'device',
+            (x, y + self.NAME_OFFSET * self.viewport.scale), 
             text=self.config.name, 
             tags=('device', 'draggable')
         )
 
-    def _load_icon(self) -> bool:
-        """Load the device icon from file."""
-        possible_paths = [
-            os.path.join('icons', f'{self.config.device_type}.png'),
-            os.path.join(os.getcwd(), 'icons', f'{self.config.device_type}.png'),
-            os.path.join(os.path.dirname(os.getcwd()), 'icons', f'{self.config.device_type}.png'),
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                try:
-                    image = Image.open(path)
-                    image = image.resize((self.ICON_SIZE, self.ICON_SIZE), Image.Resampling.LANCZOS)
-                    self.image_ref = ImageTk.PhotoImage(image)
-                    return True
-                except Exception:
-                    continue
-
-        return False
-
-    def _create_fallback_shape(self) -> None:
+    def _load_icon(self, size: int) -> bool:
+        """Fetch the device icon at a pixel size from the shared icon cache."""
+        self.image_ref = IconCache.shared().get(self.config.device_type, size)
+        self._icon_size = size
+        return self.image_ref is not None
+
+    def _create_fallback_shape(self, x: float, y: float) -> None:
         """Create a fallback shape if icon loading fails."""
-        size = self.ICON_SIZE // 2
-        self.icon = self.canvas.create_rectangle(
-            self.x - size,
-            self.y - size,
-            self.x + size,
-            self.y + size,
+        self._icon_role = 'device.fallback'
+        self.icon = ItemPool.for_canvas(self.canvas).acquire(
+            self._icon_role, 'rectangle', 'device', self._square_coords(x, y),
             fill='gray',
             outline='black',
             width=2,
             tags=('device', 'draggable')
         )
+
+    def _create_lod_shape(self, x: float, y: float) -> None:
+        """Create the plain colored square used at reduced levels of detail."""
+        self._icon_role = 'device.square'
+        self.icon = ItemPool.for_canvas(self.canvas).acquire(
+            self._icon_role, 'rectangle', 'device', self._square_coords(x, y),
+            fill=self._type_color(),
+            outline='',
+            tags=('device', 'draggable')
+        )
+
+    def _square_coords(self, x: float, y: float) -> Tuple[float, float, float, float]:
+        """Get the canvas rectangle of a square icon stand-in centered on a point."""
+        size = self.ICON_SIZE / 2 * self.viewport.scale
+        if self._icon_role == 'device.square':
+            size = max(size, self.MIN_LOD_SIZE / 2)
+        return (x - size, y - size, x + size, y + size)
+
+    def _highlight_coords(self, x: float, y: float) -> Tuple[float, float, float, float]:
+        """Get the canvas bounding box of the highlight ring centered on a point."""
+        radius = (self.ICON_SIZE / 2 + 5) * self.viewport.scale
+        return (x - radius, y - radius, x + radius, y + radius)
+
+    def _type_color(self) -> str:
+        """Get the color that stands in for the device icon."""
+        return self.TYPE_COLORS.get(self.config.device_type, 'gray')
     #endregion
 
+    def collapsed_into(self) -> Optional[int]:
+        """Get the boundary whose aggregate glyph stands in for the device.
+
+        Returns:
+            Optional[int]: Handle of the innermost boundary containing the
+            device, or None if the device is not inside any boundary
+        """
+        return self.model.containment.innermost(self.handle)
+
+    def materialize(self) -> None:
+        """Create the canvas items if the device is not drawn."""
+        if self.materialized:
+            return
+        self.materialized = True
+        self._create_visual_elements()
+        if self.selected:
+            self.highlight(True)
+
+    def dematerialize(self) -> None:
+        """Return the canvas items to the pool, keeping the device in the model."""
+        if not self.materialized:
+            return
+        self.materialized = False
+        pool = ItemPool.for_canvas(self.canvas)
+        if self.icon:
+            pool.release(self._icon_role, self.icon)
+        if self.name_text:
+            pool.release('device.name', self.name_text)
+        if self.highlight_circle:
+            CanvasBatch.for_canvas(self.canvas).delete(self.highlight_circle)
+        self.icon = self.name_text = self.highlight_circle = None
+
+    def redraw(self) -> None:
+        """Recreate the canvas items, e.g. after the level of detail changed."""
+        self.dematerialize()
+        self.materialize()
+
+    def reproject(self) -> None:
+        """Move the canvas items to the device's model position under the current zoom.
+
+        Icons switch to the cached resolution nearest to the zoomed size.
+        """
+        if not self.icon:
+            return
+        x, y = self.viewport.to_canvas(self.x, self.y)
+        batch = CanvasBatch.for_canvas(self.canvas)
+        if self._icon_role == 'device.image':
+            size = DiskIconCache.nearest_size(self.ICON_SIZE, self.viewport.scale)
+            if size != self._icon_size and self._load_icon(size):
+                batch.itemconfigure(self.icon, image=self.image_ref)
+            batch.coords(self.icon, x, y)
+        else:
+            batch.coords(self.icon, *self._square_coords(x, y))
+        self.center_name()
+        if self.highlight_circle:
+            batch.coords(self.highlight_circle, *self._highlight_coords(x, y))
+
     def move(self, dx: int, dy: int) -> None:
-        """Move the device by the specified delta."""
-        self.x += dx
-        self.y += dy
+        """Move the device by the specified delta in model coordinates."""
+        self.model.move_device(self.handle, dx, dy)
         
         # Move all visual elements
+        scale = self.viewport.scale
+        batch = CanvasBatch.for_canvas(self.canvas)
         for item in [self.icon, self.name_text, self.highlight_circle]:
             if item:
-                self.canvas.move(item, dx, dy)
+                batch.move(item, dx * scale, dy * scale)
         
-        # Update connections
+        # Queue connections for redraw on the next idle flush
         for conn in self.connections:
-            conn.update_position()
+            conn.schedule_update()
 
-    def get_position(self) -> Tuple[int, int]:
-        """Get the current center position of the device."""
-        bbox = self.canvas.bbox(self.icon)
-        if bbox:
-            center_x = (bbox[0] + bbox[2]) // 2
-            center_y = (bbox[1] + bbox[3]) // 2
-            return (center_x, center_y)
-        return (self.x, self.y)
+    def get_position(self) -> Tuple[float, float]:
+        """Get the current center position of the device from the model."""
+        return self.model.device_position(self.handle)
+
+    def get_bbox(self) -> Tuple[float, float, float, float]:
+        """Get the icon extent as (x1, y1, x2, y2) without querying the canvas."""
+        x, y = self.model.device_position(self.handle)
+        half = self.ICON_SIZE / 2
+        return (x - half, y - half, x + half, y + half)
 
     def contains(self, x: int, y: int) -> bool:
         """Check if the given point is within the device's bounds."""
         if not self.icon:
             return False
-            
-        bbox = self.canvas.bbox(self.icon)
-        if not bbox:
-            return False
         
-        # Calculate center and radius
-        center_x = (bbox[0] + bbox[2]) / 2
-        center_y = (bbox[1] + bbox[3]) / 2
+        center_x, center_y = self.model.device_position(self.handle)
         
         # Use ICON_SIZE for consistent hit detection
         radius = self.ICON_SIZE / 2
@@ -135,50 +261,51 @@ class Device:
 
     def highlight(self, state: bool = True) -> None:
         """Highlight or unhighlight the device."""
-        if state and not self.highlight_circle:
-            bbox = self.canvas.bbox(self.icon)
-            if bbox:
-                width = bbox[2] - bbox[0]
-                height = bbox[3] - bbox[1]
-                radius = max(width, height) / 2 + 5
-                self.highlight_circle = self.canvas.create_oval(
-                    self.x - radius,
-                    self.y - radius,
-                    self.x + radius,
-                    self.y + radius,
-                    outline='yellow',
-                    width=2,
-                    tags=('device', 'draggable')
-                )
-                self.canvas.tag_lower(self.highlight_circle, self.icon)
+        batch = CanvasBatch.for_canvas(self.canvas)
+        if state and not self.highlight_circle and self.icon:
+            x, y = self.viewport.to_canvas(self.x, self.y)
+            self.highlight_circle = batch.create(
+                'oval', self._highlight_coords(x, y),
+                outline='yellow',
+                width=2,
+                tags=('device', 'draggable')
+            )
+            batch.lower(self.highlight_circle, self.icon)
         elif not state and self.highlight_circle:
-            self.canvas.delete(self.highlight_circle)
+            batch.delete(self.highlight_circle)
             self.highlight_circle = None
         
         self.selected = state
 
     def delete(self) -> None:
         """Delete the device and its visual elements."""
-        if self.icon:
-            self.canvas.delete(self.icon)
-        if self.name_text:
-            self.canvas.delete(self.name_text)
-        if self.highlight_circle:
-            self.canvas.delete(self.highlight_circle)
+        self.dematerialize()
         
         # Delete all connections
         for conn in self.connections[:]:
             conn.delete()
+        self.model.remove_device(self.handle)
+
+    def canvas_items(self) -> List[int]:
+        """Get the ids of all canvas items currently drawn for the device."""
+        return [item for item in (self.icon, self.name_text, self.highlight_circle) if item]
 
     def update_appearance(self) -> None:
         """Update the visual appearance of the device."""
+        self.model.update_device(
+            self.handle,
+            name=self.config.name,
+            device_type=self.config.device_type,
+            ip_address=getattr(self.config, 'ip_address', None)
+        )
         if self.name_text:
             self.canvas.itemconfig(self.name_text, text=self.config.name)
         # Reload icon if device type changed
-        if self.icon:
-            self._load_icon()
-            if self.image_ref:
+        if self.icon and self._icon_role == 'device.image':
+            if self._load_icon(self._icon_size):
                 self.canvas.itemconfig(self.icon, image=self.image_ref)
+        elif self.icon and self._icon_role == 'device.square':
+            self.canvas.itemconfig(self.icon, fill=self._type_color())
 
     def get_connection_point(self, target_x: int, target_y: int) -> Tuple[float, float]:
         """Calculate the point where a connection line should meet the device icon."""
@@ -209,7 +336,8 @@ class Device:
     def center_name(self) -> None:
         """Center the device name below the icon."""
         if self.name_text:
-            self.canvas.coords(self.name_text, 
-                                self.x, 
-                                self.y + self.ICON_SIZE // 2 + 10)
+            x, y = self.viewport.to_canvas(self.x, self.y)
+            CanvasBatch.for_canvas(self.canvas).coords(
+                self.name_text, x, y + self.NAME_OFFSET * self.viewport.scale
+            )
 #endregion
\ No newline at end of file
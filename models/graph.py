@@ -0,0 +1,296 @@
+"""Connectivity analytics over the links of a topology model.
+
+The adjacency of the devices is kept in compressed sparse row (CSR) form:
+the neighbors of device ``h`` are ``indices[indptr[h]:indptr[h + 1]]`` and
+the link joining them is the matching entry of ``edges``. Every traversal
+is iterative, so graphs of any size stay clear of the recursion limit.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+from weakref import WeakKeyDictionary, ref
+import numpy as np
+from models.layout import live_links
+from models.topology import TopologyModel
+
+@dataclass
+class DegreeStats:
+    """Distribution of the number of links per live device."""
+    minimum: int
+    maximum: int
+    mean: float
+    median: float
+    isolated: int
+
+@dataclass
+class NetworkSummary:
+    """Connectivity figures of a whole topology."""
+    devices: int
+    links: int
+    components: int
+    largest_component: int
+    degrees: DegreeStats
+    articulation_points: int
+    bridges: int
+
+class TopologyGraph:
+    """CSR adjacency of a model's devices, rebuilt lazily as links change.
+
+    The graph observes the model. Adding or removing a device or link only
+    marks the arrays stale; they are rebuilt from the model's link columns,
+    in a few vectorized passes, the next time a query needs them, so a run
+    of edits costs one O(V + E) rebuild.
+
+    ``version`` increases with every device or link added or removed;
+    analysis results are cached until it changes.
+    """
+
+    _instances: 'WeakKeyDictionary[TopologyModel, TopologyGraph]' = WeakKeyDictionary()
+
+    def __init__(self, model: TopologyModel):
+        """Build the adjacency and start observing the model.
+
+        Args:
+            model: Model whose links form the graph
+        """
+        self._model = ref(model)
+        self.version = 0
+        self._cache: Dict[str, Tuple[int, Any]] = {}
+        self._rebuild()
+        model.observers.append(self._observe)
+
+    @property
+    def model(self) -> TopologyModel:
+        """The observed model, held weakly so the shared graph does not keep it alive."""
+        return self._model()
+
+    @classmethod
+    def for_model(cls, model: TopologyModel) -> 'TopologyGraph':
+        """Get the graph shared by every user of a model."""
+        graph = cls._instances.get(model)
+        if graph is None:
+            graph = cls._instances[model] = cls(model)
+        return graph
+
+    #region Adjacency
+    def _rebuild(self) -> None:
+        """Rebuild the CSR arrays from the live links of the model."""
+        model = self.model
+        n = len(model.device_alive)
+        links = np.flatnonzero(np.frombuffer(model.link_alive, dtype=np.uint8))
+        a, b = live_links(model)
+        source = np.concatenate((a, b)).astype(np.int64)
+        order = np.argsort(source, kind='stable')
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=n), out=self.indptr[1:])
+        self.indices = np.concatenate((b, a)).astype(np.int64)[order]
+        self.edges = np.concatenate((links, links)).astype(np.int64)[order]
+        self._dirty = False
+
+    def _observe(self, op: str, handle: int, fields: Dict[str, Any]) -> None:
+        """Mark the adjacency stale after a model edit.
+
+        'clear' is sent before the model empties its tables, so nothing is
+        rebuilt until the next query.
+        """
+        if op in ('add_device', 'remove_device', 'add_link', 'remove_link', 'clear'):
+            self._dirty = True
+            self.version += 1
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the compacted adjacency as (indptr, indices, edges), rebuilding it if edited."""
+        if self._dirty:
+            self._rebuild()
+        return self.indptr, self.indices, self.edges
+
+    def neighbors(self, handle: int) -> List[int]:
+        """Get the devices linked to a device, once per link."""
+        indptr, indices, _ = self.csr()
+        if handle + 1 >= len(indptr):
+            return []
+        return indices[indptr[handle]:indptr[handle + 1]].tolist()
+
+    def degree(self, handle: int) -> int:
+        """Get the number of links attached to a device."""
+        return len(self.neighbors(handle))
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] != self.version:
+            entry = self._cache[key] = (self.version, compute())
+        return entry[1]
+    #endregion
+
+    #region Analyses
+    def hops(self, source: int) -> np.ndarray:
+        """Get the number of links on the shortest path from a device to every device.
+
+        A level-synchronous breadth-first search: each step gathers the
+        neighbors of the whole frontier at once.
+
+        Returns:
+            np.ndarray: Hop count per device handle, -1 where unreachable
+        """
+        indptr, indices, _ = self.csr()
+        distance = np.full(len(indptr) - 1, -1, dtype=np.int64)
+        distance[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+        while len(frontier):
+            level += 1
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+            found = indices[np.repeat(starts, counts) + offsets]
+            frontier = np.unique(found[distance[found] < 0])
+            distance[frontier] = level
+        return distance
+
+    def reachable(self, source: int) -> np.ndarray:
+        """Get the handles of the devices connected to a device, itself included."""
+        return np.flatnonzero(self.hops(source) >= 0)
+
+    def components(self) -> np.ndarray:
+        """Label every device with the smallest handle of its connected component.
+
+        Components are found by hooking the root of one end of every link
+        under the smaller root of the other and compressing the pointers,
+        until no link joins two roots.
+
+        Returns:
+            np.ndarray: Component label per device handle, -1 for removed devices
+        """
+        return self._cached('components', self._components)
+
+    def _components(self) -> np.ndarray:
+        model = self.model
+        n = len(model.device_alive)
+        a, b = live_links(model)
+        parent = np.arange(n, dtype=np.int64)
+        while True:
+            root_a, root_b = parent[a], parent[b]
+            apart = root_a != root_b
+            if not apart.any():
+                break
+            np.minimum.at(parent, np.maximum(root_a, root_b)[apart], np.minimum(root_a, root_b)[apart])
+            while True:
+                grand = parent[parent]
+                if np.array_equal(grand, parent):
+                    break
+                parent = grand
+        parent[np.frombuffer(model.device_alive, dtype=np.uint8) == 0] = -1
+        return parent
+
+    def component_sizes(self) -> Dict[int, int]:
+        """Get the number of devices in each component, keyed by component label."""
+        def compute() -> Dict[int, int]:
+            labels = self.components()
+            labels, counts = np.unique(labels[labels >= 0], return_counts=True)
+            return dict(zip(labels.tolist(), counts.tolist()))
+        return self._cached('component_sizes', compute)
+
+    def degree_stats(self) -> DegreeStats:
+        """Get the distribution of link counts over the live devices."""
+        def compute() -> DegreeStats:
+            indptr, _, _ = self.csr()
+            alive = np.frombuffer(self.model.device_alive, dtype=np.uint8).astype(bool)
+            degrees = np.diff(indptr)[alive]
+            if not len(degrees):
+                return DegreeStats(0, 0, 0.0, 0.0, 0)
+            return DegreeStats(int(degrees.min()), int(degrees.max()), float(degrees.mean()),
+                               float(np.median(degrees)), int(np.count_nonzero(degrees == 0)))
+        return self._cached('degree_stats', compute)
+
+    def articulation_points(self) -> np.ndarray:
+        """Get the devices whose removal would split their component."""
+        return self._cached('cuts', self._cuts)[0]
+
+    def bridges(self) -> np.ndarray:
+        """Get the links whose removal would split their component.
+
+        One of several parallel links between the same devices is never a bridge.
+        """
+        return self._cached('cuts', self._cuts)[1]
+
+    def is_articulation_point(self, handle: int) -> bool:
+        """Check whether removing a device would split its component."""
+        return _contains(self.articulation_points(), handle)
+
+    def is_bridge(self, link: int) -> bool:
+        """Check whether removing a link would split its component."""
+        return _contains(self.bridges(), link)
+
+    def _cuts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Find articulation points and bridges with an iterative depth-first search.
+
+        Tarjan's low-link method: ``low[v]`` is the earliest discovery time
+        reachable from the subtree of ``v`` through one back link. An
+        explicit stack of vertices replaces the recursion, with ``next_entry``
+        remembering how far through its neighbors each vertex got.
+        """
+        indptr, indices, edges = (array.tolist() for array in self.csr())
+        n = len(indptr) - 1
+        alive = self.model.device_alive
+        discovered = [-1] * n
+        low = [0] * n
+        via = [-1] * n
+        next_entry = indptr[:-1]
+        cut = bytearray(n)
+        bridges = []
+        clock = 0
+        for root in range(n):
+            if not alive[root] or discovered[root] >= 0:
+                continue
+            discovered[root] = low[root] = clock
+            clock += 1
+            root_children = 0
+            stack = [root]
+            while stack:
+                v = stack[-1]
+                i = next_entry[v]
+                if i < indptr[v + 1]:
+                    next_entry[v] = i + 1
+                    u, edge = indices[i], edges[i]
+                    if edge == via[v]:
+                        continue
+                    if discovered[u] < 0:
+                        discovered[u] = low[u] = clock
+                        clock += 1
+                        via[u] = edge
+                        stack.append(u)
+                        if v == root:
+                            root_children += 1
+                    elif discovered[u] < low[v]:
+                        low[v] = discovered[u]
+                    continue
+                stack.pop()
+                if stack:
+                    parent = stack[-1]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                    if low[v] > discovered[parent]:
+                        bridges.append(via[v])
+                    if parent != root and low[v] >= discovered[parent]:
+                        cut[parent] = 1
+            if root_children > 1:
+                cut[root] = 1
+        return (np.flatnonzero(np.frombuffer(bytes(cut), dtype=np.uint8)),
+                np.array(sorted(bridges), dtype=np.int64))
+
+    def summary(self) -> NetworkSummary:
+        """Get the connectivity figures of the whole topology."""
+        sizes = self.component_sizes()
+        return NetworkSummary(
+            devices=self.model.device_count,
+            links=self.model.link_count,
+            components=len(sizes),
+            largest_component=max(sizes.values(), default=0),
+            degrees=self.degree_stats(),
+            articulation_points=len(self.articulation_points()),
+            bridges=len(self.bridges()),
+        )
+    #endregion
+
+def _contains(values: np.ndarray, value: int) -> bool:
+    """Check for a value in a sorted array by binary search."""
+    i = int(np.searchsorted(values, value))
+    return i < len(values) and int(values[i]) == value
@@ -0,0 +1,211 @@
+import glob
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+from PIL import Image, ImageTk
+
+def find_icon_dir() -> Optional[str]:
+    """Locate the icons directory, checking the same places devices used to."""
+    candidates = [
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'icons'),
+        'icons',
+        os.path.join(os.getcwd(), 'icons'),
+        os.path.join(os.path.dirname(os.getcwd()), 'icons'),
+    ]
+    for path in candidates:
+        if os.path.isdir(path):
+            return path
+    return None
+
+def default_cache_dir() -> str:
+    """Get the per-user directory for cached icon variants."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'network_topology', 'icons')
+
+class DiskIconCache:
+    """On-disk cache of icons pre-scaled to a fixed set of zoom steps.
+
+    Variants are stored as raw RGBA pixels, so loading one is a single read
+    with no PNG decoding or resampling. Entries are keyed by the source path,
+    its mtime and file size, and the variant's pixel size; when a source icon
+    changes its key changes too, the variant is rebuilt on next use and the
+    stale file is removed.
+    """
+
+    ZOOM_STEPS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0)
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+
+    @classmethod
+    def sizes_for(cls, base_size: int) -> Tuple[int, ...]:
+        """Get the pixel sizes cached for an icon drawn at base_size at 100% zoom."""
+        return tuple(sorted({max(1, round(base_size * step)) for step in cls.ZOOM_STEPS}))
+
+    @classmethod
+    def nearest_size(cls, base_size: int, scale: float) -> int:
+        """Get the cached pixel size closest to an icon drawn at base_size and zoomed by scale."""
+        target = base_size * scale
+        return min(cls.sizes_for(base_size), key=lambda size: abs(size - target))
+
+    def _stem(self, source_path: str, size: int) -> str:
+        """Get the file name prefix shared by every version of a variant."""
+        name = os.path.splitext(os.path.basename(source_path))[0]
+        return f'{name}-{size}-'
+
+    def entry_path(self, source_path: str, size: int) -> str:
+        """Get the cache file for a source icon at a pixel size."""
+        source_path = os.path.abspath(source_path)
+        stat = os.stat(source_path)
+        key = hashlib.sha1(
+            f'{source_path}\0{stat.st_mtime_ns}\0{stat.st_size}\0{size}'.encode()
+        ).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{self._stem(source_path, size)}{key}.rgba')
+
+    def load(self, source_path: str, size: int) -> Optional[Image.Image]:
+        """Load a cached variant, or None if it is missing or stale."""
+        try:
+            with open(self.entry_path(source_path, size), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != size * size * 4:
+            return None
+        return Image.frombytes('RGBA', (size, size), data)
+
+    def store(self, source_path: str, size: int, image: Image.Image) -> None:
+        """Write a variant to the cache, replacing stale versions of it."""
+        try:
+            path = self.entry_path(source_path, size)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(image.convert('RGBA').tobytes())
+            os.replace(tmp_path, path)
+            pattern = os.path.join(self.cache_dir, glob.escape(self._stem(source_path, size)) + '*.rgba')
+            for stale in glob.glob(pattern):
+                if stale != path:
+                    os.remove(stale)
+        except OSError:
+            # The disk cache is an optimization; a read-only or full disk is not an error
+            pass
+
+    def scaled(self, source_path: str, size: int) -> Optional[Image.Image]:
+        """Get a source icon at a pixel size, resampling and caching it on a miss.
+
+        Returns:
+            Optional[Image.Image]: The scaled icon, or None if the source
+            cannot be read
+        """
+        image = self.load(source_path, size)
+        if image is not None:
+            return image
+        try:
+            with Image.open(source_path) as source:
+                image = source.convert('RGBA').resize((size, size), Image.Resampling.LANCZOS)
+        except Exception:
+            return None
+        self.store(source_path, size, image)
+        return image
+
+    def prebuild(self, source_paths: Iterable[str], base_size: int) -> int:
+        """Build every zoom-step variant of the given icons.
+
+        Returns:
+            int: Number of variants that were missing or stale and got rebuilt
+        """
+        built = 0
+        for source_path in source_paths:
+            for size in self.sizes_for(base_size):
+                if self.load(source_path, size) is None and self.scaled(source_path, size):
+                    built += 1
+        return built
+
+class IconCache:
+    """Process-wide cache of device icons shared by every device view.
+
+    One PhotoImage is kept per (device_type, pixel size), with least recently
+    used entries evicted beyond ``capacity``. Views hold their own reference
+    to the image they display, so eviction never blanks an icon on screen.
+    """
+
+    DEFAULT_CAPACITY = 64
+
+    _shared: Optional['IconCache'] = None
+
+    def __init__(self, icon_dir: Optional[str] = None, capacity: int = DEFAULT_CAPACITY,
+                 disk_cache: Optional[DiskIconCache] = None):
+        """Initialize the cache.
+
+        Args:
+            icon_dir: Directory holding <device_type>.png files; located
+                automatically if omitted
+            capacity: Maximum number of scaled images kept
+            disk_cache: Store of pre-scaled variants; the per-user cache
+                directory is used if omitted
+        """
+        self.icon_dir = icon_dir if icon_dir is not None else find_icon_dir()
+        self.capacity = capacity
+        self.disk_cache = disk_cache if disk_cache is not None else DiskIconCache()
+        self._images: 'OrderedDict[Tuple[str, int], ImageTk.PhotoImage]' = OrderedDict()
+        self._missing: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls) -> 'IconCache':
+        """Get the cache shared by the whole process, creating it on first use."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def icon_path(self, device_type: str) -> Optional[str]:
+        """Get the source image path for a device type."""
+        if self.icon_dir is None:
+            return None
+        return os.path.join(self.icon_dir, f'{device_type}.png')
+
+    def get(self, device_type: str, size: int) -> Optional[ImageTk.PhotoImage]:
+        """Get the icon for a device type scaled to size x size pixels.
+
+        Returns:
+            Optional[ImageTk.PhotoImage]: The shared image, or None if the
+            device type has no usable icon
+        """
+        key = (device_type, size)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        if device_type in self._missing:
+            return None
+        path = self.icon_path(device_type)
+        scaled = self.disk_cache.scaled(path, size) if path and os.path.exists(path) else None
+        if scaled is None:
+            self._missing.add(device_type)
+            return None
+        image = ImageTk.PhotoImage(scaled)
+        self._images[key] = image
+        if len(self._images) > self.capacity:
+            self._images.popitem(last=False)
+            self.evictions += 1
+        return image
+
+    def clear(self) -> None:
+        """Drop every cached image."""
+        self._images.clear()
+        self._missing.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters."""
+        return {
+            'entries': len(self._images),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
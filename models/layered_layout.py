@@ -0,0 +1,415 @@
+"""Layered (Sugiyama-style) layout of devices by network role.
+
+Devices are ranked into horizontal layers from their ``device_type``
+(firewalls on top, then routers, switches, and access points, servers and
+clients at the bottom) and their links. The order within each layer is
+chosen to reduce link crossings, then the devices are given coordinates
+that keep every device close to the devices it links to.
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from models.layout import LayoutResult, fit_boundaries, live_devices, live_links, model_positions
+from models.topology import TopologyModel
+
+# Layer of each role; the layers a topology does not use are dropped
+ROLE_TIERS = {
+    'firewall': 0,
+    'router': 1,
+    'switch': 2,
+    'access_point': 3,
+    'server': 3,
+    'client': 3,
+}
+LEAF_TIER = 3
+
+@dataclass
+class Ranking:
+    """Hierarchy of the devices derived from their roles and links.
+
+    Links run from a parent to a child when the parent has a lower tier, or
+    the same tier but fewer hops from a device of a lower tier; links
+    between devices at the same tier and depth have no direction.
+
+    Attributes:
+        handles: Handle of the device in each row
+        row: Row of each device handle, -1 for dead handles
+        order: Rows sorted parents first
+        rank: Layer of each row, at least its tier and below all its parents
+        parents: Parent rows of each row
+        children: Child rows of each row
+    """
+    handles: np.ndarray
+    row: np.ndarray
+    order: np.ndarray
+    rank: np.ndarray
+    parents: List[List[int]]
+    children: List[List[int]]
+
+def rank_devices(model: TopologyModel) -> Ranking:
+    """Derive the hierarchy of the live devices of a model."""
+    handles = live_devices(model)
+    n = len(handles)
+    row = np.full(len(model.device_alive), -1, dtype=np.int64)
+    row[handles] = np.arange(n)
+    tier_of_type = np.array([ROLE_TIERS.get(name, LEAF_TIER) for name in model.type_names] or [LEAF_TIER])
+    tier = tier_of_type[np.frombuffer(model.device_types, dtype=np.uint8)[handles]] if n else np.zeros(0, int)
+    a, b = live_links(model)
+    a, b = row[a], row[b]
+    neighbors: List[List[int]] = [[] for _ in range(n)]
+    for u, v in zip(a.tolist(), b.tolist()):
+        if u != v:
+            neighbors[u].append(v)
+            neighbors[v].append(u)
+
+    # Hops from the nearest device linked to a lower tier, within each tier;
+    # a group with no such link counts from its best connected device
+    depth = np.full(n, -1, dtype=np.int64)
+    tiers = tier.tolist()
+    uplinked = [i for i in range(n) if any(tiers[j] < tiers[i] for j in neighbors[i])]
+    by_degree = iter(sorted(range(n), key=lambda i: -len(neighbors[i])))
+    queue = uplinked
+    for i in uplinked:
+        depth[i] = 0
+    while True:
+        head = 0
+        while head < len(queue):
+            i = queue[head]
+            head += 1
+            for j in neighbors[i]:
+                if tiers[j] == tiers[i] and depth[j] < 0:
+                    depth[j] = depth[i] + 1
+                    queue.append(j)
+        start = next((i for i in by_degree if depth[i] < 0), None)
+        if start is None:
+            break
+        depth[start] = 0
+        queue = [start]
+
+    key = tier * (n + 1) + depth
+    keys = key.tolist()
+    parents: List[List[int]] = [[j for j in neighbors[i] if keys[j] < keys[i]] for i in range(n)]
+    children: List[List[int]] = [[j for j in neighbors[i] if keys[j] > keys[i]] for i in range(n)]
+    order = np.argsort(key, kind='stable')
+    rank = tier.astype(np.int64)
+    ranks = rank.tolist()
+    for i in order.tolist():
+        for p in parents[i]:
+            if ranks[p] + 1 > ranks[i]:
+                ranks[i] = ranks[p] + 1
+    rank = np.array(ranks, dtype=np.int64)
+    return Ranking(handles, row, order, rank, parents, children)
+
+class LayeredLayout:
+    """Sugiyama-style layered layout.
+
+    Links spanning several layers are routed through dummy nodes, one per
+    layer crossed. Crossings are reduced by sweeping the layers down and up,
+    sorting each by the barycenter of its neighbors in the previous layer,
+    keeping the order with the fewest crossings. Each layer is then placed
+    by alternately pulling every node to the mean x of its neighbors and
+    restoring the minimum spacing with the least total movement.
+    """
+
+    DEFAULT_SPACING = 120.0
+    DEFAULT_LAYER_GAP = 150.0
+    SWEEPS = 12
+    PLACEMENT_PASSES = 4
+    DUMMY_WIDTH = 0.3
+    BOUNDARY_PADDING = 30.0
+
+    def __init__(self, model: TopologyModel, spacing: float = DEFAULT_SPACING,
+                 layer_gap: float = DEFAULT_LAYER_GAP):
+        """Initialize the layout.
+
+        Args:
+            model: Model to lay out
+            spacing: Minimum horizontal distance between devices in a layer
+            layer_gap: Vertical distance between layers
+        """
+        self.model = model
+        self.spacing = spacing
+        self.layer_gap = layer_gap
+
+    def compute(self, handles: Optional[np.ndarray] = None) -> LayoutResult:
+        """Lay out all devices, or only the given ones among themselves.
+
+        The layout keeps the horizontal center and the top of the devices
+        it places.
+
+        Returns:
+            LayoutResult: Positions of the placed devices and the refitted
+            boundaries
+        """
+        ranking = rank_devices(self.model)
+        rows = (np.arange(len(ranking.handles)) if handles is None
+                else ranking.row[np.asarray(handles, dtype=np.int64)])
+        return self._place(ranking, rows, anchor=None)
+
+    def compute_subtree(self, root: int) -> LayoutResult:
+        """Lay out only the devices below a device, leaving the rest as they are.
+
+        The subtree holds the device and, recursively, every child whose
+        parents are all in the subtree, so devices shared with another part
+        of the topology stay put. The device itself keeps its position.
+
+        Args:
+            root: Handle of the device heading the subtree
+
+        Returns:
+            LayoutResult: Positions of the subtree devices
+        """
+        ranking = rank_devices(self.model)
+        start = int(ranking.row[root])
+        keys = np.empty(len(ranking.handles), dtype=np.int64)
+        keys[ranking.order] = np.arange(len(ranking.order))
+        members = {start}
+        heap = [(int(keys[child]), child) for child in ranking.children[start]]
+        heapq.heapify(heap)
+        while heap:
+            _, i = heapq.heappop(heap)
+            if i in members or not all(p in members for p in ranking.parents[i]):
+                continue
+            members.add(i)
+            for child in ranking.children[i]:
+                if child not in members:
+                    heapq.heappush(heap, (int(keys[child]), child))
+        rows = np.array(sorted(members), dtype=np.int64)
+        return self._place(ranking, rows, anchor=start)
+
+    def _place(self, ranking: Ranking, rows: np.ndarray, anchor: Optional[int]) -> LayoutResult:
+        """Lay out some rows and move the layout to where those devices are.
+
+        Args:
+            ranking: Hierarchy of all devices
+            rows: Rows to lay out
+            anchor: Row that keeps its position, or None to keep the
+                horizontal center and top of the rows
+        """
+        model = self.model
+        handles = ranking.handles[rows]
+        if not len(rows):
+            return LayoutResult(handles, np.zeros(0), np.zeros(0))
+        old_x = model_positions(model.device_x, handles)
+        old_y = model_positions(model.device_y, handles)
+        x, y = self._arrange(ranking, rows, old_x)
+        if anchor is None:
+            x += (old_x.min() + old_x.max() - x.min() - x.max()) / 2
+            y += old_y.min() - y.min()
+        else:
+            i = int(np.flatnonzero(rows == anchor)[0])
+            x += old_x[i] - x[i]
+            y += old_y[i] - y[i]
+        boundaries = fit_boundaries(model, handles, x, y, self.BOUNDARY_PADDING)
+        return LayoutResult(handles, x, y, boundaries)
+
+    def _arrange(self, ranking: Ranking, rows: np.ndarray,
+                 start_x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute positions of some rows relative to each other.
+
+        Args:
+            ranking: Hierarchy of all devices
+            rows: Rows to lay out
+            start_x: Current x of each row, for the initial order in each layer
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: x and y of each row
+        """
+        m = len(rows)
+        local = {int(r): i for i, r in enumerate(rows)}
+        # Drop the layers no device in the set uses
+        layer_ids, layer = np.unique(ranking.rank[rows], return_inverse=True)
+        layer = layer.ravel().tolist()
+        start = start_x.tolist()
+
+        # Proper layered graph: every edge joins adjacent layers, long
+        # edges passing through a dummy node on each layer in between
+        edges: List[Tuple[int, int]] = []
+        for i, r in enumerate(rows.tolist()):
+            for child in ranking.children[r]:
+                j = local.get(child)
+                if j is None:
+                    continue
+                upper = i
+                for level in range(layer[i] + 1, layer[j]):
+                    dummy = len(layer)
+                    layer.append(level)
+                    t = (level - layer[i]) / (layer[j] - layer[i])
+                    start.append(start[i] + (start[j] - start[i]) * t)
+                    edges.append((upper, dummy))
+                    upper = dummy
+                edges.append((upper, j))
+        node_layer = np.array(layer, dtype=np.int64)
+        count = len(layer_ids)
+        order = sorted(range(len(layer)), key=lambda node: (layer[node], start[node]))
+        layers = [[] for _ in range(count)]
+        for node in order:
+            layers[layer[node]].append(node)
+        layers = [np.array(nodes, dtype=np.int64) for nodes in layers]
+        if edges:
+            edge_upper, edge_lower = np.array(edges, dtype=np.int64).T
+        else:
+            edge_upper = edge_lower = np.zeros(0, dtype=np.int64)
+        between = node_layer[edge_upper]
+        pairs = [(edge_upper[between == level], edge_lower[between == level]) for level in range(count - 1)]
+
+        layers = self._reduce_crossings(layers, pairs, len(layer))
+        x = self._assign_x(layers, pairs, m, len(layer))
+        y = node_layer[:m] * self.layer_gap
+        return x, y.astype(np.float64)
+
+    #region Crossing reduction
+    def _reduce_crossings(self, layers: List[np.ndarray], pairs: List[Tuple[np.ndarray, np.ndarray]],
+                          nodes: int) -> List[np.ndarray]:
+        """Reorder the layers with barycenter sweeps, keeping the best order found."""
+        pos = np.zeros(nodes, dtype=np.int64)
+        for nodes_in_layer in layers:
+            pos[nodes_in_layer] = np.arange(len(nodes_in_layer))
+        best = list(layers)
+        best_crossings = _crossings(pairs, pos)
+        for sweep in range(self.SWEEPS):
+            if not best_crossings:
+                break
+            if sweep % 2 == 0:
+                for level in range(1, len(layers)):
+                    upper, lower = pairs[level - 1]
+                    layers[level] = _sort_by_barycenter(layers[level], lower, upper, pos, len(layers[level - 1]))
+            else:
+                for level in range(len(layers) - 2, -1, -1):
+                    upper, lower = pairs[level]
+                    layers[level] = _sort_by_barycenter(layers[level], upper, lower, pos, len(layers[level + 1]))
+            crossings = _crossings(pairs, pos)
+            if crossings < best_crossings:
+                best, best_crossings = list(layers), crossings
+        return best
+    #endregion
+
+    #region Coordinate assignment
+    def _assign_x(self, layers: List[np.ndarray], pairs: List[Tuple[np.ndarray, np.ndarray]],
+                  real: int, nodes: int) -> np.ndarray:
+        """Place the nodes of each layer close to their neighbors, keeping their order.
+
+        Args:
+            layers: Nodes of each layer in order
+            pairs: Edges between each layer and the next as (upper, lower)
+            real: Number of real nodes; the rest are dummies
+            nodes: Total number of nodes
+
+        Returns:
+            np.ndarray: x of each real node
+        """
+        width = np.where(np.arange(nodes) < real, 1.0, self.DUMMY_WIDTH) * self.spacing
+        x = np.zeros(nodes)
+        for nodes_in_layer in layers:
+            gaps = (width[nodes_in_layer[1:]] + width[nodes_in_layer[:-1]]) / 2
+            x[nodes_in_layer] = np.concatenate(([0.0], np.cumsum(gaps)))
+            x[nodes_in_layer] -= x[nodes_in_layer].mean()
+        count = len(layers)
+        for _ in range(self.PLACEMENT_PASSES):
+            for level in range(1, count):
+                upper, lower = pairs[level - 1]
+                self._align(layers[level], x, width, [(lower, upper)])
+            for level in range(count - 2, -1, -1):
+                upper, lower = pairs[level]
+                self._align(layers[level], x, width, [(upper, lower)])
+        for level in range(count):
+            sides = []
+            if level > 0:
+                sides.append(pairs[level - 1][::-1])
+            if level < count - 1:
+                sides.append(pairs[level])
+            self._align(layers[level], x, width, sides)
+        return x[:real]
+
+    def _align(self, nodes: np.ndarray, x: np.ndarray, width: np.ndarray,
+               sides: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Move one layer towards the mean x of its neighbors.
+
+        Args:
+            nodes: Nodes of the layer in order
+            x: x of every node, updated for the layer
+            width: Horizontal room of every node
+            sides: Edges to the neighboring layers as (node in this layer, neighbor)
+        """
+        if not len(nodes):
+            return
+        total = np.zeros(len(x))
+        degree = np.zeros(len(x))
+        for here, there in sides:
+            total += np.bincount(here, weights=x[there], minlength=len(x))
+            degree += np.bincount(here, minlength=len(x))
+        wanted = np.where(degree[nodes] > 0, total[nodes] / np.maximum(degree[nodes], 1), x[nodes])
+        offset = np.concatenate(([0.0], np.cumsum((width[nodes[1:]] + width[nodes[:-1]]) / 2)))
+        x[nodes] = _isotonic(wanted - offset) + offset
+    #endregion
+
+def _sort_by_barycenter(nodes: np.ndarray, here: np.ndarray, there: np.ndarray,
+                        pos: np.ndarray, size: int) -> np.ndarray:
+    """Sort a layer by the mean relative position of each node's neighbors.
+
+    Nodes without neighbors on that side keep their relative position.
+
+    Args:
+        nodes: Nodes of the layer in their current order
+        here: Edge ends in this layer
+        there: Matching edge ends in the neighboring layer
+        pos: Position of every node within its layer, updated for this layer
+        size: Number of nodes in the neighboring layer
+    """
+    n = len(nodes)
+    if n < 2:
+        return nodes
+    total = np.bincount(pos[here], weights=(pos[there] + 0.5) / size, minlength=n)
+    degree = np.bincount(pos[here], minlength=n)
+    own = (np.arange(n) + 0.5) / n
+    center = np.where(degree > 0, total / np.maximum(degree, 1), own)
+    nodes = nodes[np.lexsort((own, center))]
+    pos[nodes] = np.arange(n)
+    return nodes
+
+def _crossings(pairs: List[Tuple[np.ndarray, np.ndarray]], pos: np.ndarray) -> int:
+    """Count the edge crossings between every pair of adjacent layers."""
+    total = 0
+    for upper, lower in pairs:
+        order = np.lexsort((pos[lower], pos[upper]))
+        total += _inversions(pos[lower][order])
+    return total
+
+def _inversions(values: np.ndarray) -> int:
+    """Count the pairs i < j with values[i] > values[j] by a bottom-up merge sort.
+
+    Each round merges sorted runs pairwise, counting for every element of a
+    right run the larger elements of its left run with one binary search.
+    """
+    n = len(values)
+    if n < 2:
+        return 0
+    span = int(values.max()) + 1
+    index = np.arange(n)
+    run = values.astype(np.int64)
+    total = 0
+    width = 1
+    while width < n:
+        block = index // (2 * width)
+        keyed = block * span + run
+        right = (index // width) % 2 == 1
+        left_keys = keyed[~right]
+        block_end = np.searchsorted(left_keys, (block[right] + 1) * span)
+        total += int((block_end - np.searchsorted(left_keys, keyed[right], side='right')).sum())
+        run = np.sort(keyed) - block * span
+        width *= 2
+    return total
+
+def _isotonic(values: np.ndarray) -> np.ndarray:
+    """Get the nondecreasing sequence closest to the values in least squares (pool adjacent violators)."""
+    sums: List[float] = []
+    counts: List[int] = []
+    for value in values.tolist():
+        total, count = value, 1
+        while sums and sums[-1] / counts[-1] >= total / count:
+            total += sums.pop()
+            count += counts.pop()
+        sums.append(total)
+        counts.append(count)
+    return np.repeat(np.array(sums) / np.array(counts), counts)
@@ -0,0 +1,369 @@
+"""Automatic device placement over the topology model.
+
+Layouts compute new device positions without touching the model; the
+result is applied by the caller, e.g. animated on the canvas. Boundaries
+are refitted around the devices they held before the layout so that
+containment is preserved.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from models.topology import TopologyModel
+
+# Boundary rectangle as (x, y, width, height)
+BoundaryRect = Tuple[float, float, float, float]
+
+@dataclass
+class LayoutResult:
+    """New positions computed by a layout.
+
+    Attributes:
+        handles: Handles of the devices that were placed
+        x: New center x of each device, parallel to ``handles``
+        y: New center y of each device, parallel to ``handles``
+        boundaries: New rectangle of each boundary refitted around its devices
+    """
+    handles: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    boundaries: Dict[int, BoundaryRect] = field(default_factory=dict)
+
+    def deltas(self, model: TopologyModel) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the displacement of each device from its current model position."""
+        handles = self.handles
+        return (self.x - model_positions(model.device_x, handles),
+                self.y - model_positions(model.device_y, handles))
+
+def model_positions(column: Sequence[float], handles: np.ndarray) -> np.ndarray:
+    """Gather a device coordinate column for some handles without copying the column."""
+    return np.frombuffer(column, dtype=np.float64)[handles] if len(column) else np.zeros(0)
+
+def live_devices(model: TopologyModel) -> np.ndarray:
+    """Get the handles of all live devices as an array."""
+    return np.flatnonzero(np.frombuffer(model.device_alive, dtype=np.uint8))
+
+def live_links(model: TopologyModel) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the endpoint handles of all live links as two arrays."""
+    alive = np.frombuffer(model.link_alive, dtype=np.uint8).astype(bool)
+    a = np.frombuffer(model.link_a, dtype=np.int32)[alive]
+    b = np.frombuffer(model.link_b, dtype=np.int32)[alive]
+    return a, b
+
+def fit_boundaries(model: TopologyModel, handles: np.ndarray, x: np.ndarray, y: np.ndarray,
+                   padding: float) -> Dict[int, BoundaryRect]:
+    """Compute rectangles enclosing the devices each boundary currently contains.
+
+    Must be called before the devices move. A boundary holding other
+    boundaries gets one more ``padding`` per level of nesting, so nested
+    boundaries stay nested. Boundaries whose devices are not all in
+    ``handles`` or that hold no devices keep their rectangle.
+
+    Args:
+        model: Model holding the boundaries
+        handles: Devices being placed
+        x: New center x of each device
+        y: New center y of each device
+        padding: Margin between the devices and the boundary edge
+
+    Returns:
+        Dict[int, BoundaryRect]: New rectangle of each refitted boundary
+    """
+    index = {int(handle): i for i, handle in enumerate(handles)}
+    boundaries = list(model.boundaries())
+    rects = {b: model.boundary_rect(b) for b in boundaries}
+
+    # Nesting height: 0 for a boundary holding no other boundary
+    height: Dict[int, int] = {}
+    for b in sorted(boundaries, key=lambda b: _area(rects[b])):
+        height[b] = max((height[c] + 1 for c in height if c != b and _inside(rects[c], rects[b])),
+                        default=0)
+
+    half = model.DEVICE_SIZE / 2
+    fitted = {}
+    for b in boundaries:
+        members = [index.get(device) for device in model.containment.members_of(b)]
+        if not members or None in members:
+            continue
+        mx, my = x[members], y[members]
+        pad = half + padding * (height[b] + 1)
+        x1, y1 = float(mx.min()) - pad, float(my.min()) - pad
+        fitted[b] = (x1, y1, float(mx.max()) + pad - x1, float(my.max()) + pad - y1)
+    return fitted
+
+def _area(rect: Tuple[float, float, float, float]) -> float:
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+def _inside(inner: Tuple[float, float, float, float], outer: Tuple[float, float, float, float]) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[2] <= outer[2] and inner[3] <= outer[3])
+
+#region Barnes-Hut repulsion
+MORTON_BITS = 16
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the low 16 bits of every value."""
+    v = v.astype(np.uint64) & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+class QuadTree:
+    """Barnes-Hut quadtree over a set of points, stored level by level.
+
+    Points are sorted by Morton code, so the cells of every level are runs
+    of consecutive points and each level is built with a few vectorized
+    reductions instead of node-by-node insertion.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        """Build the tree.
+
+        Args:
+            x: Point x coordinates
+            y: Point y coordinates
+        """
+        n = len(x)
+        self.depth = min(MORTON_BITS, max(1, math.ceil(math.log2(max(n, 1)) / 2) + 2))
+        left, top = float(x.min()), float(y.min())
+        self.span = max(float(x.max()) - left, float(y.max()) - top, 1e-9) * (1 + 1e-9)
+        cells = 1 << self.depth
+        qx = ((x - left) * (cells / self.span)).astype(np.int64).clip(0, cells - 1)
+        qy = ((y - top) * (cells / self.span)).astype(np.int64).clip(0, cells - 1)
+        code = _spread_bits(qx) | (_spread_bits(qy) << 1)
+        self.order = np.argsort(code, kind='stable')
+        code = code[self.order]
+        sx, sy = x[self.order], y[self.order]
+
+        # Per level: cell mass and center of mass, the cell of each sorted
+        # point, and the range of child cells on the next level
+        self.mass: List[np.ndarray] = []
+        self.cx: List[np.ndarray] = []
+        self.cy: List[np.ndarray] = []
+        self.cell_of: List[np.ndarray] = []
+        self.child_start: List[np.ndarray] = []
+        self.child_count: List[np.ndarray] = []
+        keys = []
+        for level in range(self.depth + 1):
+            key = code >> np.uint64(2 * (self.depth - level))
+            new_cell = np.empty(n, dtype=bool)
+            new_cell[0] = True
+            np.not_equal(key[1:], key[:-1], out=new_cell[1:])
+            starts = np.flatnonzero(new_cell)
+            mass = np.diff(np.append(starts, n)).astype(np.float64)
+            self.mass.append(mass)
+            self.cx.append(np.add.reduceat(sx, starts) / mass)
+            self.cy.append(np.add.reduceat(sy, starts) / mass)
+            self.cell_of.append(np.cumsum(new_cell) - 1)
+            keys.append(key[starts])
+        for level in range(self.depth):
+            parent = np.searchsorted(keys[level], keys[level + 1] >> np.uint64(2))
+            count = np.bincount(parent, minlength=len(keys[level]))
+            self.child_start.append(np.cumsum(count) - count)
+            self.child_count.append(count)
+        self.sx, self.sy = sx, sy
+
+    def repulsion(self, strength: float, theta: float, min_distance2: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum an inverse-distance repulsion from every other point on each point.
+
+        Each point walks the tree from the root; a cell whose size over its
+        distance is below ``theta`` acts as a single mass at its center, so
+        only O(log n) cells are visited per point. The walk is vectorized
+        over all (point, cell) pairs of a level at once.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Force components per point, in the
+            order the points were given
+        """
+        n = len(self.sx)
+        fx = np.zeros(n)
+        fy = np.zeros(n)
+        points = np.arange(n)
+        cells = np.zeros(n, dtype=np.int64)
+        theta2 = theta * theta
+        for level in range(self.depth + 1):
+            mass = self.mass[level][cells]
+            dx = self.sx[points] - self.cx[level][cells]
+            dy = self.sy[points] - self.cy[level][cells]
+            d2 = dx * dx + dy * dy
+            own = self.cell_of[level][points] == cells
+            size = self.span / (1 << level)
+            if level == self.depth:
+                # Leaf cells: take the point itself out of its own cell's mass
+                rest = mass - own
+                keep = rest > 0
+                dx = np.where(own, dx * mass / np.maximum(rest, 1), dx)
+                dy = np.where(own, dy * mass / np.maximum(rest, 1), dy)
+                d2 = np.where(own, dx * dx + dy * dy, d2)
+                far, mass = keep, rest
+            else:
+                far = ~own & (size * size < theta2 * d2)
+            f = np.where(far, strength * mass / np.maximum(d2, min_distance2), 0.0)
+            fx += np.bincount(points, weights=f * dx, minlength=n)
+            fy += np.bincount(points, weights=f * dy, minlength=n)
+            if level == self.depth:
+                break
+            near = ~far
+            points, cells = points[near], cells[near]
+            count = self.child_count[level][cells]
+            first = self.child_start[level][cells]
+            total = int(count.sum())
+            offsets = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+            points = np.repeat(points, count)
+            cells = np.repeat(first, count) + offsets
+        out_x = np.empty(n)
+        out_y = np.empty(n)
+        out_x[self.order] = fx
+        out_y[self.order] = fy
+        return out_x, out_y
+#endregion
+
+class ForceLayout:
+    """Fruchterman-Reingold force-directed layout with Barnes-Hut repulsion.
+
+    Devices repel each other with force k²/d and links pull their devices
+    together with force d²/k, where k is the desired spacing; repulsion is
+    approximated with a quadtree so each iteration costs O(n log n).
+    Boundaries act as soft clusters: their devices are pulled towards their
+    center and other devices are pushed out of the area they cover. A weak
+    gravity keeps disconnected parts together, and the step size cools
+    linearly.
+    """
+
+    DEFAULT_SPACING = 120.0
+    DEFAULT_ITERATIONS = 120
+    THETA = 0.9
+    CLUSTER_STRENGTH = 2.0
+    GRAVITY = 0.02
+    BOUNDARY_PADDING = 30.0
+
+    def __init__(self, model: TopologyModel, spacing: float = DEFAULT_SPACING,
+                 iterations: int = DEFAULT_ITERATIONS, seed: int = 0):
+        """Initialize the layout.
+
+        Args:
+            model: Model to lay out
+            spacing: Desired distance between linked devices
+            iterations: Number of force steps
+            seed: Seed for spreading out devices that share a position
+        """
+        self.model = model
+        self.spacing = spacing
+        self.iterations = iterations
+        self.seed = seed
+
+    def compute(self, handles: Optional[Iterable[int]] = None) -> LayoutResult:
+        """Compute new positions.
+
+        Args:
+            handles: Devices to place; the others stay where they are but
+                still repel and attract them. All live devices if None.
+
+        Returns:
+            LayoutResult: Positions of the placed devices and the refitted
+            boundaries
+        """
+        model = self.model
+        everyone = live_devices(model)
+        moving = everyone if handles is None else np.fromiter(handles, dtype=np.int64)
+        if not len(moving):
+            return LayoutResult(moving, np.zeros(0), np.zeros(0))
+
+        # Compact numbering: row i of the arrays is device everyone[i]
+        row = np.full(len(model.device_alive), -1, dtype=np.int64)
+        row[everyone] = np.arange(len(everyone))
+        x = model_positions(model.device_x, everyone).copy()
+        y = model_positions(model.device_y, everyone).copy()
+        free = np.zeros(len(everyone), dtype=bool)
+        free[row[moving]] = True
+        self._spread_piles(x, y, free)
+
+        a, b = live_links(model)
+        a, b = row[a], row[b]
+        clusters = [np.fromiter(sorted(row[list(model.containment.members_of(boundary))]), dtype=np.int64)
+                    for boundary in model.boundaries()]
+        clusters = [members for members in clusters if len(members)]
+
+        k = self.spacing
+        n = len(everyone)
+        temperature = k * math.sqrt(n) / 4
+        for step in range(self.iterations):
+            fx, fy = self._forces(x, y, a, b, clusters)
+            limit = temperature * (1 - step / self.iterations) + k / 20
+            length = np.hypot(fx, fy)
+            scale = np.where(free, np.minimum(length, limit) / np.maximum(length, 1e-9), 0.0)
+            x += fx * scale
+            y += fy * scale
+
+        rows = row[moving]
+        boundaries = fit_boundaries(model, moving, x[rows], y[rows], self.BOUNDARY_PADDING)
+        return LayoutResult(moving, x[rows], y[rows], boundaries)
+
+    def _forces(self, x: np.ndarray, y: np.ndarray, a: np.ndarray, b: np.ndarray,
+                clusters: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the net force on every device.
+
+        Args:
+            x: Device x coordinates
+            y: Device y coordinates
+            a: First device row of each link
+            b: Second device row of each link
+            clusters: Device rows contained in each boundary
+        """
+        k = self.spacing
+        n = len(x)
+        fx, fy = QuadTree(x, y).repulsion(k * k, self.THETA, (k / 10) ** 2)
+
+        # Link attraction d²/k, i.e. d/k along the link vector
+        dx = x[a] - x[b]
+        dy = y[a] - y[b]
+        pull = np.hypot(dx, dy) / k
+        fx -= np.bincount(a, weights=pull * dx, minlength=n)
+        fy -= np.bincount(a, weights=pull * dy, minlength=n)
+        fx += np.bincount(b, weights=pull * dx, minlength=n)
+        fy += np.bincount(b, weights=pull * dy, minlength=n)
+
+        # Soft clusters: a boundary's devices are drawn to their center and
+        # other devices are pushed out of the disc they occupy
+        for members in clusters:
+            cx, cy = x[members].mean(), y[members].mean()
+            dx = x - cx
+            dy = y - cy
+            d = np.hypot(dx, dy)
+            radius = math.sqrt(float(np.mean(d[members] ** 2))) + k
+            pull = self.CLUSTER_STRENGTH * d[members] / k
+            fx[members] -= pull * dx[members]
+            fy[members] -= pull * dy[members]
+            push = self.CLUSTER_STRENGTH * np.maximum(radius - d, 0) / np.maximum(d, 1e-9)
+            push[members] = 0
+            fx += push * dx
+            fy += push * dy
+
+        # Gravity towards the overall center
+        dx = x - x.mean()
+        dy = y - y.mean()
+        pull = self.GRAVITY * np.hypot(dx, dy) / k
+        fx -= pull * dx
+        fy -= pull * dy
+        return fx, fy
+
+    def _spread_piles(self, x: np.ndarray, y: np.ndarray, free: np.ndarray) -> None:
+        """Scatter free devices that share a position over a disc sized for their number."""
+        rows = np.flatnonzero(free)
+        _, group, count = np.unique(
+            np.stack([x[rows], y[rows]], axis=1), axis=0,
+            return_inverse=True, return_counts=True
+        )
+        group = group.ravel()
+        piled = count[group] > 1
+        if not piled.any():
+            return
+        rng = np.random.default_rng(self.seed)
+        rows = rows[piled]
+        radius = self.spacing * np.sqrt(count[group[piled]]) / 2
+        angle = rng.uniform(0, 2 * math.pi, len(rows))
+        r = radius * np.sqrt(rng.uniform(0, 1, len(rows)))
+        x[rows] += r * np.cos(angle)
+        y[rows] += r * np.sin(angle)
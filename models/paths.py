@@ -0,0 +1,253 @@
+"""Weighted shortest paths between the devices of a topology model.
+
+Each link costs what its connection type costs, unless a metric was set
+for that link. Searches run over the shared CSR adjacency of the model's
+TopologyGraph and their results are cached until the topology or the
+metrics change.
+"""
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from itertools import count
+from typing import Dict, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary, ref
+import numpy as np
+from models.enums import ConnectionType
+from models.graph import TopologyGraph
+from models.topology import TopologyModel
+
+@dataclass
+class NetworkPath:
+    """A loopless path through the topology."""
+    devices: List[int]
+    links: List[int]
+    cost: float
+
+class PathFinder:
+    """Finds the cheapest paths between devices, with k-shortest alternatives.
+
+    Searches are A* with a binary heap, guided by the unrestricted cost
+    of every device to the target, which a single Dijkstra search from the
+    target provides. Alternatives come from Yen's algorithm, so every path
+    returned is loopless and distinct from the others.
+    """
+
+    # Roughly a 10 Gbit/s reference bandwidth over the link's typical
+    # bandwidth, as OSPF costs links
+    DEFAULT_COSTS: Dict[ConnectionType, float] = {
+        ConnectionType.ETHERNET: 10.0,
+        ConnectionType.FIBER: 1.0,
+        ConnectionType.WIRELESS: 30.0,
+        ConnectionType.VPN: 50.0,
+        ConnectionType.SERIAL: 500.0,
+        ConnectionType.USB: 20.0
+    }
+
+    _instances: 'WeakKeyDictionary[TopologyModel, PathFinder]' = WeakKeyDictionary()
+
+    def __init__(self, model: TopologyModel, costs: Optional[Dict[ConnectionType, float]] = None):
+        """Initialize the path finder.
+
+        Args:
+            model: Model whose links are searched
+            costs: Cost per connection type, replacing the matching default costs
+        """
+        self._model = ref(model)
+        self.graph = TopologyGraph.for_model(model)
+        self.costs = dict(self.DEFAULT_COSTS)
+        self.costs.update(costs or {})
+        self.metrics: Dict[int, float] = {}
+        self._metrics_version = 0
+        self._state: Optional[Tuple[int, int]] = None
+        self._paths: Dict[Tuple[int, int], Tuple[int, List[NetworkPath]]] = {}
+        self._bounds: Dict[int, List[float]] = {}
+
+    @property
+    def model(self) -> TopologyModel:
+        """The searched model, held weakly so the shared finder does not keep it alive."""
+        return self._model()
+
+    @classmethod
+    def for_model(cls, model: TopologyModel) -> 'PathFinder':
+        """Get the path finder shared by every user of a model."""
+        finder = cls._instances.get(model)
+        if finder is None:
+            finder = cls._instances[model] = cls(model)
+        return finder
+
+    def set_metric(self, link: int, cost: Optional[float]) -> None:
+        """Set the cost of one link, or restore its connection type's cost with None.
+
+        Raises:
+            ValueError: If the cost is negative
+        """
+        if cost is None:
+            self.metrics.pop(link, None)
+        elif cost < 0:
+            raise ValueError("Link costs must not be negative")
+        else:
+            self.metrics[link] = float(cost)
+        self._metrics_version += 1
+
+    def link_cost(self, link: int) -> float:
+        """Get the cost of crossing a link."""
+        cost = self.metrics.get(link)
+        return cost if cost is not None else self.costs[self.model.link_type(link)]
+
+    def shortest_path(self, source: int, target: int) -> Optional[NetworkPath]:
+        """Get the cheapest path between two devices, or None if they are not connected."""
+        paths = self.k_shortest_paths(source, target, 1)
+        return paths[0] if paths else None
+
+    def k_shortest_paths(self, source: int, target: int, k: int) -> List[NetworkPath]:
+        """Get up to k cheapest loopless paths between two devices, cheapest first.
+
+        Args:
+            source: Handle of the device the paths start at
+            target: Handle of the device the paths end at
+            k: Number of paths wanted
+
+        Returns:
+            List[NetworkPath]: Fewer than k paths when no more exist
+        """
+        self._validate()
+        cached = self._paths.get((source, target))
+        if cached is not None and (cached[0] >= k or len(cached[1]) < cached[0]):
+            return cached[1][:k]
+        paths = self._yen(source, target, k)
+        self._paths[(source, target)] = (k, paths)
+        return list(paths)
+
+    #region Search
+    def _validate(self) -> None:
+        """Drop cached results and reload the adjacency if the topology or metrics changed."""
+        state = (self.graph.version, self._metrics_version)
+        if state == self._state:
+            return
+        self._state = state
+        self._paths.clear()
+        self._bounds.clear()
+        model = self.model
+        indptr, indices, edges = self.graph.csr()
+        self._adjacency = (indptr.tolist(), indices.tolist(), edges.tolist())
+        table = np.array([self.costs[kind] for kind in model.CONNECTION_TYPES], dtype=np.float64)
+        weights = table[np.frombuffer(model.link_types, dtype=np.uint8)]
+        for link, cost in self.metrics.items():
+            if link < len(weights):
+                weights[link] = cost
+        self._weights = weights.tolist()
+
+    def _distances(self, target: int) -> List[float]:
+        """Get the cost of the cheapest path from every device to a target, -1 where unreachable.
+
+        One full Dijkstra search per target. Banning devices and links can
+        only make paths dearer, so these costs bound every later search to
+        the same target from below.
+        """
+        distance = self._bounds.get(target)
+        if distance is not None:
+            return distance
+        indptr, indices, edges = self._adjacency
+        weights = self._weights
+        distance = [-1.0] * (len(indptr) - 1)
+        heap = [(0.0, target)]
+        while heap:
+            d, v = heappop(heap)
+            if distance[v] >= 0:
+                continue
+            distance[v] = d
+            for i in range(indptr[v], indptr[v + 1]):
+                u = indices[i]
+                if distance[u] < 0:
+                    heappush(heap, (d + weights[edges[i]], u))
+        self._bounds[target] = distance
+        return distance
+
+    def _search(self, source: int, target: int, banned_devices: Set[int],
+                banned_links: Set[int]) -> Optional[NetworkPath]:
+        """Find the cheapest path avoiding some devices and links with A*.
+
+        The cost left from a device is estimated by its unrestricted cost
+        to the target; among equal estimates the deeper device is expanded
+        first, so the search heads straight for the target when the
+        restrictions do not get in the way.
+        """
+        bound = self._distances(target)
+        if bound[source] < 0:
+            return None
+        indptr, indices, edges = self._adjacency
+        weights = self._weights
+        cost = {source: 0.0}
+        via: Dict[int, Tuple[int, int]] = {}
+        done = set()
+        heap = [(bound[source], -0.0, source)]
+        while heap:
+            _, d, v = heappop(heap)
+            d = -d
+            if v == target:
+                break
+            if v in done:
+                continue
+            done.add(v)
+            for i in range(indptr[v], indptr[v + 1]):
+                u = indices[i]
+                link = edges[i]
+                if u in done or u in banned_devices or link in banned_links:
+                    continue
+                du = d + weights[link]
+                if du < cost.get(u, float('inf')):
+                    cost[u] = du
+                    via[u] = (v, link)
+                    heappush(heap, (du + bound[u], -du, u))
+        else:
+            return None
+
+        devices = [target]
+        links = []
+        while devices[-1] != source:
+            v, link = via[devices[-1]]
+            devices.append(v)
+            links.append(link)
+        devices.reverse()
+        links.reverse()
+        return NetworkPath(devices, links, cost[target])
+
+    def _yen(self, source: int, target: int, k: int) -> List[NetworkPath]:
+        """Find up to k loopless paths with Yen's algorithm.
+
+        Each new path leaves the previous one at some device, its spur,
+        after sharing its first links, the root. The spur search avoids the
+        root's devices and the links that paths already found take out of
+        the same root; the cheapest of all such detours is the next path.
+        As Lawler noted, spurs before the point where the previous path
+        itself deviated only repeat detours already found.
+        """
+        first = self._search(source, target, set(), set())
+        if first is None:
+            return []
+        weights = self._weights
+        found = [first]
+        deviation = 0
+        seen = {tuple(first.links)}
+        candidates: List[Tuple[float, int, int, int, NetworkPath]] = []
+        order = count()
+        while len(found) < k:
+            last = found[-1]
+            root_cost = sum(weights[link] for link in last.links[:deviation])
+            for i in range(deviation, len(last.links)):
+                root_links = last.links[:i]
+                banned_links = {path.links[i] for path in found
+                                if len(path.links) > i and path.links[:i] == root_links}
+                spur = self._search(last.devices[i], target, set(last.devices[:i]), banned_links)
+                if spur is not None:
+                    links = root_links + spur.links
+                    if tuple(links) not in seen:
+                        seen.add(tuple(links))
+                        path = NetworkPath(last.devices[:i] + spur.devices, links, root_cost + spur.cost)
+                        heappush(candidates, (path.cost, len(links), next(order), i, path))
+                root_cost += weights[last.links[i]]
+            if not candidates:
+                break
+            *_, deviation, path = heappop(candidates)
+            found.append(path)
+        return found
+    #endregion
@@ -0,0 +1,324 @@
+import re
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Set
+from weakref import WeakKeyDictionary
+
+if TYPE_CHECKING:
+    import tkinter as tk
+    from .connection import Connection
+
+_TCL_SPECIAL = re.compile(r'[\s"$;\[\]{}\\]')
+
+def _tcl_escape(match: 're.Match') -> str:
+    char = match.group()
+    # A backslash before a newline would continue the line instead
+    return '\\n' if char == '\n' else '\\' + char
+
+def tcl_word(value: Any) -> str:
+    """Quote a value as a single word of a Tcl command.
+
+    Tuples and lists become Tcl lists; other values are converted with str(),
+    so images and widgets are passed by name.
+    """
+    if isinstance(value, (tuple, list)):
+        value = ' '.join(tcl_word(element) for element in value)
+    else:
+        value = str(value)
+    if not value:
+        return '{}'
+    return _TCL_SPECIAL.sub(_tcl_escape, value)
+
+class CanvasBatch:
+    """Accumulates canvas commands and submits them as one Tcl script.
+
+    Each Tkinter canvas call is a separate round trip into Tcl, which
+    dominates the cost of creating thousands of items. While ``collect()``
+    is active, the item pool and layer stack queue their commands here
+    instead, and the whole script is evaluated once when it ends.
+
+    Tk numbers canvas items sequentially, so ``create()`` can return the id
+    an item will get before it exists; ``submit()`` checks the prediction
+    against the ids the script returns. Items must therefore not be created
+    on the canvas directly while collecting.
+    """
+
+    _instances: 'WeakKeyDictionary[tk.Canvas, CanvasBatch]' = WeakKeyDictionary()
+
+    def __init__(self, canvas: 'tk.Canvas'):
+        self.canvas = canvas
+        self.commands: List[str] = []
+        self.predicted: List[int] = []
+        self.next_id: Optional[int] = None
+        self.depth = 0
+
+    @classmethod
+    def for_canvas(cls, canvas: 'tk.Canvas') -> 'CanvasBatch':
+        """Get the batch shared by every view on a canvas."""
+        batch = cls._instances.get(canvas)
+        if batch is None:
+            batch = cls._instances[canvas] = cls(canvas)
+        return batch
+
+    @contextmanager
+    def collect(self) -> Iterator[None]:
+        """Queue canvas commands until the outermost block exits, then submit them."""
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                self.submit()
+
+    def create(self, kind: str, coords: Sequence[float], **options) -> int:
+        """Create an item, or queue its creation while collecting.
+
+        Like the other command methods, this calls the
+        canvas directly when no batch is being collected.
+
+        Returns:
+            int: The id the item has, or will have once submitted
+        """
+        if not self.depth:
+            return getattr(self.canvas, f'create_{kind}')(*coords, **options)
+        if self.next_id is None:
+            self.next_id = self._peek_next_id()
+        item = self.next_id
+        self.next_id += 1
+        self.predicted.append(item)
+        self.commands.append(
+            f'lappend ids [{self._command("create", kind, *coords, **options)}]'
+        )
+        return item
+
+    def coords(self, item: int, *coords: float) -> None:
+        if self.depth:
+            self.commands.append(self._command('coords', item, *coords))
+        else:
+            self.canvas.coords(item, *coords)
+
+    def move(self, item: int, dx: float, dy: float) -> None:
+        if self.depth:
+            self.commands.append(self._command('move', item, dx, dy))
+        else:
+            self.canvas.move(item, dx, dy)
+
+    def itemconfigure(self, item: int, **options) -> None:
+        if self.depth:
+            self.commands.append(self._command('itemconfigure', item, **options))
+        else:
+            self.canvas.itemconfigure(item, **options)
+
+    def lower(self, item: int, below: int) -> None:
+        if self.depth:
+            self.commands.append(self._command('lower', item, below))
+        else:
+            self.canvas.tag_lower(item, below)
+
+    def delete(self, *items: int) -> None:
+        if not items:
+            return
+        if self.depth:
+            self.commands.append(self._command('delete', *items))
+        else:
+            self.canvas.delete(*items)
+
+    def submit(self) -> List[int]:
+        """Evaluate the queued commands in one round trip.
+
+        Returns:
+            List[int]: Ids of the items created by the script, in order
+
+        Raises:
+            RuntimeError: If items were created on the canvas outside the
+                batch, so that the predicted ids are wrong
+        """
+        commands, self.commands = self.commands, []
+        predicted, self.predicted = self.predicted, []
+        self.next_id = None
+        if not commands:
+            return []
+        # A lambda body is compiled once and keeps the id list local
+        script = 'apply {{} {\nset ids {}\n%s\nreturn $ids\n}}' % '\n'.join(commands)
+        ids = [int(item) for item in self.canvas.tk.splitlist(self.canvas.tk.eval(script))]
+        if ids != predicted:
+            raise RuntimeError("Canvas items were created outside of the batch")
+        return ids
+
+    def _command(self, *args, **options) -> str:
+        words = [str(self.canvas), *args]
+        for key, value in options.items():
+            if value is not None:
+                words.append('-' + key.rstrip('_'))
+                words.append(value)
+        return ' '.join(tcl_word(word) for word in words)
+
+    def _peek_next_id(self) -> int:
+        """Get the id Tk will give the next item, at the cost of a throwaway item."""
+        path = str(self.canvas)
+        return int(self.canvas.tk.eval(f'{path} delete [set id [{path} create line 0 0 0 0]]; set id')) + 1
+
+class CanvasLayers:
+    """Keeps canvas items stacked by layer using one hidden marker item per layer.
+
+    New items are lowered just beneath the marker of their layer, so the
+    stacking order is fixed once at creation and never has to be restored
+    while items move.
+    """
+
+    LAYERS = ('boundary', 'connection', 'device')
+
+    _instances: 'WeakKeyDictionary[tk.Canvas, CanvasLayers]' = WeakKeyDictionary()
+
+    def __init__(self, canvas: 'tk.Canvas'):
+        self.canvas = canvas
+        self.markers: Dict[str, int] = {}
+
+    @classmethod
+    def for_canvas(cls, canvas: 'tk.Canvas') -> 'CanvasLayers':
+        """Get the layer stack shared by every view on a canvas."""
+        layers = cls._instances.get(canvas)
+        if layers is None:
+            layers = cls._instances[canvas] = cls(canvas)
+        return layers
+
+    def _ensure_markers(self) -> None:
+        """Create the layer markers, bottom layer first."""
+        if self.markers:
+            return
+        batch = CanvasBatch.for_canvas(self.canvas)
+        for layer in self.LAYERS:
+            self.markers[layer] = batch.create(
+                'line', (0, 0, 0, 0), state='hidden', tags=('layer_marker',)
+            )
+
+    def place(self, item: int, layer: str) -> None:
+        """Stack an item at the top of its layer."""
+        self._ensure_markers()
+        CanvasBatch.for_canvas(self.canvas).lower(item, self.markers[layer])
+
+    def reset(self) -> None:
+        """Forget the markers after the canvas has been cleared."""
+        self.markers.clear()
+
+class ItemPool:
+    """Recycles hidden canvas items instead of deleting and recreating them.
+
+    Views acquire items under a role such as ``'device.name'`` and release
+    them when they leave the visible area. A released item is hidden and
+    kept for the next acquire of the same role, so it already carries the
+    options that role never changes and already sits in the right layer;
+    only its coordinates and the options passed in are reconfigured.
+    """
+
+    DEFAULT_CAPACITY = 4096
+
+    _instances: 'WeakKeyDictionary[tk.Canvas, ItemPool]' = WeakKeyDictionary()
+
+    def __init__(self, canvas: 'tk.Canvas', capacity: int = DEFAULT_CAPACITY):
+        self.canvas = canvas
+        self.capacity = capacity
+        self.free: Dict[str, List[int]] = {}
+        self.size = 0
+        self.created = 0
+        self.reused = 0
+
+    @classmethod
+    def for_canvas(cls, canvas: 'tk.Canvas') -> 'ItemPool':
+        """Get the item pool shared by every view on a canvas."""
+        pool = cls._instances.get(canvas)
+        if pool is None:
+            pool = cls._instances[canvas] = cls(canvas)
+        return pool
+
+    def acquire(self, role: str, kind: str, layer: str, coords: Sequence[float],
+                restack: bool = False, **options) -> int:
+        """Get a visible item for a role, recycling a released one if possible.
+
+        Args:
+            role: Pool key; items of one role must share kind and layer
+            kind: Canvas item type, e.g. 'line' or 'text'
+            layer: CanvasLayers layer a newly created item is placed in
+            coords: Item coordinates
+            restack: Also move a recycled item to the top of its layer, for
+                views whose items overlap each other
+            **options: Item options; every option that varies within the
+                role must be passed
+        """
+        batch = CanvasBatch.for_canvas(self.canvas)
+        free = self.free.get(role)
+        if free:
+            item = free.pop()
+            self.size -= 1
+            self.reused += 1
+            batch.coords(item, *coords)
+            batch.itemconfigure(item, state='normal', **options)
+            if restack:
+                CanvasLayers.for_canvas(self.canvas).place(item, layer)
+            return item
+        item = batch.create(kind, coords, **options)
+        self.created += 1
+        CanvasLayers.for_canvas(self.canvas).place(item, layer)
+        return item
+
+    def release(self, role: str, item: int) -> None:
+        """Hide an item and keep it for reuse, or delete it if the pool is full."""
+        batch = CanvasBatch.for_canvas(self.canvas)
+        if self.size >= self.capacity:
+            batch.delete(item)
+            return
+        batch.itemconfigure(item, state='hidden')
+        self.free.setdefault(role, []).append(item)
+        self.size += 1
+
+    def drain(self) -> None:
+        """Delete every pooled item, e.g. after a redraw left roles unused."""
+        items = [item for free in self.free.values() for item in free]
+        CanvasBatch.for_canvas(self.canvas).delete(*items)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget pooled items after the canvas has been cleared."""
+        self.free.clear()
+        self.size = 0
+
+class RedrawQueue:
+    """Coalesces connection redraws on a canvas into one idle-time flush.
+
+    Moving a device marks its connections dirty; the lines are re-projected
+    once when Tk goes idle, however many motion events arrived in between.
+    """
+
+    _instances: 'WeakKeyDictionary[tk.Canvas, RedrawQueue]' = WeakKeyDictionary()
+
+    def __init__(self, canvas: 'tk.Canvas'):
+        self.canvas = canvas
+        self.dirty: Set['Connection'] = set()
+        self._scheduled = False
+
+    @classmethod
+    def for_canvas(cls, canvas: 'tk.Canvas') -> 'RedrawQueue':
+        """Get the redraw queue shared by every connection on a canvas."""
+        queue = cls._instances.get(canvas)
+        if queue is None:
+            queue = cls._instances[canvas] = cls(canvas)
+        return queue
+
+    def mark(self, connection: 'Connection') -> None:
+        """Queue a connection for redraw on the next flush."""
+        self.dirty.add(connection)
+        if not self._scheduled:
+            self._scheduled = True
+            self.canvas.after_idle(self.flush)
+
+    def discard(self, connection: 'Connection') -> None:
+        """Drop a connection from the queue, e.g. when it is deleted."""
+        self.dirty.discard(connection)
+
+    def flush(self) -> None:
+        """Redraw every queued connection."""
+        self._scheduled = False
+        dirty = self.dirty
+        self.dirty = set()
+        for connection in dirty:
+            connection.update_position()
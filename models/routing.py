@@ -0,0 +1,267 @@
+"""Orthogonal connection routing around devices and boundaries.
+
+Routes run along a sparse grid made of the edges of the obstacles near a
+connection, inflated by a margin, and the connection's end points; a
+path with the fewest bends is then searched on that grid. Routes are
+cached per link and indexed spatially, so an edit only reroutes the
+connections passing near what changed.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from models.spatial import Rect, SpatialGrid
+from models.topology import TopologyModel
+
+Point = Tuple[float, float]
+
+class ConnectionRouter:
+    """Computes and caches orthogonal routes for the links of a model.
+
+    The router observes the model. When a device or boundary is added,
+    moved, resized or removed, the routes of its own links and every route
+    touching its old or new footprint are dropped, and ``on_invalidate`` is
+    called with their link handles so their views can be redrawn. Dropped
+    routes are recomputed the next time they are asked for.
+    """
+
+    DEFAULT_MARGIN = 15.0
+    SEARCH_PADDING = 2 * TopologyModel.DEVICE_SIZE
+    SEARCH_GROWTH = 4
+    MAX_GRID_NODES = 1_000_000
+
+    def __init__(self, model: TopologyModel, margin: float = DEFAULT_MARGIN,
+                 on_invalidate: Optional[Callable[[Set[int]], None]] = None):
+        """Initialize the router and start observing the model.
+
+        Args:
+            model: Model whose links are routed
+            margin: Clearance kept between routes and obstacles
+            on_invalidate: Called with the handles of links whose route was dropped
+        """
+        self.model = model
+        self.margin = margin
+        self.on_invalidate = on_invalidate
+        self.routes: Dict[int, List[Point]] = {}
+        self.route_index = SpatialGrid(model.INDEX_CELL_SIZE)
+        self._device_rects: Dict[int, Rect] = {}
+        self._boundary_rects: Dict[int, Rect] = {}
+        self._reset()
+        model.observers.append(self._observe)
+
+    def detach(self) -> None:
+        """Stop observing the model."""
+        if self._observe in self.model.observers:
+            self.model.observers.remove(self._observe)
+
+    def route(self, link: int) -> List[Point]:
+        """Get the route of a link as a polyline from its first to its second device.
+
+        Falls back to a straight line when no route is found or the search
+        would be too large.
+        """
+        points = self.routes.get(link)
+        if points is None:
+            points = self._find_route(*self.model.link_endpoints(link))
+            self.routes[link] = points
+            xs = [x for x, _ in points]
+            ys = [y for _, y in points]
+            self.route_index.insert(link, (min(xs), min(ys), max(xs), max(ys)))
+        return points
+
+    #region Invalidation
+    def _reset(self) -> None:
+        model = self.model
+        self.routes.clear()
+        self.route_index.clear()
+        self._device_rects = {handle: model.device_index.rect(handle) for handle in model.devices()}
+        self._boundary_rects = {handle: model.boundary_rect(handle) for handle in model.boundaries()}
+
+    def _observe(self, op: str, handle: int, fields: Dict) -> None:
+        """Drop the routes affected by a model edit."""
+        model = self.model
+        if op == 'clear':
+            # Sent before the model empties its tables, so nothing is read back
+            self.routes.clear()
+            self.route_index.clear()
+            self._device_rects.clear()
+            self._boundary_rects.clear()
+            return
+        if op == 'remove_link':
+            self._drop({handle})
+            return
+        if op in ('add_device', 'place_device', 'remove_device'):
+            rects = self._device_rects
+            new = model.device_index.rect(handle) if op != 'remove_device' else None
+            links = set(model.device_links(handle)) if new else set()
+        elif op in ('add_boundary', 'place_boundary', 'resize_boundary', 'remove_boundary'):
+            rects = self._boundary_rects
+            new = model.boundary_rect(handle) if op != 'remove_boundary' else None
+            links = set()
+        else:
+            return
+        old = rects.pop(handle, None)
+        if new:
+            rects[handle] = new
+        for rect in (old, new):
+            if rect:
+                links.update(self._routes_touching(rect))
+        self._drop(links)
+
+    def _routes_touching(self, rect: Rect) -> Iterator[int]:
+        """Get the cached routes passing through or along an inflated rectangle."""
+        m = self.margin
+        x1, y1, x2, y2 = rect[0] - m, rect[1] - m, rect[2] + m, rect[3] + m
+        for link in self.route_index.query_rect((x1, y1, x2, y2)):
+            points = self.routes[link]
+            for (ax, ay), (bx, by) in zip(points, points[1:]):
+                if (min(ax, bx) <= x2 and x1 <= max(ax, bx)
+                        and min(ay, by) <= y2 and y1 <= max(ay, by)):
+                    yield link
+                    break
+
+    def _drop(self, links: Set[int]) -> None:
+        links = {link for link in links if link in self.routes}
+        for link in links:
+            del self.routes[link]
+            self.route_index.remove(link)
+        if links and self.on_invalidate:
+            self.on_invalidate(links)
+    #endregion
+
+    #region Search
+    def _obstacles(self, region: Rect, ends: Tuple[int, int], points: Tuple[Point, Point]) -> List[Rect]:
+        """Get the inflated rectangles a route within a region must avoid.
+
+        The end devices, boundaries enclosing an end, and anything covering
+        an end point are passable.
+        """
+        model = self.model
+        m = self.margin
+        # Anything within the margin outside the region still reaches into it
+        reach = (region[0] - m, region[1] - m, region[2] + m, region[3] + m)
+        rects = [model.device_index.rect(handle)
+                 for handle in model.device_index.query_rect(reach) if handle not in ends]
+        rects.extend(model.boundary_rect(handle) for handle in model.boundary_index.query_rect(reach))
+        obstacles = []
+        for x1, y1, x2, y2 in rects:
+            x1, y1, x2, y2 = x1 - m, y1 - m, x2 + m, y2 + m
+            if not any(x1 < px < x2 and y1 < py < y2 for px, py in points):
+                obstacles.append((x1, y1, x2, y2))
+        return obstacles
+
+    def _find_route(self, device1: int, device2: int) -> List[Point]:
+        """Search a route between two devices, widening the search area once if needed."""
+        model = self.model
+        start = model.device_position(device1)
+        goal = model.device_position(device2)
+        for growth in (1, self.SEARCH_GROWTH):
+            pad = self.SEARCH_PADDING * growth
+            region = (min(start[0], goal[0]) - pad, min(start[1], goal[1]) - pad,
+                      max(start[0], goal[0]) + pad, max(start[1], goal[1]) + pad)
+            path = self._search(region, self._obstacles(region, (device1, device2), (start, goal)),
+                                start, goal)
+            if path:
+                return path
+        return [start, goal]
+
+    def _search(self, region: Rect, obstacles: List[Rect], start: Point, goal: Point) -> Optional[List[Point]]:
+        """Find a route with the fewest bends on the sparse grid of a region.
+
+        Grid nodes joined by free grid edges form straight runs. Runs
+        reachable with k bends are found a level at a time, each level
+        taking the runs that cross the previous level's perpendicular ones,
+        until one holds the goal; the route is then traced back choosing
+        the bend on each run that keeps it shortest.
+
+        Returns:
+            Optional[List[Point]]: Corners of the route, or None if there is
+            no route within the region or the grid would be too large
+        """
+        rx1, ry1, rx2, ry2 = region
+        xs = {rx1, rx2, start[0], goal[0]}
+        ys = {ry1, ry2, start[1], goal[1]}
+        for x1, y1, x2, y2 in obstacles:
+            xs.update(x for x in (x1, x2) if rx1 < x < rx2)
+            ys.update(y for y in (y1, y2) if ry1 < y < ry2)
+        xs = np.array(sorted(xs))
+        ys = np.array(sorted(ys))
+        nx, ny = len(xs), len(ys)
+        if nx * ny > self.MAX_GRID_NODES:
+            return None
+
+        # Grid nodes strictly inside an obstacle, and grid edges running
+        # through one; nodes on an obstacle's edge stay free
+        blocked = np.zeros((nx, ny), dtype=bool)
+        h_blocked = np.zeros((nx - 1, ny), dtype=bool)
+        v_blocked = np.zeros((nx, ny - 1), dtype=bool)
+        for x1, y1, x2, y2 in obstacles:
+            ix_in = slice(np.searchsorted(xs, x1, 'right'), np.searchsorted(xs, x2, 'left'))
+            iy_in = slice(np.searchsorted(ys, y1, 'right'), np.searchsorted(ys, y2, 'left'))
+            ix_on = slice(np.searchsorted(xs, x1, 'left'), np.searchsorted(xs, x2, 'right') - 1)
+            iy_on = slice(np.searchsorted(ys, y1, 'left'), np.searchsorted(ys, y2, 'right') - 1)
+            blocked[ix_in, iy_in] = True
+            h_blocked[ix_on, iy_in] = True
+            v_blocked[ix_in, iy_on] = True
+        free = ~blocked
+        start_node = (int(np.searchsorted(xs, start[0])), int(np.searchsorted(ys, start[1])))
+        goal_node = (int(np.searchsorted(xs, goal[0])), int(np.searchsorted(ys, goal[1])))
+        if not (free[start_node] and free[goal_node]):
+            return None
+
+        # Label the horizontal and vertical runs; a blocked node is a run of its own
+        h_new = np.ones((nx, ny), dtype=bool)
+        h_new[1:] = h_blocked | blocked[1:] | blocked[:-1]
+        v_new = np.ones((nx, ny), dtype=bool)
+        v_new[:, 1:] = v_blocked | blocked[:, 1:] | blocked[:, :-1]
+        runs = (np.cumsum(h_new.T).reshape(ny, nx).T, np.cumsum(v_new).reshape(nx, ny))
+
+        # levels[k][d]: nodes reachable with k bends, last moving along
+        # direction d (0 horizontal, 1 vertical)
+        levels = [tuple(free & (run == run[start_node]) for run in runs)]
+        while not (levels[-1][0][goal_node] or levels[-1][1][goal_node]):
+            previous = levels[-1]
+            level = []
+            for d, run in enumerate(runs):
+                crossed = np.zeros(int(run[-1, -1]) + 1, dtype=bool)
+                crossed[run[previous[1 - d]]] = True
+                level.append(free & crossed[run])
+            if all((level[d] == previous[d]).all() for d in (0, 1)):
+                return None
+            levels.append(tuple(level))
+
+        routes = [self._trace(levels, runs, xs, ys, start_node, goal_node, d)
+                  for d in (0, 1) if levels[-1][d][goal_node]]
+        return min(routes, key=_length)
+
+    @staticmethod
+    def _trace(levels: List[Tuple[np.ndarray, np.ndarray]], runs: Tuple[np.ndarray, np.ndarray],
+               xs: np.ndarray, ys: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int],
+               direction: int) -> List[Point]:
+        """Trace a route back from the goal, reached last moving along a direction.
+
+        On each run the bend is placed at the node of the previous level
+        that minimizes the run's length plus the distance left to the start.
+        """
+        corners = [goal]
+        i, j = goal
+        for k in range(len(levels) - 1, 0, -1):
+            if direction == 0:
+                candidates = np.flatnonzero((runs[0][:, j] == runs[0][i, j]) & levels[k - 1][1][:, j])
+                cost = np.abs(xs[candidates] - xs[i]) + np.abs(xs[candidates] - xs[start[0]])
+                i = int(candidates[np.argmin(cost)])
+            else:
+                candidates = np.flatnonzero((runs[1][i] == runs[1][i, j]) & levels[k - 1][0][i])
+                cost = np.abs(ys[candidates] - ys[j]) + np.abs(ys[candidates] - ys[start[1]])
+                j = int(candidates[np.argmin(cost)])
+            corners.append((i, j))
+            direction = 1 - direction
+        corners.append(start)
+        points = []
+        for i, j in reversed(corners):
+            point = (float(xs[i]), float(ys[j]))
+            if not points or point != points[-1]:
+                points.append(point)
+        return points
+    #endregion
+
+def _length(points: List[Point]) -> float:
+    return sum(abs(bx - ax) + abs(by - ay) for (ax, ay), (bx, by) in zip(points, points[1:]))
@@ -0,0 +1,138 @@
+import math
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+Rect = Tuple[float, float, float, float]
+
+class SpatialGrid:
+    """Uniform grid index of axis-aligned rectangles keyed by integer handle.
+
+    Each rectangle is registered in every cell it overlaps, so point and
+    rectangle queries only inspect the handful of cells under the query
+    instead of every indexed element.
+    """
+
+    def __init__(self, cell_size: float = 128.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._rects: Dict[int, Rect] = {}
+
+    def _cell_range(self, rect: Rect) -> Tuple[int, int, int, int]:
+        """Get the inclusive cell range (cx1, cy1, cx2, cy2) covered by a rectangle."""
+        size = self.cell_size
+        return (
+            math.floor(rect[0] / size), math.floor(rect[1] / size),
+            math.floor(rect[2] / size), math.floor(rect[3] / size)
+        )
+
+    def _cells_in(self, cell_range: Tuple[int, int, int, int]) -> Iterator[Tuple[int, int]]:
+        """Iterate over the cell keys in a cell range."""
+        cx1, cy1, cx2, cy2 = cell_range
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                yield (cx, cy)
+
+    def insert(self, key: int, rect: Rect) -> None:
+        """Add a rectangle to the index, replacing any previous entry for the key."""
+        if key in self._rects:
+            self.update(key, rect)
+            return
+        self._rects[key] = rect
+        for cell in self._cells_in(self._cell_range(rect)):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def update(self, key: int, rect: Rect) -> None:
+        """Move an indexed rectangle, touching only the cells that changed."""
+        old_rect = self._rects.get(key)
+        if old_rect is None:
+            self.insert(key, rect)
+            return
+        self._rects[key] = rect
+        old_range = self._cell_range(old_rect)
+        new_range = self._cell_range(rect)
+        if old_range == new_range:
+            return
+        old_cells = set(self._cells_in(old_range))
+        new_cells = set(self._cells_in(new_range))
+        for cell in old_cells - new_cells:
+            bucket = self._cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+        for cell in new_cells - old_cells:
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: int) -> None:
+        """Remove a rectangle from the index."""
+        rect = self._rects.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._cells_in(self._cell_range(rect)):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def clear(self) -> None:
+        """Remove every entry from the index."""
+        self._cells.clear()
+        self._rects.clear()
+
+    def rect(self, key: int) -> Rect:
+        """Get the indexed rectangle for a key."""
+        return self._rects[key]
+
+    def bounds(self) -> Optional[Rect]:
+        """Get the extent of the occupied cells, or None if the index is empty.
+
+        The result is cell-aligned, so it may exceed the indexed rectangles
+        by up to one cell on each side.
+        """
+        if not self._cells:
+            return None
+        xs = [cx for cx, _ in self._cells]
+        ys = [cy for _, cy in self._cells]
+        size = self.cell_size
+        return (min(xs) * size, min(ys) * size, (max(xs) + 1) * size, (max(ys) + 1) * size)
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        """Get the keys whose rectangle contains the point."""
+        size = self.cell_size
+        bucket = self._cells.get((math.floor(x / size), math.floor(y / size)), ())
+        rects = self._rects
+        hits = []
+        for key in bucket:
+            x1, y1, x2, y2 = rects[key]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                hits.append(key)
+        return hits
+
+    def query_rect(self, rect: Rect) -> Set[int]:
+        """Get the keys whose rectangle intersects the given rectangle."""
+        qx1, qy1, qx2, qy2 = rect
+        rects = self._rects
+        cell_range = self._cell_range(rect)
+        cx1, cy1, cx2, cy2 = cell_range
+        candidates: Set[int] = set()
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self._cells):
+            # Query covers more cells than are occupied; scan occupied cells instead
+            for (cx, cy), bucket in self._cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    candidates.update(bucket)
+        else:
+            for cell in self._cells_in(cell_range):
+                bucket = self._cells.get(cell)
+                if bucket:
+                    candidates.update(bucket)
+        hits = set()
+        for key in candidates:
+            x1, y1, x2, y2 = rects[key]
+            if x1 <= qx2 and qx1 <= x2 and y1 <= qy2 and qy1 <= y2:
+                hits.add(key)
+        return hits
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._rects
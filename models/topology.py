@@ -0,0 +1,510 @@
+from array import array
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from models.enums import ConnectionType
+from models.spatial import SpatialGrid
+from models.containment import ContainmentIndex
+
+Observer = Callable[[str, int, Dict[str, Any]], None]
+
+class TopologyModel:
+    """Canvas-independent storage for devices, connections and boundaries.
+
+    Every element is stored column-wise in parallel arrays and addressed by an
+    integer handle (its row index). Handles are never reused, so a handle held
+    by a view or a tool stays valid (or reports itself dead) for the lifetime
+    of the model.
+
+    Every edit is reported to the callables in ``observers`` as
+    ``observer(op, handle, fields)``, where ``op`` names the edit (e.g.
+    'place_device') and ``fields`` holds its new values.
+    """
+
+    CONNECTION_TYPES: Tuple[ConnectionType, ...] = tuple(ConnectionType)
+    DEVICE_SIZE = 60
+    INDEX_CELL_SIZE = 128.0
+
+    def __init__(self):
+        self.observers: List[Observer] = []
+        self.clear()
+
+    def _notify(self, op: str, handle: int, **fields: Any) -> None:
+        for observer in self.observers:
+            observer(op, handle, fields)
+
+    def clear(self) -> None:
+        """Remove every element from the model."""
+        if self.observers:
+            self._notify('clear', -1)
+        # Device table
+        self.device_names: List[str] = []
+        self.device_types = array('B')
+        self.device_x = array('d')
+        self.device_y = array('d')
+        self.device_ips: List[str] = []
+        self.device_masks: List[str] = []
+        self.device_locations: List[str] = []
+        self.device_alive = bytearray()
+        self.type_names: List[str] = []
+        self._type_codes: Dict[str, int] = {}
+        self._device_by_name: Dict[str, int] = {}
+        self._device_links: Dict[int, List[int]] = {}
+
+        # Connection table
+        self.link_a = array('i')
+        self.link_b = array('i')
+        self.link_types = array('B')
+        self.link_alive = bytearray()
+
+        # Boundary table
+        self.boundary_names: List[str] = []
+        self.boundary_subnets: List[str] = []
+        self.boundary_descriptions: List[str] = []
+        self.boundary_colors: List[str] = []
+        self.boundary_x = array('d')
+        self.boundary_y = array('d')
+        self.boundary_width = array('d')
+        self.boundary_height = array('d')
+        self.boundary_alive = bytearray()
+
+        # Spatial indexes for hit-testing
+        self.device_index = SpatialGrid(self.INDEX_CELL_SIZE)
+        self.boundary_index = SpatialGrid(self.INDEX_CELL_SIZE)
+        self.containment = ContainmentIndex(self)
+
+        self.device_count = 0
+        self.link_count = 0
+        self.boundary_count = 0
+
+    #region Devices
+    def _type_code(self, device_type: str) -> int:
+        """Intern a device type name and return its code."""
+        code = self._type_codes.get(device_type)
+        if code is None:
+            code = len(self.type_names)
+            self.type_names.append(device_type)
+            self._type_codes[device_type] = code
+        return code
+
+    def add_device(self, name: str, device_type: str, x: float, y: float,
+                   ip_address: str = "", subnet_mask: str = "",
+                   location: str = "") -> int:
+        """Add a device and return its handle."""
+        handle = len(self.device_names)
+        self.device_names.append(name)
+        self.device_types.append(self._type_code(device_type))
+        self.device_x.append(x)
+        self.device_y.append(y)
+        self.device_ips.append(ip_address)
+        self.device_masks.append(subnet_mask)
+        self.device_locations.append(location)
+        self.device_alive.append(1)
+        self._device_by_name[name] = handle
+        self.device_index.insert(handle, self._device_rect(handle))
+        self.containment.device_moved(handle)
+        self.device_count += 1
+        if self.observers:
+            self._notify('add_device', handle, name=name, type=device_type, x=x, y=y,
+                         ip=ip_address, mask=subnet_mask, location=location)
+        return handle
+
+    def remove_device(self, handle: int) -> List[int]:
+        """Remove a device and every link attached to it.
+
+        Returns:
+            List[int]: Handles of the links that were removed with the device
+        """
+        if not self.device_alive[handle]:
+            return []
+        removed = list(self._device_links.get(handle, ()))
+        for link in removed:
+            self.remove_link(link)
+        self._device_links.pop(handle, None)
+        self.device_index.remove(handle)
+        self.containment.device_removed(handle)
+        self.device_alive[handle] = 0
+        if self._device_by_name.get(self.device_names[handle]) == handle:
+            del self._device_by_name[self.device_names[handle]]
+        self.device_count -= 1
+        if self.observers:
+            self._notify('remove_device', handle)
+        return removed
+
+    def update_device(self, handle: int, name: Optional[str] = None,
+                      device_type: Optional[str] = None,
+                      ip_address: Optional[str] = None,
+                      subnet_mask: Optional[str] = None,
+                      location: Optional[str] = None) -> None:
+        """Update the descriptive fields of a device."""
+        if name is not None and name != self.device_names[handle]:
+            if self._device_by_name.get(self.device_names[handle]) == handle:
+                del self._device_by_name[self.device_names[handle]]
+            self.device_names[handle] = name
+            self._device_by_name[name] = handle
+        if device_type is not None:
+            self.device_types[handle] = self._type_code(device_type)
+        if ip_address is not None:
+            self.device_ips[handle] = ip_address
+        if subnet_mask is not None:
+            self.device_masks[handle] = subnet_mask
+        if location is not None:
+            self.device_locations[handle] = location
+        if self.observers:
+            fields = {'name': name, 'type': device_type, 'ip': ip_address,
+                      'mask': subnet_mask, 'location': location}
+            self._notify('update_device', handle,
+                         **{key: value for key, value in fields.items() if value is not None})
+
+    def move_device(self, handle: int, dx: float, dy: float) -> None:
+        """Move a device by the specified delta."""
+        self.device_x[handle] += dx
+        self.device_y[handle] += dy
+        self.device_index.update(handle, self._device_rect(handle))
+        self.containment.device_moved(handle)
+        if self.observers:
+            self._notify('place_device', handle, x=self.device_x[handle], y=self.device_y[handle])
+
+    def set_device_position(self, handle: int, x: float, y: float) -> None:
+        """Place a device at an absolute position."""
+        self.device_x[handle] = x
+        self.device_y[handle] = y
+        self.device_index.update(handle, self._device_rect(handle))
+        self.containment.device_moved(handle)
+        if self.observers:
+            self._notify('place_device', handle, x=x, y=y)
+
+    def _device_rect(self, handle: int) -> Tuple[float, float, float, float]:
+        """Get the square footprint of a device as (x1, y1, x2, y2)."""
+        radius = self.DEVICE_SIZE / 2
+        x = self.device_x[handle]
+        y = self.device_y[handle]
+        return (x - radius, y - radius, x + radius, y + radius)
+
+    def device_at(self, x: float, y: float) -> Optional[int]:
+        """Find the device whose circular footprint contains the point.
+
+        Returns:
+            Optional[int]: Handle of the device closest to the point, or None
+        """
+        radius_sq = (self.DEVICE_SIZE / 2) ** 2
+        best = None
+        best_dist = radius_sq
+        for handle in self.device_index.query_point(x, y):
+            dx = x - self.device_x[handle]
+            dy = y - self.device_y[handle]
+            dist = dx * dx + dy * dy
+            if dist <= best_dist and (best is None or dist < best_dist or handle < best):
+                best = handle
+                best_dist = dist
+        return best
+
+    def devices_in_rect(self, x1: float, y1: float, x2: float, y2: float) -> List[int]:
+        """Get the handles of devices whose center lies inside a rectangle."""
+        xs = self.device_x
+        ys = self.device_y
+        return [
+            handle for handle in self.device_index.query_rect((x1, y1, x2, y2))
+            if x1 <= xs[handle] <= x2 and y1 <= ys[handle] <= y2
+        ]
+
+    def device_position(self, handle: int) -> Tuple[float, float]:
+        """Get the center position of a device."""
+        return (self.device_x[handle], self.device_y[handle])
+
+    def device_type(self, handle: int) -> str:
+        """Get the type name of a device."""
+        return self.type_names[self.device_types[handle]]
+
+    def device_fields(self, handle: int) -> Dict[str, str]:
+        """Get the descriptive fields of a device, keyed like DeviceConfig."""
+        return {
+            'name': self.device_names[handle],
+            'device_type': self.device_type(handle),
+            'ip_address': self.device_ips[handle],
+            'subnet_mask': self.device_masks[handle],
+            'location': self.device_locations[handle]
+        }
+
+    def find_device(self, name: str) -> Optional[int]:
+        """Look up a live device handle by name."""
+        return self._device_by_name.get(name)
+
+    def devices(self) -> Iterator[int]:
+        """Iterate over the handles of all live devices."""
+        alive = self.device_alive
+        return (handle for handle in range(len(alive)) if alive[handle])
+
+    def device_links(self, handle: int) -> List[int]:
+        """Get the handles of all links attached to a device."""
+        return list(self._device_links.get(handle, ()))
+    #endregion
+
+    #region Connections
+    def add_link(self, device1: int, device2: int,
+                 connection_type: ConnectionType) -> int:
+        """Connect two devices and return the link handle."""
+        handle = len(self.link_a)
+        self.link_a.append(device1)
+        self.link_b.append(device2)
+        self.link_types.append(self.CONNECTION_TYPES.index(connection_type))
+        self.link_alive.append(1)
+        self._device_links.setdefault(device1, []).append(handle)
+        self._device_links.setdefault(device2, []).append(handle)
+        self.link_count += 1
+        if self.observers:
+            self._notify('add_link', handle, device1=device1, device2=device2,
+                         type=connection_type.value)
+        return handle
+
+    def remove_link(self, handle: int) -> None:
+        """Remove a link from the model."""
+        if not self.link_alive[handle]:
+            return
+        self.link_alive[handle] = 0
+        for device in (self.link_a[handle], self.link_b[handle]):
+            links = self._device_links.get(device)
+            if links and handle in links:
+                links.remove(handle)
+        self.link_count -= 1
+        if self.observers:
+            self._notify('remove_link', handle)
+
+    def link_endpoints(self, handle: int) -> Tuple[int, int]:
+        """Get the device handles at both ends of a link."""
+        return (self.link_a[handle], self.link_b[handle])
+
+    def link_type(self, handle: int) -> ConnectionType:
+        """Get the connection type of a link."""
+        return self.CONNECTION_TYPES[self.link_types[handle]]
+
+    def links(self) -> Iterator[int]:
+        """Iterate over the handles of all live links."""
+        alive = self.link_alive
+        return (handle for handle in range(len(alive)) if alive[handle])
+    #endregion
+
+    #region Boundaries
+    def add_boundary(self, name: str, x: float, y: float, width: float,
+                     height: float, subnet: str = "", description: str = "",
+                     color: str = "#E0E0E0") -> int:
+        """Add a boundary and return its handle."""
+        handle = len(self.boundary_names)
+        self.boundary_names.append(name)
+        self.boundary_subnets.append(subnet)
+        self.boundary_descriptions.append(description)
+        self.boundary_colors.append(color)
+        self.boundary_x.append(x)
+        self.boundary_y.append(y)
+        self.boundary_width.append(width)
+        self.boundary_height.append(height)
+        self.boundary_alive.append(1)
+        self.boundary_index.insert(handle, self.boundary_rect(handle))
+        self.containment.boundary_changed(handle)
+        self.boundary_count += 1
+        if self.observers:
+            self._notify('add_boundary', handle, name=name, x=x, y=y, width=width,
+                         height=height, subnet=subnet, description=description,
+                         color=color)
+        return handle
+
+    def remove_boundary(self, handle: int) -> None:
+        """Remove a boundary from the model."""
+        if self.boundary_alive[handle]:
+            self.boundary_index.remove(handle)
+            self.containment.boundary_removed(handle)
+            self.boundary_alive[handle] = 0
+            self.boundary_count -= 1
+            if self.observers:
+                self._notify('remove_boundary', handle)
+
+    def update_boundary(self, handle: int, name: Optional[str] = None,
+                        subnet: Optional[str] = None,
+                        description: Optional[str] = None,
+                        color: Optional[str] = None) -> None:
+        """Update the descriptive fields of a boundary."""
+        if name is not None:
+            self.boundary_names[handle] = name
+        if subnet is not None:
+            self.boundary_subnets[handle] = subnet
+        if description is not None:
+            self.boundary_descriptions[handle] = description
+        if color is not None:
+            self.boundary_colors[handle] = color
+        if self.observers:
+            fields = {'name': name, 'subnet': subnet, 'description': description, 'color': color}
+            self._notify('update_boundary', handle,
+                         **{key: value for key, value in fields.items() if value is not None})
+
+    def move_boundary(self, handle: int, dx: float, dy: float) -> None:
+        """Move a boundary by the specified delta."""
+        old_rect = self.boundary_rect(handle)
+        self.boundary_x[handle] += dx
+        self.boundary_y[handle] += dy
+        self.boundary_index.update(handle, self.boundary_rect(handle))
+        self.containment.boundary_changed(handle, old_rect)
+        if self.observers:
+            self._notify('place_boundary', handle,
+                         x=self.boundary_x[handle], y=self.boundary_y[handle])
+
+    def resize_boundary(self, handle: int, width: float, height: float) -> None:
+        """Set the size of a boundary."""
+        old_rect = self.boundary_rect(handle)
+        self.boundary_width[handle] = width
+        self.boundary_height[handle] = height
+        self.boundary_index.update(handle, self.boundary_rect(handle))
+        self.containment.boundary_changed(handle, old_rect)
+        if self.observers:
+            self._notify('resize_boundary', handle, width=width, height=height)
+
+    def boundary_rect(self, handle: int) -> Tuple[float, float, float, float]:
+        """Get a boundary rectangle as (x1, y1, x2, y2)."""
+        x = self.boundary_x[handle]
+        y = self.boundary_y[handle]
+        return (x, y, x + self.boundary_width[handle], y + self.boundary_height[handle])
+
+    def boundary_at(self, x: float, y: float) -> Optional[int]:
+        """Find the earliest-added boundary containing the point."""
+        hits = self.boundary_index.query_point(x, y)
+        return min(hits) if hits else None
+
+    def boundaries_at(self, x: float, y: float) -> List[int]:
+        """Get the handles of all boundaries containing the point."""
+        return sorted(self.boundary_index.query_point(x, y))
+
+    def boundary_fields(self, handle: int) -> Dict[str, str]:
+        """Get the descriptive fields of a boundary, keyed like BoundaryConfig."""
+        return {
+            'name': self.boundary_names[handle],
+            'subnet': self.boundary_subnets[handle],
+            'description': self.boundary_descriptions[handle],
+            'color': self.boundary_colors[handle]
+        }
+
+    def boundaries(self) -> Iterator[int]:
+        """Iterate over the handles of all live boundaries."""
+        alive = self.boundary_alive
+        return (handle for handle in range(len(alive)) if alive[handle])
+    #endregion
+
+    @contextmanager
+    def bulk_update(self) -> Iterator[None]:
+        """Defer boundary containment while many elements are added or moved.
+
+        Memberships are recomputed once when the outermost block exits.
+        """
+        containment = self.containment
+        containment.defer()
+        try:
+            yield
+        finally:
+            containment.resume()
+
+    def extent(self) -> Optional[Tuple[float, float, float, float]]:
+        """Get a rectangle covering every device and boundary, or None if empty.
+
+        Read from the spatial indexes, so it is cheap but rounded outwards
+        to whole index cells.
+        """
+        rects = [r for r in (self.device_index.bounds(), self.boundary_index.bounds()) if r]
+        if not rects:
+            return None
+        return (
+            min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects)
+        )
+
+    #region Serialization
+    def device_record(self, handle: int) -> Dict[str, Any]:
+        """Get the saved-file record for a device."""
+        return {
+            'name': self.device_names[handle],
+            'type': self.device_type(handle),
+            'ip': self.device_ips[handle],
+            'x': self.device_x[handle],
+            'y': self.device_y[handle]
+        }
+
+    def link_record(self, handle: int) -> Dict[str, Any]:
+        """Get the saved-file record for a link."""
+        return {
+            'device1': self.device_names[self.link_a[handle]],
+            'device2': self.device_names[self.link_b[handle]],
+            'type': self.link_type(handle).value
+        }
+
+    def boundary_record(self, handle: int) -> Dict[str, Any]:
+        """Get the saved-file record for a boundary."""
+        record = self.boundary_fields(handle)
+        record.update({
+            'x': self.boundary_x[handle],
+            'y': self.boundary_y[handle],
+            'width': self.boundary_width[handle],
+            'height': self.boundary_height[handle]
+        })
+        return record
+
+    def snapshot(self) -> 'TopologyModel':
+        """Copy the element tables, e.g. to serialize them on another thread.
+
+        The copy has no lookup or spatial indexes and is only meant to be
+        read through the table columns and the record methods.
+        """
+        copy = TopologyModel.__new__(TopologyModel)
+        copy.observers = []
+        for name, value in vars(self).items():
+            if isinstance(value, (array, bytearray, list)) and name != 'observers':
+                setattr(copy, name, value[:])
+        copy.device_count = self.device_count
+        copy.link_count = self.link_count
+        copy.boundary_count = self.boundary_count
+        return copy
+
+    def add_device_record(self, record: Dict[str, Any]) -> int:
+        """Add a device from a saved-file record."""
+        return self.add_device(
+            record['name'], record['type'], record['x'], record['y'],
+            ip_address=record.get('ip', "")
+        )
+
+    def add_link_record(self, record: Dict[str, Any]) -> Optional[int]:
+        """Add a link from a saved-file record.
+
+        Returns:
+            Optional[int]: The link handle, or None if an endpoint is unknown
+        """
+        device1 = self.find_device(record['device1'])
+        device2 = self.find_device(record['device2'])
+        if device1 is None or device2 is None:
+            return None
+        return self.add_link(device1, device2, ConnectionType(record['type']))
+
+    def add_boundary_record(self, record: Dict[str, Any]) -> int:
+        """Add a boundary from a saved-file record."""
+        return self.add_boundary(
+            record['name'], record['x'], record['y'],
+            record['width'], record['height'],
+            subnet=record.get('subnet', ""),
+            description=record.get('description', ""),
+            color=record.get('color', "#E0E0E0")
+        )
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Convert the model to the saved-file structure."""
+        return {
+            'devices': [self.device_record(h) for h in self.devices()],
+            'connections': [self.link_record(h) for h in self.links()],
+            'boundaries': [self.boundary_record(h) for h in self.boundaries()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[Dict[str, Any]]]) -> 'TopologyModel':
+        """Build a model from the saved-file structure."""
+        model = cls()
+        for record in data.get('devices', []):
+            model.add_device_record(record)
+        for record in data.get('connections', []):
+            model.add_link_record(record)
+        for record in data.get('boundaries', []):
+            model.add_boundary_record(record)
+        return model
+    #endregion
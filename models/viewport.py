@@ -0,0 +1,74 @@
+from typing import TYPE_CHECKING, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+if TYPE_CHECKING:
+    import tkinter as tk
+    from models.routing import ConnectionRouter
+
+class Viewport:
+    """Per-canvas view state shared by every view drawn on the canvas.
+
+    Holds the zoom scale that maps model coordinates to canvas coordinates
+    and the level-of-detail tier that scale selects:
+
+    - ``full``: icons, labels and dashed connection styles
+    - ``simple``: colored squares keyed by device type, no labels, solid lines
+    - ``aggregate``: as ``simple``, but devices inside a boundary collapse
+      into a single glyph drawn by the boundary
+
+    Connections are drawn straight unless ``router`` is set, in which case
+    they follow its orthogonal routes.
+    """
+
+    FULL = 'full'
+    SIMPLE = 'simple'
+    AGGREGATE = 'aggregate'
+
+    DEFAULT_SIMPLE_BELOW = 0.5
+    DEFAULT_AGGREGATE_BELOW = 0.25
+
+    _instances: 'WeakKeyDictionary[tk.Canvas, Viewport]' = WeakKeyDictionary()
+
+    def __init__(self, scale: float = 1.0,
+                 simple_below: float = DEFAULT_SIMPLE_BELOW,
+                 aggregate_below: float = DEFAULT_AGGREGATE_BELOW):
+        """Initialize the viewport.
+
+        Args:
+            scale: Canvas pixels per model unit
+            simple_below: Scale under which devices are drawn as squares
+            aggregate_below: Scale under which devices collapse into their boundary
+        """
+        self.scale = scale
+        self.simple_below = simple_below
+        self.aggregate_below = aggregate_below
+        self.router: Optional['ConnectionRouter'] = None
+
+    @classmethod
+    def for_canvas(cls, canvas: 'tk.Canvas') -> 'Viewport':
+        """Get the viewport shared by every view on a canvas."""
+        viewport = cls._instances.get(canvas)
+        if viewport is None:
+            viewport = cls._instances[canvas] = cls()
+        return viewport
+
+    @property
+    def tier(self) -> str:
+        """Get the level-of-detail tier for the current scale."""
+        return self.tier_for(self.scale)
+
+    def tier_for(self, scale: float) -> str:
+        """Get the level-of-detail tier for a scale."""
+        if scale < self.aggregate_below:
+            return self.AGGREGATE
+        if scale < self.simple_below:
+            return self.SIMPLE
+        return self.FULL
+
+    def to_canvas(self, x: float, y: float) -> Tuple[float, float]:
+        """Project a model point to canvas coordinates."""
+        return (x * self.scale, y * self.scale)
+
+    def to_model(self, x: float, y: float) -> Tuple[float, float]:
+        """Project a canvas point back to model coordinates."""
+        return (x / self.scale, y / self.scale)
@@ -0,0 +1,177 @@
+import csv
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from models import ConnectionType, TopologyModel
+from .compression import open_text
+
+# Fields a column can be mapped to, and the header names recognized for each
+FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'name': ('name', 'hostname', 'host', 'device', 'device_name'),
+    'type': ('type', 'device_type', 'role', 'kind'),
+    'ip': ('ip', 'ip_address', 'address', 'mgmt_ip'),
+    'mask': ('mask', 'subnet_mask', 'netmask'),
+    'location': ('location', 'site', 'rack'),
+    'x': ('x',),
+    'y': ('y',),
+    'peer': ('peer', 'peers', 'uplink', 'connected_to', 'neighbor', 'neighbors'),
+    'link_type': ('link_type', 'connection_type', 'media'),
+}
+IMPORT_FIELDS = tuple(FIELD_ALIASES)
+PEER_SEPARATOR = ';'
+DEFAULT_TYPE = 'router'
+GRID_SPACING = 100.0
+GRID_COLUMNS = 50
+
+Mapping = Dict[str, int]
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import."""
+    devices: List[int] = field(default_factory=list)
+    links: List[int] = field(default_factory=list)
+    skipped: List[Tuple[int, str]] = field(default_factory=list)
+
+def _delimiter(filename: str, sample: str) -> str:
+    """Pick the delimiter of a CSV or TSV file."""
+    if filename.lower().endswith('.tsv'):
+        return '\t'
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',\t;').delimiter
+    except csv.Error:
+        return ','
+
+def read_table(filename: str) -> Tuple[List[str], Iterator[List[str]]]:
+    """Open a CSV or TSV file, possibly compressed.
+
+    Returns:
+        Tuple[List[str], Iterator[List[str]]]: The header row and an iterator
+        over the remaining rows, which closes the file when exhausted
+
+    Raises:
+        ValueError: If the file is empty
+    """
+    f = open_text(filename)
+    try:
+        delimiter = _delimiter(filename, f.read(64 * 1024))
+        f.seek(0)
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+    except Exception:
+        f.close()
+        raise
+    if header is None:
+        f.close()
+        raise ValueError("The file is empty")
+
+    def rows() -> Iterator[List[str]]:
+        with f:
+            yield from reader
+
+    return [column.strip() for column in header], rows()
+
+def guess_mapping(header: List[str]) -> Mapping:
+    """Map fields to the columns whose header names they are known by."""
+    columns = {name.lower().replace(' ', '_'): index for index, name in enumerate(header)}
+    mapping = {}
+    for name, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias in columns:
+                mapping[name] = columns[alias]
+                break
+    return mapping
+
+def import_devices(model: TopologyModel, rows: Iterable[List[str]], mapping: Mapping,
+                   origin: Tuple[float, float] = (0.0, 0.0), first_line: int = 2) -> ImportResult:
+    """Add devices, and the links named in their peer column, to a model.
+
+    Rows are added in a single pass with boundary containment deferred until
+    the end. Devices without a position are laid out on a grid from
+    ``origin``. Peers are device names separated by ';' and may refer to
+    devices already in the model or later in the file.
+
+    Args:
+        model: Model to add to
+        rows: Data rows, without the header
+        mapping: Column index of each field in IMPORT_FIELDS that is present;
+            'name' is required
+        origin: Top-left position of the grid for devices without a position
+        first_line: File line number of the first row, for skip reasons
+
+    Returns:
+        ImportResult: Handles of the new devices and links, and the rows or
+        peers that were skipped with the reason why
+
+    Raises:
+        ValueError: If the name field is not mapped
+    """
+    if 'name' not in mapping:
+        raise ValueError("A column must be mapped to the device name")
+    result = ImportResult()
+    columns = [(name, mapping[name]) for name in IMPORT_FIELDS if name in mapping]
+    peers: List[Tuple[int, int, str, str]] = []
+    placed = 0
+    with model.bulk_update():
+        for line, row in enumerate(rows, first_line):
+            values = {name: row[index].strip() if index < len(row) else '' for name, index in columns}
+            name = values['name']
+            if not name:
+                if any(row):
+                    result.skipped.append((line, "missing name"))
+                continue
+            if model.find_device(name) is not None:
+                result.skipped.append((line, f"duplicate device name {name!r}"))
+                continue
+            if values.get('x') and values.get('y'):
+                try:
+                    x, y = float(values['x']), float(values['y'])
+                except ValueError:
+                    result.skipped.append((line, "invalid position"))
+                    continue
+            else:
+                x = origin[0] + (placed % GRID_COLUMNS) * GRID_SPACING
+                y = origin[1] + (placed // GRID_COLUMNS) * GRID_SPACING
+                placed += 1
+            handle = model.add_device(
+                name, values.get('type', '').lower().replace(' ', '_') or DEFAULT_TYPE, x, y,
+                ip_address=values.get('ip', ''), subnet_mask=values.get('mask', ''),
+                location=values.get('location', '')
+            )
+            result.devices.append(handle)
+            if values.get('peer'):
+                peers.append((line, handle, values['peer'], values.get('link_type', '')))
+
+        # Peers can only be resolved once every device has been added
+        linked: Set[Tuple[int, int]] = set()
+        for line, handle, names, link_type in peers:
+            try:
+                connection_type = ConnectionType(link_type.lower() or ConnectionType.ETHERNET.value)
+            except ValueError:
+                result.skipped.append((line, f"unknown link type {link_type!r}"))
+                continue
+            for peer_name in filter(None, (peer.strip() for peer in names.split(PEER_SEPARATOR))):
+                peer = model.find_device(peer_name)
+                if peer is None:
+                    result.skipped.append((line, f"unknown peer {peer_name!r}"))
+                    continue
+                pair = (min(handle, peer), max(handle, peer))
+                if peer == handle or pair in linked:
+                    continue
+                linked.add(pair)
+                result.links.append(model.add_link(handle, peer, connection_type))
+    return result
+
+def import_file(model: TopologyModel, filename: str, mapping: Optional[Mapping] = None,
+                origin: Tuple[float, float] = (0.0, 0.0)) -> ImportResult:
+    """Import devices from a CSV or TSV file, see import_devices().
+
+    The mapping is guessed from the header row if omitted.
+
+    Raises:
+        ValueError: If the file is empty or has no name column
+        OSError: If the file cannot be read
+    """
+    header, rows = read_table(filename)
+    try:
+        return import_devices(model, rows, mapping or guess_mapping(header), origin)
+    finally:
+        rows.close()
@@ -0,0 +1,87 @@
+import bz2
+import gzip
+import io
+import lzma
+from typing import IO, Optional, Union
+
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'lzma': b'\xfd7zXZ\x00',
+}
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'lzma',
+    '.lzma': 'lzma',
+}
+DEFAULT_LEVELS = {
+    'gzip': 6,
+    'bz2': 9,
+    'lzma': 6,
+}
+LEVEL_RANGES = {
+    'gzip': range(1, 10),
+    'bz2': range(1, 10),
+    'lzma': range(0, 10),
+}
+
+def detect_codec(file: Union[str, IO[bytes]]) -> Optional[str]:
+    """Get the codec a file is compressed with from its magic bytes, or None.
+
+    A file object is rewound to its start after the magic bytes are read.
+    """
+    size = max(len(magic) for magic in MAGIC_BYTES.values())
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            head = f.read(size)
+    else:
+        head = file.read(size)
+        file.seek(0)
+    for codec, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+def codec_for_filename(filename: str) -> Optional[str]:
+    """Get the codec implied by a file name's extension, or None."""
+    lower = filename.lower()
+    for extension, codec in EXTENSIONS.items():
+        if lower.endswith(extension):
+            return codec
+    return None
+
+def open_text(file: Union[str, IO[bytes]], mode: str = 'r', codec: Optional[str] = None,
+              level: Optional[int] = None) -> IO[str]:
+    """Open a text file, streaming it through a compression codec.
+
+    Data passes through the codec chunk by chunk as it is read or written,
+    so the decompressed text is never held in memory as a whole.
+
+    Args:
+        file: Path to the file, or a seekable binary file object
+        mode: 'r' to read or 'w' to write
+        codec: 'gzip', 'bz2', 'lzma' or None for plain text; when reading,
+            detected from the file's magic bytes if omitted
+        level: Compression level when writing; the codec's default if omitted
+
+    Raises:
+        ValueError: If the codec or level is not supported
+    """
+    if mode == 'r' and codec is None:
+        codec = detect_codec(file)
+    if codec is None:
+        if isinstance(file, str):
+            return open(file, mode, encoding='utf-8')
+        return io.TextIOWrapper(file, encoding='utf-8')
+    if codec not in MAGIC_BYTES:
+        raise ValueError(f"Unsupported compression codec: {codec}")
+    options = {}
+    if mode == 'w':
+        if level is None:
+            level = DEFAULT_LEVELS[codec]
+        elif level not in LEVEL_RANGES[codec]:
+            raise ValueError(f"Invalid {codec} compression level: {level}")
+        options['preset' if codec == 'lzma' else 'compresslevel'] = level
+    opener = {'gzip': gzip.open, 'bz2': bz2.open, 'lzma': lzma.open}[codec]
+    return opener(file, f'{mode}t', encoding='utf-8', **options)
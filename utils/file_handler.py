@@ -1,17 +1,20 @@
-import json
 import os
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from PIL import Image, ImageTk
 import tkinter as tk
 from tkinter import messagebox
-from models import DeviceConfig, BoundaryConfig, ConnectionType, Boundary, Device
+from models import DeviceConfig, BoundaryConfig, ConnectionType, Boundary, Device, TopologyModel
+from .json_stream import Record, TopologyReader, write_topology
+from .ntdb import NTDB_EXTENSION, NtdbFile, write_ntdb
+from .compression import codec_for_filename, open_text
 
 class FileHandler:
     """Handles file operations for the topology designer."""
 
     @staticmethod
     def save_topology(canvas: tk.Canvas, devices: Dict[str, 'Device'],
-                     boundaries: Dict[str, 'Boundary'], filename: str) -> bool:
+                     boundaries: Dict[str, 'Boundary'], filename: str,
+                     compression: Optional[str] = None, level: Optional[int] = None) -> bool:
         """Save the current topology to a JSON file.
         
         Args:
@@ -19,28 +22,25 @@ class FileHandler:
             devices: Dictionary of devices
             boundaries: Dictionary of boundaries
             filename: Path to save the file
+            compression: 'gzip', 'bz2' or 'lzma'; taken from the file
+                extension (.gz, .bz2, .xz) if omitted
+            level: Compression level; the codec's default if omitted
             
         Returns:
             bool: True if save was successful, False otherwise
         """
-        try:
-            topology = {
-                'devices': [],
-                'connections': [],
-                'boundaries': []
-            }
-            
-            # Save devices
+        def device_records() -> Iterator[Record]:
             for device in devices.values():
-                topology['devices'].append({
+                yield {
                     'name': device.config.name,
                     'type': device.config.device_type,
                     'ip': device.config.ip_address,
                     'x': device.x,
                     'y': device.y
-                })
-            
-            # Save connections (avoid duplicates)
+                }
+
+        def connection_records() -> Iterator[Record]:
+            # Avoid duplicates
             seen_connections = set()
             for device in devices.values():
                 for conn in device.connections:
@@ -50,16 +50,16 @@ class FileHandler:
                         conn.device2.config.name
                     ]))
                     if conn_pair not in seen_connections:
-                        topology['connections'].append({
+                        seen_connections.add(conn_pair)
+                        yield {
                             'device1': conn.device1.config.name,
                             'device2': conn.device2.config.name,
                             'type': conn.connection_type.value
-                        })
-                        seen_connections.add(conn_pair)
-            
-            # Save boundaries
+                        }
+
+        def boundary_records() -> Iterator[Record]:
             for boundary in boundaries.values():
-                topology['boundaries'].append({
+                yield {
                     'name': boundary.config.name,
                     'subnet': boundary.config.subnet,
                     'description': boundary.config.description,
@@ -68,11 +68,17 @@ class FileHandler:
                     'y': boundary.y,
                     'width': boundary.width,
                     'height': boundary.height
-                })
-            
-            # Save to file with pretty printing
-            with open(filename, 'w') as f:
-                json.dump(topology, f, indent=2)
+                }
+
+        try:
+            # Stream records to the file as they are produced
+            codec = compression or codec_for_filename(filename)
+            with open_text(filename, 'w', codec, level) as f:
+                write_topology(f, [
+                    ('devices', device_records()),
+                    ('connections', connection_records()),
+                    ('boundaries', boundary_records())
+                ])
             
             return True
             
@@ -91,22 +97,147 @@ class FileHandler:
             Optional[Dict[str, Any]]: The loaded topology data or None if loading failed
         """
         try:
-            with open(filename, 'r') as f:
-                topology = json.load(f)
-            
-            # Validate topology structure
-            if not all(key in topology for key in ['devices', 'connections', 'boundaries']):
-                raise ValueError("Invalid topology file format")
+            topology = {'devices': [], 'connections': [], 'boundaries': []}
+            for section, records in FileHandler.iter_topology(filename):
+                topology[section].extend(records)
             
             return topology
             
-        except json.JSONDecodeError:
-            messagebox.showerror("Load Error", "Invalid JSON file format")
+        except ValueError as e:
+            messagebox.showerror("Load Error", str(e))
             return None
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load topology: {str(e)}")
             return None
 
+    @staticmethod
+    def iter_topology(filename: str, batch_size: int = 1000,
+                      progress: Optional[Callable[[float], None]] = None
+                      ) -> Iterator[Tuple[str, List[Record]]]:
+        """Read a topology file incrementally.
+        
+        Compressed files are detected from their magic bytes and decompressed
+        as they are read. .ntdb files are read through their memory mapping.
+        
+        Args:
+            filename: Path to the file to load
+            batch_size: Maximum number of records per batch
+            progress: Called before each batch is yielded with the fraction
+                of the file read so far
+            
+        Yields:
+            Tuple[str, List[Record]]: Section name ('devices', 'connections'
+            or 'boundaries') and the next batch of its records, in file order
+            
+        Raises:
+            ValueError: If the file is not a valid topology file
+        """
+        if FileHandler.is_binary(filename):
+            with NtdbFile(filename) as ntdb:
+                sections = [
+                    ('devices', ntdb.device_count, ntdb.device_record),
+                    ('connections', ntdb.link_count, ntdb.link_record),
+                    ('boundaries', ntdb.boundary_count, ntdb.boundary_record)
+                ]
+                total = max(1, ntdb.device_count + ntdb.link_count + ntdb.boundary_count)
+                done = 0
+                for section, count, record in sections:
+                    for start in range(0, count, batch_size):
+                        rows = range(start, min(count, start + batch_size))
+                        batch = [record(row) for row in rows]
+                        done += len(rows)
+                        if progress:
+                            progress(done / total)
+                        yield section, batch
+            return
+        with open(filename, 'rb') as raw:
+            size = max(1, os.fstat(raw.fileno()).st_size)
+            with open_text(raw) as f:
+                for batch in TopologyReader(f).records(batch_size):
+                    if progress:
+                        progress(min(1.0, raw.tell() / size))
+                    yield batch
+
+    @staticmethod
+    def is_binary(filename: str) -> bool:
+        """Check whether a file name selects the binary .ntdb format."""
+        return filename.lower().endswith(NTDB_EXTENSION)
+
+    @staticmethod
+    def save_model(model: TopologyModel, filename: str,
+                   compression: Optional[str] = None, level: Optional[int] = None) -> None:
+        """Save a topology model to a file without touching Tk.
+        
+        Files ending in .ntdb are written in the binary format; anything
+        else gets JSON, with records streamed from the model's columns
+        through the compression codec as they are written.
+        
+        Args:
+            model: The topology model to save
+            filename: Path to save the file
+            compression: 'gzip', 'bz2' or 'lzma' for JSON files; taken from
+                the file extension (.gz, .bz2, .xz) if omitted
+            level: Compression level; the codec's default if omitted
+            
+        Raises:
+            OSError: If the file cannot be written
+            ValueError: If the codec or level is not supported
+        """
+        if FileHandler.is_binary(filename):
+            with open(filename, 'wb') as f:
+                write_ntdb(model, f)
+            return
+        codec = compression or codec_for_filename(filename)
+        with open_text(filename, 'w', codec, level) as f:
+            write_topology(f, [
+                ('devices', map(model.device_record, model.devices())),
+                ('connections', map(model.link_record, model.links())),
+                ('boundaries', map(model.boundary_record, model.boundaries()))
+            ])
+
+    @staticmethod
+    def load_model(filename: str) -> TopologyModel:
+        """Load a topology model from a file without touching Tk.
+        
+        Files ending in .ntdb are memory-mapped and loaded column by column.
+        For JSON, records are added to the model batch by batch as they are
+        parsed; connections that appear before their devices are held back
+        until the end of the file.
+        
+        Args:
+            filename: Path to the file to load
+            
+        Returns:
+            TopologyModel: The loaded model
+            
+        Raises:
+            ValueError: If the file is not a valid topology file
+        """
+        if FileHandler.is_binary(filename):
+            with NtdbFile(filename) as ntdb:
+                return ntdb.to_model()
+        model = TopologyModel()
+        deferred: List[Record] = []
+        try:
+            for section, records in FileHandler.iter_topology(filename):
+                if section == 'devices':
+                    for record in records:
+                        model.add_device_record(record)
+                elif section == 'connections':
+                    for record in records:
+                        if model.add_link_record(record) is None:
+                            deferred.append(record)
+                else:
+                    for record in records:
+                        model.add_boundary_record(record)
+            for record in deferred:
+                model.add_link_record(record)
+        except KeyError as e:
+            raise ValueError(f"Invalid topology file format: record missing {e}") from e
+        except TypeError as e:
+            raise ValueError(f"Invalid topology file format: {e}") from e
+        return model
+
     @staticmethod
     def export_topology(canvas: tk.Canvas, filename: str) -> bool:
         """Export the topology as a PNG image.
@@ -0,0 +1,419 @@
+"""Append-only journal of topology edits, for autosave and crash recovery.
+
+A topology file (the snapshot) gets a journal next to it, ``<file>.journal``,
+holding one JSON line per model edit made since the snapshot was written::
+
+    {"op": "base", "devices": [[0, 1200]], "links": [[0, 1199]], "boundaries": []}
+    {"op": "place_device", "h": 17, "x": 410.0, "y": 95.5}
+
+The base line maps the snapshot's rows to model handles, as runs of the
+handles that were live when it was taken. The other lines are the model's
+observer events, which address elements by handle. Recovery loads the
+snapshot and replays the journal over it.
+
+Compaction writes a new snapshot and starts a new journal. The steps are
+ordered so that a crash at any point leaves a recoverable state:
+
+1. the journal is renamed to ``<file>.journal.old`` and a new one begun
+2. the new snapshot is written next to the file and fsynced
+3. the old journal is deleted, which commits the compaction
+4. the new snapshot replaces the topology file
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from models import ConnectionType, TopologyModel
+from .compression import detect_codec
+from .file_handler import FileHandler
+
+JOURNAL_SUFFIX = '.journal'
+OLD_SUFFIX = '.old'
+
+# Edits superseded by a later edit of the same kind to the same element
+COALESCED_OPS = ('place_device', 'place_boundary', 'resize_boundary')
+
+Runs = List[List[int]]
+
+def journal_path(filename: str) -> str:
+    """Get the path of the journal kept for a topology file."""
+    return filename + JOURNAL_SUFFIX
+
+def compacted_path(filename: str) -> str:
+    """Get the path a new snapshot is written to before it replaces the file."""
+    root, extension = os.path.splitext(filename)
+    return f'{root}.compact{extension}'
+
+def has_journal(filename: str) -> bool:
+    """Check whether a topology file has edits that are not in it yet."""
+    journal = journal_path(filename)
+    return any(os.path.exists(path) for path in
+               (journal, journal + OLD_SUFFIX, compacted_path(filename)))
+
+def _live_runs(alive: bytearray) -> Runs:
+    """Get the live handles of a table as [start, end) runs."""
+    runs: Runs = []
+    start = alive.find(1)
+    while start != -1:
+        end = alive.find(0, start)
+        if end == -1:
+            end = len(alive)
+        runs.append([start, end])
+        start = alive.find(1, end)
+    return runs
+
+def _base_entry(model: TopologyModel) -> Dict[str, Any]:
+    return {
+        'op': 'base',
+        'devices': _live_runs(model.device_alive),
+        'links': _live_runs(model.link_alive),
+        'boundaries': _live_runs(model.boundary_alive)
+    }
+
+def _fsync_directory(path: str) -> None:
+    """Make a rename or deletion in a directory durable, where supported."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _write_snapshot(model: TopologyModel, filename: str, compression: Optional[str]) -> str:
+    """Write a model to the compacted path of a file and fsync it."""
+    path = compacted_path(filename)
+    FileHandler.save_model(model, path, compression)
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+    return path
+
+def _read_entries(path: str) -> Iterator[Dict[str, Any]]:
+    """Read a journal, skipping a last line torn by a crash mid-write."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                if line.endswith('\n'):
+                    raise ValueError(f"Corrupt topology journal: {path}")
+                return
+
+class _Replay:
+    """Applies journal entries to a model, translating journal handles."""
+
+    def __init__(self, model: TopologyModel):
+        self.model = model
+        self.devices: Dict[int, int] = {}
+        self.links: Dict[int, int] = {}
+        self.boundaries: Dict[int, int] = {}
+
+    def set_base(self, entry: Dict[str, Any]) -> None:
+        """Map the snapshot's rows, loaded as handles 0..n-1, to journal handles."""
+        for table, key in ((self.devices, 'devices'), (self.links, 'links'),
+                           (self.boundaries, 'boundaries')):
+            row = 0
+            for start, end in entry[key]:
+                for handle in range(start, end):
+                    table[handle] = row
+                    row += 1
+
+    def apply(self, entry: Dict[str, Any]) -> None:
+        model = self.model
+        op = entry['op']
+        handle = entry.get('h')
+        if op == 'clear':
+            model.clear()
+            self.devices.clear()
+            self.links.clear()
+            self.boundaries.clear()
+        elif op == 'add_device':
+            self.devices[handle] = model.add_device(
+                entry['name'], entry['type'], entry['x'], entry['y'],
+                ip_address=entry['ip'], subnet_mask=entry['mask'], location=entry['location']
+            )
+        elif op == 'remove_device':
+            model.remove_device(self.devices[handle])
+        elif op == 'update_device':
+            model.update_device(
+                self.devices[handle], name=entry.get('name'), device_type=entry.get('type'),
+                ip_address=entry.get('ip'), subnet_mask=entry.get('mask'),
+                location=entry.get('location')
+            )
+        elif op == 'place_device':
+            model.set_device_position(self.devices[handle], entry['x'], entry['y'])
+        elif op == 'add_link':
+            self.links[handle] = model.add_link(
+                self.devices[entry['device1']], self.devices[entry['device2']],
+                ConnectionType(entry['type'])
+            )
+        elif op == 'remove_link':
+            model.remove_link(self.links[handle])
+        elif op == 'add_boundary':
+            self.boundaries[handle] = model.add_boundary(
+                entry['name'], entry['x'], entry['y'], entry['width'], entry['height'],
+                subnet=entry['subnet'], description=entry['description'], color=entry['color']
+            )
+        elif op == 'remove_boundary':
+            model.remove_boundary(self.boundaries[handle])
+        elif op == 'update_boundary':
+            model.update_boundary(
+                self.boundaries[handle], name=entry.get('name'), subnet=entry.get('subnet'),
+                description=entry.get('description'), color=entry.get('color')
+            )
+        elif op == 'place_boundary':
+            boundary = self.boundaries[handle]
+            model.move_boundary(boundary, entry['x'] - model.boundary_x[boundary],
+                                entry['y'] - model.boundary_y[boundary])
+        elif op == 'resize_boundary':
+            model.resize_boundary(self.boundaries[handle], entry['width'], entry['height'])
+        else:
+            raise ValueError(f"Unknown topology journal operation: {op}")
+
+def recover_topology(filename: str) -> TopologyModel:
+    """Rebuild a topology from its file and journal after a crash.
+
+    An interrupted compaction is rolled back or finished. The recovered
+    state is then written to the file and the journal removed, so the file
+    alone holds every journaled edit.
+
+    Raises:
+        ValueError: If the file or the journal is corrupt
+        OSError: If the files cannot be read or written
+    """
+    journal = journal_path(filename)
+    old_journal = journal + OLD_SUFFIX
+    compacted = compacted_path(filename)
+    if os.path.exists(old_journal):
+        # The compaction was not committed; the file is still the old snapshot
+        journals = [old_journal, journal]
+        if os.path.exists(compacted):
+            os.remove(compacted)
+    else:
+        if os.path.exists(compacted):
+            os.replace(compacted, filename)
+        journals = [journal]
+
+    model = FileHandler.load_model(filename) if os.path.exists(filename) else TopologyModel()
+    replay = _Replay(model)
+    based = False
+    try:
+        for path in journals:
+            if not os.path.exists(path):
+                continue
+            for entry in _read_entries(path):
+                if entry['op'] == 'base':
+                    # Later journals continue with the handles of the first
+                    if not based:
+                        replay.set_base(entry)
+                        based = True
+                else:
+                    replay.apply(entry)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Corrupt topology journal: {e}") from e
+
+    compression = None if FileHandler.is_binary(filename) or not os.path.exists(filename) \
+        else detect_codec(filename)
+    compacted = _write_snapshot(model, filename, compression)
+    for path in journals:
+        if os.path.exists(path):
+            os.remove(path)
+    _fsync_directory(filename)
+    os.replace(compacted, filename)
+    _fsync_directory(filename)
+    return model
+
+class TopologyJournal:
+    """Appends every edit of a model to the journal next to its topology file.
+
+    Edits are encoded on the main thread and written by a background thread,
+    which fsyncs the journal at most once per flush interval, so an autosave
+    costs in proportion to the edits rather than the topology. Consecutive
+    moves of an element waiting for the same flush are merged. After
+    ``compact_after`` edits a snapshot of the model's tables is taken and
+    written out by the same thread, and the journal starts over. If a write
+    fails, ``error`` holds the exception and edits are no longer safe.
+    """
+
+    FLUSH_INTERVAL = 1.0
+    COMPACT_AFTER = 10000
+
+    def __init__(self, model: TopologyModel, filename: str,
+                 flush_interval: float = FLUSH_INTERVAL, compact_after: int = COMPACT_AFTER):
+        """Start journaling a model's edits.
+
+        The topology file must hold the model's current state, i.e. the model
+        was just loaded from it or saved to it. Leftovers of an earlier journal
+        are discarded.
+
+        Args:
+            model: Model whose edits are journaled
+            filename: Topology file the journal belongs to
+            flush_interval: Seconds between writes and fsyncs of the journal
+            compact_after: Number of edits after which a compaction starts
+        """
+        self.model = model
+        self.filename = filename
+        self.path = journal_path(filename)
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self.compression = None
+        if os.path.exists(filename) and not FileHandler.is_binary(filename):
+            self.compression = detect_codec(filename)
+        self.error: Optional[Exception] = None
+        self.edits_since_compaction = 0
+
+        # Statistics
+        self.entries_written = 0
+        self.fsyncs = 0
+        self.compactions = 0
+
+        self._pending: List[Any] = []
+        self._coalesce: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._compacting = False
+        self._closing = False
+        self._cond = threading.Condition()
+
+        for path in (self.path + OLD_SUFFIX, compacted_path(filename)):
+            if os.path.exists(path):
+                os.remove(path)
+        self._file = self._start_journal(_base_entry(model))
+        model.observers.append(self._record)
+        self._thread = threading.Thread(target=self._run, name='topology-journal', daemon=True)
+        self._thread.start()
+
+    def _start_journal(self, base: Dict[str, Any]):
+        """Create the journal file with its base line and make it durable."""
+        f = open(self.path, 'w', encoding='utf-8')
+        f.write(json.dumps(base) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+        _fsync_directory(self.path)
+        return f
+
+    def _record(self, op: str, handle: int, fields: Dict[str, Any]) -> None:
+        """Queue an edit reported by the model."""
+        with self._cond:
+            key = (op, handle)
+            entry = self._coalesce.get(key) if op in COALESCED_OPS else None
+            if entry is not None:
+                entry.update(fields)
+            else:
+                entry = {'op': op, 'h': handle}
+                entry.update(fields)
+                self._pending.append(entry)
+                if op in COALESCED_OPS:
+                    self._coalesce[key] = entry
+                elif op == 'clear':
+                    # Handles start over after a clear
+                    self._coalesce.clear()
+            self.edits_since_compaction += 1
+            due = self.edits_since_compaction >= self.compact_after
+        if due:
+            self.compact()
+
+    def compact(self) -> None:
+        """Start writing a new snapshot, unless one is being written already."""
+        with self._cond:
+            if self._compacting:
+                return
+            self._compacting = True
+            self.edits_since_compaction = 0
+        snapshot = self.model.snapshot()
+        with self._cond:
+            self._pending.append(snapshot)
+            self._coalesce.clear()
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Write and fsync pending edits on the journal's thread now."""
+        with self._cond:
+            self._cond.notify()
+
+    def close(self, compact: bool = True) -> None:
+        """Stop journaling and wait for pending writes.
+
+        Args:
+            compact: Write a final snapshot first, so the topology file holds
+                every edit and the journal can be removed
+        """
+        if self._record in self.model.observers:
+            self.model.observers.remove(self._record)
+        if compact:
+            self._compaction_done()
+            self.compact()
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        self._file.close()
+        if compact and self.error is None:
+            os.remove(self.path)
+            _fsync_directory(self.path)
+
+    def _run(self) -> None:
+        """Write pending edits once per flush interval until closed."""
+        while True:
+            with self._cond:
+                if not self._closing:
+                    self._cond.wait(self.flush_interval)
+                pending = self._pending
+                self._pending = []
+                self._coalesce.clear()
+                closing = self._closing
+            try:
+                self._write(pending)
+            except OSError as e:
+                self.error = e
+                self._compaction_done()
+            if closing:
+                return
+
+    def _write(self, pending: List[Any]) -> None:
+        """Append entries to the journal, rotating it at a compaction marker."""
+        snapshot = None
+        lines: List[str] = []
+        for entry in pending:
+            if isinstance(entry, TopologyModel):
+                if os.path.exists(self.path + OLD_SUFFIX):
+                    # A failed compaction left the old journal; keep appending
+                    self._compaction_done()
+                    continue
+                self._append(lines)
+                lines = []
+                snapshot = entry
+                self._file.close()
+                os.replace(self.path, self.path + OLD_SUFFIX)
+                self._file = self._start_journal(_base_entry(snapshot))
+            else:
+                lines.append(json.dumps(entry))
+        self._append(lines)
+        if snapshot is not None:
+            self._compact(snapshot)
+
+    def _append(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries_written += len(lines)
+        self.fsyncs += 1
+
+    def _compact(self, snapshot: TopologyModel) -> None:
+        """Write a snapshot and commit it, see the module docstring."""
+        compacted = _write_snapshot(snapshot, self.filename, self.compression)
+        os.remove(self.path + OLD_SUFFIX)
+        _fsync_directory(self.filename)
+        os.replace(compacted, self.filename)
+        _fsync_directory(self.filename)
+        self.compactions += 1
+        self._compaction_done()
+
+    def _compaction_done(self) -> None:
+        """Allow the next compaction to start."""
+        with self._cond:
+            self._compacting = False
@@ -0,0 +1,165 @@
+import json
+import re
+from typing import IO, Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+SECTIONS = ('devices', 'connections', 'boundaries')
+Record = Dict[str, Any]
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def write_topology(f: IO[str], sections: Iterable[Tuple[str, Iterable[Record]]]) -> None:
+    """Write a topology file one record at a time.
+
+    The output has the same structure as ``json.dump(topology, f)``, with
+    one record per line, so the whole topology never has to exist as one
+    nested structure in memory.
+
+    Args:
+        f: Text file to write to
+        sections: (section name, records) pairs, written in order
+    """
+    dumps = json.dumps
+    f.write('{')
+    separator = '\n'
+    for name, records in sections:
+        f.write(f'{separator}  {dumps(name)}: [')
+        line_start = '\n    '
+        for record in records:
+            f.write(line_start)
+            f.write(dumps(record))
+            line_start = ',\n    '
+        f.write(']' if line_start == '\n    ' else '\n  ]')
+        separator = ',\n'
+    f.write('\n}\n')
+
+class TopologyReader:
+    """Incremental reader for topology files.
+
+    The top-level object and section arrays are scanned by hand, and each
+    record is decoded on its own from a text buffer refilled one chunk at a
+    time. Memory use is bounded by the chunk size and one batch of records,
+    not by the size of the file.
+    """
+
+    CHUNK_SIZE = 1 << 20
+    MAX_RECORD_SIZE = 16 << 20
+
+    def __init__(self, f: IO[str], chunk_size: int = CHUNK_SIZE):
+        """Initialize the reader.
+
+        Args:
+            f: Text file positioned at the start of a topology file
+            chunk_size: Number of characters read at a time
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.sections_seen: Set[str] = set()
+        self._buf = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping what was consumed."""
+        if self._eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid topology file format: {message} at offset {self._offset + self._pos}")
+
+    def _peek(self) -> str:
+        """Skip whitespace and get the next character, or '' at the end of the file."""
+        while True:
+            buf = self._buf
+            pos = self._pos = _WHITESPACE.match(buf, self._pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str) -> None:
+        """Consume a structural character."""
+        if self._peek() != char:
+            raise self._error(f"expected '{char}'")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """Decode the next JSON value, reading more of the file as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if len(self._buf) - self._pos > self.MAX_RECORD_SIZE or not self._fill():
+                    raise self._error(e.msg) from e
+                continue
+            if end == len(self._buf) and self._fill():
+                # A number or literal may continue in the next chunk
+                continue
+            self._pos = end
+            return value
+
+    def _section(self, name: str, batch_size: int) -> Iterator[Tuple[str, List[Record]]]:
+        """Yield the records of one section array in batches."""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        batch: List[Record] = []
+        while True:
+            record = self._value()
+            if not isinstance(record, dict):
+                raise self._error(f"expected an object in '{name}'")
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield name, batch
+                batch = []
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                break
+            if char != ',':
+                raise self._error("expected ',' or ']'")
+        if batch:
+            yield name, batch
+
+    def records(self, batch_size: int = 1000) -> Iterator[Tuple[str, List[Record]]]:
+        """Yield (section name, records) batches in file order.
+
+        Entries other than the three topology sections are skipped.
+
+        Raises:
+            ValueError: If the file is malformed or a section is missing
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                if not isinstance(key, str):
+                    raise self._error("expected a key")
+                self._expect(':')
+                if key in SECTIONS:
+                    self.sections_seen.add(key)
+                    yield from self._section(key, batch_size)
+                else:
+                    self._value()
+                char = self._peek()
+                self._pos += 1
+                if char == '}':
+                    break
+                if char != ',':
+                    raise self._error("expected ',' or '}'")
+        missing = [name for name in SECTIONS if name not in self.sections_seen]
+        if missing:
+            raise ValueError(f"Invalid topology file format: missing {', '.join(missing)}")
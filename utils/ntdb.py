@@ -0,0 +1,309 @@
+"""Compact binary topology format (.ntdb).
+
+Layout, all little-endian::
+
+    header        fixed-size struct, see HEADER
+    string table  (string_count + 1) uint64 byte offsets, then UTF-8 data
+    devices       one packed column per DEVICE_COLUMNS entry
+    connections   one packed column per LINK_COLUMNS entry
+    boundaries    one packed column per BOUNDARY_COLUMNS entry
+
+Text fields are stored once in the string table and referenced by index.
+Tables are stored column by column, like TopologyModel holds them, so a
+memory-mapped file exposes each column as a zero-copy memoryview and whole
+columns load into the model's arrays without per-record parsing.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from typing import IO, Any, Dict, Iterator, List, Tuple
+from models import ConnectionType, TopologyModel
+
+NTDB_EXTENSION = '.ntdb'
+MAGIC = b'NTDB'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHIIIIQQQQ')
+
+DEVICE_COLUMNS = (
+    ('x', 'd'), ('y', 'd'),
+    ('name', 'I'), ('type', 'I'), ('ip', 'I'), ('mask', 'I'), ('location', 'I')
+)
+LINK_COLUMNS = (('device1', 'I'), ('device2', 'I'), ('type', 'I'))
+BOUNDARY_COLUMNS = (
+    ('x', 'd'), ('y', 'd'), ('width', 'd'), ('height', 'd'),
+    ('name', 'I'), ('subnet', 'I'), ('description', 'I'), ('color', 'I')
+)
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+def _table_size(columns: Tuple[Tuple[str, str], ...], rows: int) -> int:
+    """Get the byte size of a table, each column padded to 8 bytes."""
+    return sum(_padded(rows * array(code).itemsize) for _, code in columns)
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+def _write_column(f: IO[bytes], column: array) -> None:
+    """Write a column little-endian, padded to 8 bytes."""
+    if not _LITTLE_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    data = column.tobytes()
+    f.write(data)
+    f.write(b'\0' * (_padded(len(data)) - len(data)))
+
+class _StringTable:
+    """Interns strings while a file is written."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, text: str) -> int:
+        code = self.index.get(text)
+        if code is None:
+            code = self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return code
+
+    def column(self, texts: Iterator[str]) -> array:
+        add = self.add
+        return array('I', (add(text) for text in texts))
+
+def write_ntdb(model: TopologyModel, f: IO[bytes]) -> None:
+    """Write the live elements of a model in the .ntdb format.
+
+    Args:
+        model: Model to save
+        f: Binary file to write to
+    """
+    strings = _StringTable()
+    devices = list(model.devices())
+    links = list(model.links())
+    boundaries = list(model.boundaries())
+
+    # Links refer to devices by row, since dead handles are not written
+    rows = array('i', [-1]) * len(model.device_names)
+    for row, handle in enumerate(devices):
+        rows[handle] = row
+
+    type_names = model.type_names
+    device_types = model.device_types
+    link_types = model.link_types
+    connection_codes = [strings.add(t.value) for t in TopologyModel.CONNECTION_TYPES]
+    device_columns = [
+        array('d', (model.device_x[h] for h in devices)),
+        array('d', (model.device_y[h] for h in devices)),
+        strings.column(model.device_names[h] for h in devices),
+        strings.column(type_names[device_types[h]] for h in devices),
+        strings.column(model.device_ips[h] for h in devices),
+        strings.column(model.device_masks[h] for h in devices),
+        strings.column(model.device_locations[h] for h in devices),
+    ]
+    link_columns = [
+        array('I', (rows[model.link_a[h]] for h in links)),
+        array('I', (rows[model.link_b[h]] for h in links)),
+        array('I', (connection_codes[link_types[h]] for h in links)),
+    ]
+    boundary_columns = [
+        array('d', (model.boundary_x[h] for h in boundaries)),
+        array('d', (model.boundary_y[h] for h in boundaries)),
+        array('d', (model.boundary_width[h] for h in boundaries)),
+        array('d', (model.boundary_height[h] for h in boundaries)),
+        strings.column(model.boundary_names[h] for h in boundaries),
+        strings.column(model.boundary_subnets[h] for h in boundaries),
+        strings.column(model.boundary_descriptions[h] for h in boundaries),
+        strings.column(model.boundary_colors[h] for h in boundaries),
+    ]
+
+    encoded = [text.encode('utf-8') for text in strings.strings]
+    offsets = array('Q', [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        offsets.append(total)
+
+    strings_pos = HEADER.size + (-HEADER.size & 7)
+    data_pos = strings_pos + len(offsets) * 8
+    devices_pos = _padded(data_pos + total)
+    links_pos = devices_pos + _table_size(DEVICE_COLUMNS, len(devices))
+    boundaries_pos = links_pos + _table_size(LINK_COLUMNS, len(links))
+
+    f.write(HEADER.pack(
+        MAGIC, VERSION, 0,
+        len(encoded), len(devices), len(links), len(boundaries),
+        strings_pos, devices_pos, links_pos, boundaries_pos
+    ))
+    f.write(b'\0' * (strings_pos - HEADER.size))
+    _write_column(f, offsets)
+    f.write(b''.join(encoded))
+    f.write(b'\0' * (devices_pos - data_pos - total))
+    for column in device_columns + link_columns + boundary_columns:
+        _write_column(f, column)
+
+class NtdbFile:
+    """Read-only, memory-mapped view of a .ntdb file.
+
+    Opening a file only reads the header; each column is a memoryview into
+    the mapping (e.g. ``devices['x'][row]``) and strings are decoded when
+    asked for. Records are available in the same shape as the JSON format
+    through ``device_record``, ``link_record`` and ``boundary_record``.
+    """
+
+    def __init__(self, filename: str):
+        """Map a file.
+
+        Raises:
+            ValueError: If the file is not a .ntdb file of a supported version
+        """
+        self._file = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError("Invalid topology file format: empty file")
+        self._views: List[memoryview] = []
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self) -> None:
+        if len(self._map) < HEADER.size:
+            raise ValueError("Invalid topology file format: truncated header")
+        (magic, version, _, self.string_count, self.device_count, self.link_count,
+         self.boundary_count, strings_pos, devices_pos, links_pos,
+         boundaries_pos) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("Invalid topology file format: not a .ntdb file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported .ntdb version {version}")
+        self._offsets = self._column(strings_pos, 'Q', self.string_count + 1)
+        self._data_pos = strings_pos + (self.string_count + 1) * 8
+        self.devices = self._table(devices_pos, DEVICE_COLUMNS, self.device_count)
+        self.links = self._table(links_pos, LINK_COLUMNS, self.link_count)
+        self.boundaries = self._table(boundaries_pos, BOUNDARY_COLUMNS, self.boundary_count)
+
+    def _column(self, pos: int, code: str, rows: int) -> Any:
+        """Get a column as a zero-copy memoryview, or a byte-swapped copy on big-endian hosts."""
+        size = rows * array(code).itemsize
+        if pos + size > len(self._map):
+            raise ValueError("Invalid topology file format: truncated table")
+        view = memoryview(self._map)[pos:pos + size]
+        self._views.append(view)
+        if _LITTLE_ENDIAN:
+            column = view.cast(code)
+            self._views.append(column)
+            return column
+        column = array(code, view.tobytes())
+        column.byteswap()
+        return column
+
+    def _table(self, pos: int, columns: Tuple[Tuple[str, str], ...], rows: int) -> Dict[str, Any]:
+        table = {}
+        for name, code in columns:
+            table[name] = self._column(pos, code, rows)
+            pos += _padded(rows * array(code).itemsize)
+        return table
+
+    def string(self, index: int) -> str:
+        """Decode one entry of the string table."""
+        start = self._data_pos + self._offsets[index]
+        end = self._data_pos + self._offsets[index + 1]
+        return self._map[start:end].decode('utf-8')
+
+    def strings(self) -> List[str]:
+        """Decode the whole string table."""
+        start = self._data_pos
+        end = start + self._offsets[self.string_count]
+        data = self._map[start:end]
+        text = data.decode('utf-8')
+        offsets = self._offsets
+        if len(text) == len(data):
+            # ASCII only: byte offsets are character offsets
+            return [text[offsets[i]:offsets[i + 1]] for i in range(self.string_count)]
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self.string_count)]
+
+    def device_record(self, row: int) -> Dict[str, Any]:
+        """Get the JSON-format record for a device row."""
+        devices = self.devices
+        return {
+            'name': self.string(devices['name'][row]),
+            'type': self.string(devices['type'][row]),
+            'ip': self.string(devices['ip'][row]),
+            'x': devices['x'][row],
+            'y': devices['y'][row]
+        }
+
+    def link_record(self, row: int) -> Dict[str, Any]:
+        """Get the JSON-format record for a connection row."""
+        devices = self.devices
+        links = self.links
+        return {
+            'device1': self.string(devices['name'][links['device1'][row]]),
+            'device2': self.string(devices['name'][links['device2'][row]]),
+            'type': self.string(links['type'][row])
+        }
+
+    def boundary_record(self, row: int) -> Dict[str, Any]:
+        """Get the JSON-format record for a boundary row."""
+        boundaries = self.boundaries
+        return {
+            'name': self.string(boundaries['name'][row]),
+            'subnet': self.string(boundaries['subnet'][row]),
+            'description': self.string(boundaries['description'][row]),
+            'color': self.string(boundaries['color'][row]),
+            'x': boundaries['x'][row],
+            'y': boundaries['y'][row],
+            'width': boundaries['width'][row],
+            'height': boundaries['height'][row]
+        }
+
+    def to_model(self) -> TopologyModel:
+        """Build a model holding every element of the file."""
+        strings = self.strings()
+        model = TopologyModel()
+        devices = self.devices
+        add_device = model.add_device
+        handles = [
+            add_device(strings[name], strings[device_type], x, y,
+                       ip_address=strings[ip], subnet_mask=strings[mask],
+                       location=strings[location])
+            for x, y, name, device_type, ip, mask, location in zip(
+                devices['x'], devices['y'], devices['name'], devices['type'],
+                devices['ip'], devices['mask'], devices['location'])
+        ]
+        links = self.links
+        add_link = model.add_link
+        connection_types = {
+            code: ConnectionType(strings[code]) for code in set(links['type'])
+        }
+        for device1, device2, link_type in zip(links['device1'], links['device2'], links['type']):
+            add_link(handles[device1], handles[device2], connection_types[link_type])
+        boundaries = self.boundaries
+        for x, y, width, height, name, subnet, description, color in zip(
+                boundaries['x'], boundaries['y'], boundaries['width'], boundaries['height'],
+                boundaries['name'], boundaries['subnet'], boundaries['description'],
+                boundaries['color']):
+            model.add_boundary(strings[name], x, y, width, height,
+                               subnet=strings[subnet], description=strings[description],
+                               color=strings[color])
+        return model
+
+    def close(self) -> None:
+        """Release the column views and unmap the file."""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'NtdbFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()